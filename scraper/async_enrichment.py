@@ -0,0 +1,422 @@
+"""
+Asyncio email enrichment engine
+Drop-in replacement for EmailEnrichmentScraper.enrich_json_with_emails that
+keeps hundreds of requests in flight on one aiohttp session: connections are
+pooled and kept alive per host, DNS answers are cached, and the per-host
+politeness scheduler still paces each site. Page parsing and email selection
+are delegated to EmailEnrichmentScraper, so results are the same.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urljoin
+
+import aiohttp
+from bs4 import BeautifulSoup
+
+from bounded_fetch import read_bounded_async
+from dns_cache import CachingResolver
+from email_enrichment_scraper import EmailEnrichmentScraper, SiteContext, normalise_website
+from enrichment_delta import DEFAULT_RETRY_AFTER, EnrichmentDelta, default_delta_path
+from enrichment_outcomes import HTTP_ERROR, OutcomeCache, classify_error
+from politeness import PolitenessScheduler, THROTTLE_STATUSES
+from site_crawler import CrawlFrontier
+
+
+class AsyncEnrichmentEngine:
+    """
+    max_in_flight: companies processed concurrently (and total connection limit)
+    per_host: connections per host, at least the scraper's probe_concurrency (kept alive between a site's pages)
+    dns_cache_ttl / dns_negative_ttl: seconds a resolved / unresolvable hostname is reused
+    prefetch_dns: resolve the hosts of the next N queued companies while the current ones download
+    resolver: a CachingResolver to share between engines (default: one per engine)
+    """
+
+    def __init__(self, scraper: Optional[EmailEnrichmentScraper] = None, max_in_flight: int = 200,
+                 per_host: int = 4, dns_cache_ttl: int = 300,
+                 scheduler: Optional[PolitenessScheduler] = None, throttle_retries: int = 2,
+                 dns_negative_ttl: int = 60, prefetch_dns: int = 0,
+                 resolver: Optional[CachingResolver] = None):
+        self.scraper = scraper or EmailEnrichmentScraper()
+        self.max_in_flight = max_in_flight
+        self.per_host = per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.prefetch_dns = prefetch_dns
+        # One cache for all workers, replacing the connector's own
+        self.resolver = resolver or CachingResolver(ttl=dns_cache_ttl, negative_ttl=dns_negative_ttl)
+        self.scheduler = scheduler or self.scraper.scheduler
+        self.throttle_retries = throttle_retries
+        self.stats = {'companies': 0, 'requests': 0, 'parses': 0}
+
+    def make_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(limit=self.max_in_flight, limit_per_host=self.per_host,
+                                         resolver=self.resolver, use_dns_cache=False, keepalive_timeout=30)
+        return aiohttp.ClientSession(connector=connector, headers=self.scraper.headers)
+
+    async def request(self, session: aiohttp.ClientSession, url: str, timeout: float,
+                      stop_at_mailto: bool = False):
+        """
+        GET url once the host's token bucket allows it, returns (status, body)
+        Only HTML bodies are read, streamed up to the scraper's max_page_bytes
+        """
+        client_timeout = aiohttp.ClientTimeout(total=timeout)
+        for attempt in range(self.throttle_retries + 1):
+            await self.scheduler.wait_async(url)
+            async with session.get(url, timeout=client_timeout) as response:
+                self.scheduler.observe(url, response.status, response.headers.get('Retry-After'))
+                if response.status in THROTTLE_STATUSES and attempt < self.throttle_retries:
+                    continue
+                if response.status >= 400:
+                    return response.status, b''
+                body = await read_bounded_async(response, self.scraper.max_page_bytes, stop_at_mailto)
+                return response.status, body
+
+    async def fetch_page(self, session: aiohttp.ClientSession, url: str, timeout: float,
+                         site: Optional[SiteContext] = None, stop_at_mailto: bool = False) -> Optional[bytes]:
+        """Download a page, None on any error (classified into site.errors when given)"""
+        try:
+            status, body = await self.request(session, url, timeout, stop_at_mailto)
+        except Exception as e:
+            if site is not None:
+                site.errors[url] = (classify_error(e), str(e) or type(e).__name__)
+            return None
+        if status >= 400:
+            if site is not None:
+                site.errors[url] = (HTTP_ERROR, f"HTTP {status}")
+            return None
+        return body
+
+    async def get_page(self, session: aiohttp.ClientSession, site: SiteContext, url: str,
+                       stop_at_mailto: bool = False) -> Optional[bytes]:
+        """Raw page for url, downloaded only the first time the site asks; None on any error"""
+        if url in site.pages:
+            return site.pages[url]
+
+        content = None
+        timeout = site.remaining(self.scraper.timeout)
+        if timeout > 0:
+            site.requests += 1
+            content = await self.fetch_page(session, url, timeout, site, stop_at_mailto)
+
+        site.pages[url] = content
+        return content
+
+    async def get_soup(self, session: aiohttp.ClientSession, site: SiteContext, url: str) -> Optional[BeautifulSoup]:
+        """Parsed page for url, built the first time a tree is needed"""
+        if url in site.soups:
+            return site.soups[url]
+
+        content = await self.get_page(session, site, url)
+        if content is None:
+            return None
+
+        site.parses += 1
+        # BeautifulSoup is CPU bound, keep it off the event loop
+        soup = await asyncio.to_thread(BeautifulSoup, content, 'html.parser')
+        site.soups[url] = soup
+        return soup
+
+    async def find_emails_on_page(self, session: aiohttp.ClientSession, site: SiteContext, url: str,
+                                  stop_at_mailto: bool = False) -> List[str]:
+        """Byte pre-scan first, full parse only for obfuscated pages"""
+        content = await self.get_page(session, site, url, stop_at_mailto)
+        if content is None:
+            return []
+
+        emails = self.scraper.prescan_emails(content)
+        if emails is None:
+            emails = self.scraper.extract_emails_from_soup(await self.get_soup(session, site, url))
+        return emails
+
+    async def probe_contact_pages(self, session: aiohttp.ClientSession, site: SiteContext,
+                                  base_url: str) -> Optional[str]:
+        """
+        Concurrent, ranked contact probing (see EmailEnrichmentScraper.probe_contact_pages)
+        Outstanding probes are cancelled as soon as the winner is certain
+        """
+        scraper = self.scraper
+        candidates = [urljoin(base_url, pattern) for pattern in scraper.contact_page_patterns]
+        results = {}
+        slots = asyncio.Semaphore(scraper.probe_concurrency)
+
+        async def probe(url):
+            async with slots:
+                timeout = site.remaining(scraper.probe_timeout)
+                if timeout <= 0:
+                    return None, [], None
+                site.requests += 1
+                content = await self.fetch_page(session, url, timeout, stop_at_mailto=True)
+            if content is None:
+                return None, [], None
+            emails = scraper.prescan_emails(content)
+            if emails is not None:
+                return content, emails, None
+            soup = await asyncio.to_thread(BeautifulSoup, content, 'html.parser')
+            return content, scraper.extract_emails_from_soup(soup), soup
+
+        tasks = {asyncio.create_task(probe(url)): priority for priority, url in enumerate(candidates)}
+        pending = set(tasks)
+        try:
+            while pending:
+                timeout = site.remaining(scraper.probe_timeout * len(candidates))
+                if timeout <= 0:
+                    break
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    results[tasks[task]] = task.result()
+                if scraper.pick_contact_probe(results, len(candidates), final=False) is not None:
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        for priority, (content, _, soup) in results.items():
+            site.pages[candidates[priority]] = content
+            if soup is not None:
+                site.soups[candidates[priority]] = soup
+                site.parses += 1
+
+        winner = scraper.pick_contact_probe(results, len(candidates), final=True)
+        return candidates[winner] if winner is not None else None
+
+    async def crawl_site(self, session: aiohttp.ClientSession, site: SiteContext, website: str) -> List[str]:
+        """Same bounded best-first crawl as EmailEnrichmentScraper.crawl_site"""
+        scraper = self.scraper
+        soup = await self.get_soup(session, site, website)
+        if soup is None:
+            return []
+
+        frontier = CrawlFrontier(seen=site.pages)
+        frontier.add_links(soup, website, depth=1)
+        emails = []
+        for _ in range(scraper.crawl_pages):
+            entry = frontier.pop()
+            if entry is None or site.remaining(scraper.timeout) <= 0:
+                break
+            url, depth = entry
+            emails.extend(await self.find_emails_on_page(session, site, url,
+                                                         stop_at_mailto=depth >= scraper.crawl_depth))
+            if scraper.has_confident_email(emails, website):
+                break
+            if depth < scraper.crawl_depth:
+                page_soup = await self.get_soup(session, site, url)
+                if page_soup is not None:
+                    frontier.add_links(page_soup, url, depth + 1)
+        return emails
+
+    async def scrape_site(self, session: aiohttp.ClientSession, company: Dict) -> Optional[SiteContext]:
+        """
+        Homepage, linked contact page, best internal links, then contact probes
+        (stopping at the first confident email, as EmailEnrichmentScraper.scrape_site);
+        returns the SiteContext with the best email, None without a website
+        """
+        website = company.get('website')
+        if not website:
+            return None
+
+        website = normalise_website(website)
+        site = self.scraper.cached_site(website)
+        if site is not None:
+            return site
+        site = SiteContext(website, self.scraper.site_budget)
+
+        scraper = self.scraper
+        all_emails = []
+        try:
+            all_emails.extend(await self.find_emails_on_page(session, site, website))
+
+            soup = None
+            if not scraper.has_confident_email(all_emails, website):
+                soup = await self.get_soup(session, site, website)
+            if soup is not None:
+                contact_url = scraper.find_contact_link(soup, website)
+                if contact_url and contact_url != website:
+                    all_emails.extend(await self.find_emails_on_page(session, site, contact_url, stop_at_mailto=True))
+
+                if not scraper.has_confident_email(all_emails, website):
+                    all_emails.extend(await self.crawl_site(session, site, website))
+
+                if not contact_url and not scraper.has_confident_email(all_emails, website):
+                    probe_url = await self.probe_contact_pages(session, site, website)
+                    if probe_url:
+                        all_emails.extend(await self.find_emails_on_page(session, site, probe_url, stop_at_mailto=True))
+
+            site.email = scraper.choose_email(list(set(all_emails)), website)
+            scraper.settle_site(site)
+        except Exception as e:
+            scraper.settle_site(site, e)
+        return site
+
+    async def enrich(self, companies: List[Dict], indices: Optional[List[int]] = None,
+                     on_result: Optional[Callable[[int, SiteContext], None]] = None) -> Dict[int, str]:
+        """
+        Find emails for every company without one (or just `indices`), returns {index: email}
+        A fixed set of worker tasks pulls from a queue, so only max_in_flight
+        companies are ever being processed at once; on_result(idx, site) sees
+        each finished site. With prefetch_dns, a helper task resolves the hosts
+        of the next prefetch_dns queued companies ahead of the workers
+        """
+        if indices is None:
+            indices = [idx for idx, c in enumerate(companies) if not c.get('email') and c.get('website')]
+        work = asyncio.Queue()
+        for idx in indices:
+            work.put_nowait(idx)
+
+        total = work.qsize()
+        found = {}
+        done = 0
+        taken = 0
+        progress = asyncio.Event()
+        self.stats = {'companies': total, 'requests': 0, 'parses': 0}
+
+        async def prefetch():
+            lookups = set()
+            try:
+                for position, idx in enumerate(indices):
+                    while position >= taken + self.prefetch_dns:
+                        progress.clear()
+                        await progress.wait()
+                    if position < taken:
+                        continue  # a worker got there first
+                    lookup = asyncio.create_task(
+                        self.resolver.prefetch(normalise_website(companies[idx]['website'])))
+                    lookups.add(lookup)
+                    lookup.add_done_callback(lookups.discard)
+                await asyncio.gather(*lookups)
+            finally:
+                for lookup in lookups:
+                    lookup.cancel()
+
+        async def worker():
+            nonlocal done, taken
+            while True:
+                try:
+                    idx = work.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                taken += 1
+                progress.set()
+                try:
+                    site = await self.scrape_site(session, companies[idx])
+                except Exception:
+                    site = None
+                if site is not None:
+                    if on_result is not None:
+                        on_result(idx, site)
+                    self.stats['requests'] += site.requests
+                    self.stats['parses'] += site.parses
+                    if site.email:
+                        found[idx] = site.email
+                done += 1
+                if done % 50 == 0 or done == total:
+                    print(f"  {done}/{total} companies checked, {len(found)} emails found")
+
+        async with self.make_session() as session:
+            prefetcher = asyncio.create_task(prefetch()) if self.prefetch_dns and total else None
+            try:
+                await asyncio.gather(*(worker() for _ in range(min(self.max_in_flight, total))))
+            finally:
+                if prefetcher is not None:
+                    prefetcher.cancel()
+                    await asyncio.gather(prefetcher, return_exceptions=True)
+
+        return found
+
+    def enrich_json_with_emails(self, input_file: str, output_file: Optional[str],
+                                delta_file: Optional[str] = None, retry_after: timedelta = DEFAULT_RETRY_AFTER):
+        """
+        Read JSON file, scrape emails, and save enriched data
+        (same output file as EmailEnrichmentScraper.enrich_json_with_emails, and
+        the same incremental mode with delta_file)
+        """
+        print("Loading existing data...")
+        with open(input_file, 'r') as f:
+            companies = json.load(f)
+
+        print(f"Found {len(companies)} companies")
+
+        indices, on_result = None, None
+        if delta_file:
+            delta = EnrichmentDelta(delta_file)
+            print(f"Merged {delta.apply(companies)} emails from {delta_file}")
+            indices = delta.pending(companies, retry_after)
+            print(f"{len(indices)} companies new or due for a retry")
+
+            def on_result(idx, site):
+                delta.record(companies[idx], site.outcome, site.email)
+
+        missing = sum(1 for c in companies if not c.get('email'))
+        print(f"{missing} companies missing email addresses")
+
+        print(f"\nStarting email extraction ({self.max_in_flight} concurrent sites)...")
+        start = time.time()
+        found = asyncio.run(self.enrich(companies, indices, on_result))
+        for idx, email in found.items():
+            companies[idx]['email'] = email
+
+        print(f"\nEmail extraction complete in {time.time() - start:.1f}s!")
+        print(f"Emails found: {len(found)} out of {missing} missing")
+        if missing:
+            print(f"Success rate: {(len(found)/missing*100):.1f}%")
+        checked = self.stats['companies']
+        if checked:
+            print(f"Requests: {self.stats['requests']} ({self.stats['requests']/checked:.1f} per company), "
+                  f"pages parsed: {self.stats['parses']} ({self.stats['parses']/checked:.1f} per company)")
+        dns = self.resolver.stats
+        print(f"DNS: {dns['misses']} lookups ({dns['prefetched']} ahead of time), "
+              f"{dns['hits'] + dns['shared']} answered from the cache, {dns['negative_hits']} known failures")
+        outcomes = self.scraper.outcomes
+        if outcomes is not None:
+            print(f"Skipped from the outcome cache: {outcomes.stats['skipped']}, "
+                  f"circuit breakers tripped: {outcomes.stats['tripped']}")
+
+        if output_file:
+            print(f"\nSaving enriched data to {output_file}...")
+            with open(output_file, 'w') as f:
+                json.dump(companies, f, indent=2)
+
+        print("Done!")
+
+        print(f"\nSample of newly found emails:")
+        for idx in sorted(found)[:10]:
+            print(f"  - {companies[idx]['name']}: {companies[idx]['email']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Asyncio email enrichment")
+    parser.add_argument('--input', default='property_managers_CA_FL_DC.json')
+    parser.add_argument('--output', default=None,
+                        help='Full enriched JSON (default: property_managers_CA_FL_DC_with_emails.json, '
+                             'not written with --incremental unless given)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Visit only new or stale companies, appending results to the delta file')
+    parser.add_argument('--delta', default=None, help='Delta file (default: INPUT with .delta.ndjson)')
+    parser.add_argument('--retry-after', type=float, default=DEFAULT_RETRY_AFTER.days,
+                        help='Days before a company without an email is tried again (default: 7)')
+    parser.add_argument('--max-in-flight', type=int, default=200)
+    parser.add_argument('--per-host', type=int, default=4)
+    parser.add_argument('--prefetch-dns', type=int, default=0,
+                        help='Resolve the hosts of the next N queued companies ahead of time (e.g. 400)')
+    parser.add_argument('--outcomes', default='enrichment_outcomes.db',
+                        help='Per-website outcome cache; known-dead domains are skipped (default: enrichment_outcomes.db)')
+    parser.add_argument('--no-outcomes', action='store_true', help='Visit every website, ignoring earlier runs')
+    args = parser.parse_args()
+
+    outcomes = None if args.no_outcomes else OutcomeCache(args.outcomes)
+    engine = AsyncEnrichmentEngine(EmailEnrichmentScraper(outcomes=outcomes),
+                                   max_in_flight=args.max_in_flight, per_host=args.per_host,
+                                   prefetch_dns=args.prefetch_dns)
+    if args.incremental:
+        engine.enrich_json_with_emails(args.input, args.output, delta_file=args.delta or default_delta_path(args.input),
+                                       retry_after=timedelta(days=args.retry_after))
+    else:
+        engine.enrich_json_with_emails(args.input, args.output or 'property_managers_CA_FL_DC_with_emails.json')
+
+
+if __name__ == "__main__":
+    main()
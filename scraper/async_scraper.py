@@ -0,0 +1,165 @@
+"""
+Asyncio crawl engine for FinalPropertyManagerScraper
+Fetches many city pages concurrently; politeness comes from the shared
+per-host token-bucket scheduler instead of a blocking sleep
+"""
+
+import asyncio
+import time
+from typing import List, Dict, Optional
+
+import aiohttp
+import pandas as pd
+
+from final_scraper import FinalPropertyManagerScraper
+from politeness import PolitenessScheduler, THROTTLE_STATUSES
+
+
+class AsyncCrawlEngine:
+    """
+    Concurrent replacement for FinalPropertyManagerScraper.scrape_multiple_cities
+    Parsing is delegated to the wrapped scraper so records are identical
+    """
+
+    def __init__(self, scraper: Optional[FinalPropertyManagerScraper] = None,
+                 max_concurrency: int = 10, per_host_concurrency: int = 4,
+                 scheduler: Optional[PolitenessScheduler] = None,
+                 throttle_retries: int = 2, timeout: float = 30):
+        self.scraper = scraper or FinalPropertyManagerScraper()
+        self.max_concurrency = max_concurrency
+        self.per_host_concurrency = per_host_concurrency
+        self.scheduler = scheduler or self.scraper.scheduler
+        self.throttle_retries = throttle_retries
+        self.timeout = timeout
+
+    async def fetch(self, session: aiohttp.ClientSession, url: str) -> bytes:
+        """
+        Download a page once the host's token bucket allows it
+        Uses the scraper's HttpCache if it has one: fresh entries skip the
+        network, stale ones are revalidated with a conditional GET
+        Every page is also recorded if the scraper has a capture archive
+        """
+        cache = self.scraper.cache
+        entry = cache.lookup(url) if cache is not None else None
+        if entry is not None and cache.is_fresh(entry):
+            cache.count('hits')
+            return self.captured(url, entry.headers, entry.body)
+        headers = entry.conditional_headers() if entry is not None else None
+
+        for attempt in range(self.throttle_retries + 1):
+            await self.scheduler.wait_async(url)
+            async with session.get(url, headers=headers) as response:
+                self.scheduler.observe(url, response.status, response.headers.get('Retry-After'))
+                if response.status in THROTTLE_STATUSES and attempt < self.throttle_retries:
+                    continue
+                if entry is not None and response.status == 304:
+                    cache.count('revalidated')
+                    cache.refresh(url, response.headers)
+                    return self.captured(url, entry.headers, entry.body)
+                response.raise_for_status()
+                body = await response.read()
+                if cache is not None:
+                    cache.count('misses')
+                    cache.store(url, response.status, response.headers, body)
+                return self.captured(url, response.headers, body)
+
+    def captured(self, url: str, headers, body: bytes) -> bytes:
+        """Record a fetched page in the scraper's capture archive, if any"""
+        if self.scraper.capture is not None:
+            self.scraper.capture.write(url, 200, headers, body)
+        return body
+
+    async def scrape_city(self, session: aiohttp.ClientSession, city_info: Dict, ledger=None) -> List[Dict]:
+        """Fetch and parse a single city page, checkpointing it if a ledger is given"""
+        city_url = city_info['url']
+        if ledger is not None:
+            ledger.start(city_info)
+
+        try:
+            content = await self.fetch(session, city_url)
+
+            print(f"\nScraped: {city_info['city']}, {city_info['state']}")
+            print(f"URL: {city_url}")
+
+            # BeautifulSoup is CPU bound, keep it off the event loop
+            companies = await asyncio.to_thread(
+                self.scraper.parse_city_page,
+                content,
+                city_info['city'],
+                city_info['state'],
+                city_url
+            )
+        except Exception as e:
+            print(f"Error scraping {city_url}: {str(e)}")
+            if ledger is not None:
+                ledger.fail(city_info, str(e))
+            return []
+
+        if ledger is not None:
+            ledger.complete(city_info, companies)
+        return companies
+
+    async def crawl(self, city_list: List[Dict], ledger=None) -> List[Dict]:
+        """Scrape all cities concurrently, returning records in city_list order"""
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency,
+                                         limit_per_host=self.per_host_concurrency)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                         headers=self.scraper.headers) as session:
+            results = await asyncio.gather(
+                *(self.scrape_city(session, city_info, ledger) for city_info in city_list)
+            )
+
+        all_companies = []
+        for companies in results:
+            all_companies.extend(companies)
+        return all_companies
+
+    async def crawl_to_sinks(self, city_list: List[Dict], sinks: List, ledger=None) -> int:
+        """
+        Scrape all cities concurrently, writing each city to the sinks as it finishes
+        Records arrive in completion order rather than city_list order
+        """
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency,
+                                         limit_per_host=self.per_host_concurrency)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        total = 0
+
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                         headers=self.scraper.headers) as session:
+            tasks = [self.scrape_city(session, city_info, ledger) for city_info in city_list]
+            for finished in asyncio.as_completed(tasks):
+                companies = await finished
+                for sink in sinks:
+                    sink.write_records(companies)
+                total += len(companies)
+
+        return total
+
+    def scrape_multiple_cities(self, city_list: List[Dict], ledger=None) -> pd.DataFrame:
+        """Drop-in replacement for the sequential scraper method"""
+        return pd.DataFrame(asyncio.run(self.crawl(city_list, ledger)))
+
+    def scrape_to_sinks(self, city_list: List[Dict], sinks: List, ledger=None) -> int:
+        """Streaming counterpart of scrape_multiple_cities, returns the record count"""
+        return asyncio.run(self.crawl_to_sinks(city_list, sinks, ledger))
+
+
+def main():
+    """Scrape Phoenix and the first city, like final_scraper.main"""
+    scraper = FinalPropertyManagerScraper()
+    all_cities = scraper.get_all_city_urls()
+
+    test_cities = [
+        [c for c in all_cities if 'phoenix' in c['slug']][0],
+        all_cities[0],
+    ]
+
+    start = time.time()
+    df = AsyncCrawlEngine(scraper).scrape_multiple_cities(test_cities)
+    print(f"\nTotal companies scraped: {len(df)} in {time.time() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
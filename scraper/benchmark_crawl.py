@@ -0,0 +1,134 @@
+"""
+Benchmark the crawl paths under the same per-host politeness
+Serves the saved phoenix_page.html and page_sample.html from local HTTP
+servers (one per simulated host, with optional response latency) and reports
+cities/minute for:
+  fixed sleep - the old loop: one request, then time.sleep(delay), whatever the host
+  sequential  - FinalPropertyManagerScraper with the token-bucket scheduler
+  asyncio     - AsyncCrawlEngine with the same scheduler limits
+Every path keeps at least `delay` seconds between requests to the same host
+
+Usage: python benchmark_crawl.py [--cities 24] [--hosts 6] [--delay 0.5] [--latency 0.2] [--skip-fixed-sleep]
+"""
+
+import argparse
+import threading
+import time
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+from final_scraper import FinalPropertyManagerScraper
+from async_scraper import AsyncCrawlEngine
+from politeness import PolitenessScheduler
+
+FIXTURES = ['phoenix_page.html', 'page_sample.html']
+
+
+class FixtureHandler(SimpleHTTPRequestHandler):
+    """Serves /companies/<slug> from the saved fixtures, alternating between them"""
+
+    latency = 0.0  # seconds before each response, like a remote server
+
+    def do_GET(self):
+        if self.latency:
+            time.sleep(self.latency)
+        slug = self.path.rstrip('/').split('/')[-1]
+        index = int(slug.rsplit('-', 2)[-1]) if slug[-1].isdigit() else 0
+        with open(FIXTURES[index % len(FIXTURES)], 'rb') as f:
+            body = f.read()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(latency: float = 0.0):
+    """Start a fixture server on a free port, returns (server, base_url)"""
+    handler = type('DelayedFixtureHandler', (FixtureHandler,), {'latency': latency})
+    server = ThreadingHTTPServer(('127.0.0.1', 0), partial(handler, directory='.'))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def build_city_list(base_url, count: int):
+    """count cities spread round-robin over one base URL or a list of them (one per host)"""
+    base_urls = [base_url] if isinstance(base_url, str) else base_url
+    return [
+        {
+            'city': f"City {i}",
+            'state': 'AZ',
+            'slug': f"city-az-{i}",
+            'url': f"{base_urls[i % len(base_urls)]}/companies/city-az-{i}",
+        }
+        for i in range(count)
+    ]
+
+
+def scrape_with_fixed_sleep(scraper: FinalPropertyManagerScraper, city_list, delay: float) -> int:
+    """The loop the scrapers used before politeness.py: fetch, then sleep, one city at a time"""
+    companies = 0
+    for city_info in city_list:
+        companies += len(scraper.scrape_city_page(city_info['url'], city_info['city'], city_info['state']))
+        time.sleep(delay)
+    return companies
+
+
+def report(label: str, cities: int, companies: int, seconds: float, baseline: float):
+    print(f"  {label:12s}: {cities} cities, {companies} companies in {seconds:6.1f}s "
+          f"-> {cities / seconds * 60:6.1f} cities/minute ({baseline / seconds:4.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--cities', type=int, default=24)
+    parser.add_argument('--hosts', type=int, default=6, help='Local servers the cities are spread over')
+    parser.add_argument('--delay', type=float, default=0.5, help='Per-host politeness delay (applied as a token-bucket rate)')
+    parser.add_argument('--latency', type=float, default=0.2, help='Server response time in seconds')
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--skip-fixed-sleep', action='store_true')
+    parser.add_argument('--skip-sequential', action='store_true')
+    args = parser.parse_args()
+
+    # Every path gets the same limit for each host (a host is host:port), each with fresh buckets
+    def make_scheduler(rate: float = 1 / args.delay):
+        return PolitenessScheduler(domain_limits={}, default_rate=rate, default_burst=1)
+
+    servers = [start_server(args.latency) for _ in range(args.hosts)]
+    city_list = build_city_list([base_url for _, base_url in servers], args.cities)
+    results = []
+
+    try:
+        if not args.skip_fixed_sleep:
+            scraper = FinalPropertyManagerScraper(make_scheduler(rate=10000))  # the sleep is the only limit
+            start = time.perf_counter()
+            companies = scrape_with_fixed_sleep(scraper, city_list, args.delay)
+            results.append(('fixed sleep', companies, time.perf_counter() - start))
+
+        if not args.skip_sequential:
+            start = time.perf_counter()
+            df = FinalPropertyManagerScraper(make_scheduler()).scrape_multiple_cities(city_list)
+            results.append(('sequential', len(df), time.perf_counter() - start))
+
+        engine = AsyncCrawlEngine(FinalPropertyManagerScraper(make_scheduler()), max_concurrency=args.concurrency)
+        start = time.perf_counter()
+        df = engine.scrape_multiple_cities(city_list)
+        results.append(('asyncio', len(df), time.perf_counter() - start))
+    finally:
+        for server, _ in servers:
+            server.shutdown()
+
+    print(f"\n{'='*70}")
+    print(f"Crawl Benchmark: {args.cities} cities over {args.hosts} hosts, "
+          f"{args.delay}s per-host delay, {args.latency}s latency")
+    print(f"{'='*70}")
+    baseline = results[0][2]
+    for label, companies, seconds in results:
+        report(label, args.cities, companies, seconds, baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark the byte-level email pre-scan against full BeautifulSoup extraction
+Runs both on the saved HTML fixtures as they are (no addresses), with a mailto:
+link injected, and with an entity-obfuscated address (which falls back to a parse)
+
+Usage: python benchmark_email_scan.py [--repeat 5]
+"""
+
+import argparse
+import time
+
+from bs4 import BeautifulSoup
+
+from email_enrichment_scraper import EmailEnrichmentScraper
+
+FIXTURES = ['phoenix_page.html', 'page_sample.html', 'companies_main_page.html']
+
+VARIANTS = {
+    'no email': b'',
+    'mailto link': b'<p>Contact <a href="mailto:info@acme-rentals.com?subject=Hi">info@acme-rentals.com</a></p>',
+    'obfuscated': b'<p>Write to leasing&#64;acme-rentals.com</p>',
+}
+
+
+def inject(content: bytes, snippet: bytes) -> bytes:
+    """Insert a snippet just before </body>"""
+    index = content.rfind(b'</body>')
+    return content[:index] + snippet + content[index:] if index != -1 else content + snippet
+
+
+def best_of(repeat: int, func, *args) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    scraper = EmailEnrichmentScraper()
+
+    def full_parse(content):
+        return scraper.extract_emails_from_soup(BeautifulSoup(content, 'html.parser'))
+
+    def fast_path(content):
+        emails = scraper.prescan_emails(content)
+        return emails if emails is not None else full_parse(content)
+
+    print(f"\n{'='*70}")
+    print("Email Extraction: byte pre-scan vs full parse (best of {})".format(args.repeat))
+    print(f"{'='*70}")
+    for filename in FIXTURES:
+        with open(filename, 'rb') as f:
+            base = f.read()
+        print(f"\n{filename} ({len(base):,} bytes)")
+        for label, snippet in VARIANTS.items():
+            content = inject(base, snippet)
+            parsed = best_of(args.repeat, full_parse, content)
+            scanned = best_of(args.repeat, fast_path, content)
+            fallback = ' (parse fallback)' if scraper.prescan_emails(content) is None else ''
+            same = sorted(fast_path(content)) == sorted(full_parse(content))
+            print(f"  {label:12s}: parse {parsed * 1000:7.1f} ms, pre-scan {scanned * 1000:7.2f} ms "
+                  f"-> {parsed / scanned:6.0f}x, same emails: {same}{fallback}")
+
+
+if __name__ == "__main__":
+    main()
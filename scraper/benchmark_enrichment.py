@@ -0,0 +1,205 @@
+"""
+Benchmark email enrichment against a local fleet of fake company sites
+Each site is its own HTTP server (its own host:port, so per-host politeness
+and connection limits apply as they would to real sites) with a simulated
+network latency. Sites cycle through five layouts:
+  0 - mailto: link on the homepage
+  1 - "Contact Us" link to a page with the email in its text
+  2 - no links, email on /about-us (found by probing the common paths)
+  3 - no email anywhere
+  4 - footer links only (blog, privacy, team), email on /team
+
+Two presets, both run by default:
+  latency    - many more sites than threads on slow servers, with a loose
+               per-host rate: the time goes into waiting on responses, which
+               asyncio overlaps across all sites and a thread pool cannot
+  politeness - fewer sites at 2 requests/second per host: each site's own
+               token bucket paces its probes, so asyncio is held to the
+               slowest site's bucket and the gap narrows (with as many
+               threads as sites the engines finish together)
+Explicit options override the preset values.
+
+Usage: python benchmark_enrichment.py [--preset latency|politeness|all] [--sites 40] [--latency 0.2]
+                                      [--missing-latency 3] [--rate 2] [--threads 10] [--max-in-flight 200]
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from async_enrichment import AsyncEnrichmentEngine
+from email_enrichment_scraper import EmailEnrichmentScraper
+from politeness import PolitenessScheduler
+
+LAYOUTS = 5
+
+PRESETS = {
+    'latency': {'sites': 120, 'latency': 0.5, 'rate': 50.0, 'threads': 10},
+    'politeness': {'sites': 40, 'latency': 0.2, 'rate': 2.0, 'threads': 10},
+}
+
+
+def site_pages(index: int) -> dict:
+    """path -> HTML for one fake company site"""
+    layout = index % LAYOUTS
+    email = f"office@company{index}.net"
+    filler = '<p>Full-service residential property management since 2004.</p>' * 40
+    if layout == 0:
+        home = f'<html><body><h1>Company {index}</h1>{filler}<a href="mailto:{email}">Email us</a></body></html>'
+        return {'/': home}
+    if layout == 1:
+        home = f'<html><body><h1>Company {index}</h1>{filler}<a href="/contact-us">Contact Us</a></body></html>'
+        contact = f'<html><body><h1>Contact</h1><p>Write to {email} or call.</p></body></html>'
+        return {'/': home, '/contact-us': contact}
+    if layout == 2:
+        home = f'<html><body><h1>Company {index}</h1>{filler}</body></html>'
+        about = f'<html><body><h1>About</h1><p>Reach our team at {email}</p></body></html>'
+        return {'/': home, '/about-us': about}
+    if layout == 4:
+        footer = '<footer><a href="/blog">Blog</a> <a href="/privacy">Privacy</a> <a href="/team">Our Team</a></footer>'
+        home = f'<html><body><h1>Company {index}</h1>{filler}{footer}</body></html>'
+        team = f'<html><body><h1>Our Team</h1><p>Questions? {email}</p></body></html>'
+        return {'/': home, '/team': team, '/blog': home}
+    return {'/': f'<html><body><h1>Company {index}</h1>{filler}</body></html>'}
+
+
+class CompanySiteHandler(BaseHTTPRequestHandler):
+    """Serves one site's pages after a fixed delay; unknown paths are 404"""
+    protocol_version = 'HTTP/1.1'  # keep-alive
+
+    def respond(self, include_body: bool):
+        body = self.server.pages.get(self.path.split('?')[0])
+        self.server.requests_served += 1  # on arrival, before the simulated latency
+        time.sleep(self.server.latency if body is not None else self.server.missing_latency)
+        if body is None:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        data = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        if include_body:
+            self.wfile.write(data)
+
+    def do_GET(self):
+        self.respond(True)
+
+    def do_HEAD(self):
+        self.respond(False)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fleet(count: int, latency: float = 0.2, missing_latency: float = None):
+    """
+    Start `count` fake company sites, returns (servers, companies)
+    missing_latency: delay before a 404 (slow dead paths), defaults to latency
+    """
+    servers = []
+    companies = []
+    for i in range(count):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), CompanySiteHandler)
+        server.daemon_threads = True
+        server.pages = site_pages(i)
+        server.latency = latency
+        server.missing_latency = latency if missing_latency is None else missing_latency
+        server.requests_served = 0
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        companies.append({
+            'name': f"Company {i} Property Management",
+            'city': 'Phoenix',
+            'state': 'AZ',
+            'email': None,
+            'website': f"http://127.0.0.1:{server.server_address[1]}/",
+        })
+    return servers, companies
+
+
+def stop_fleet(servers):
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def run(config: argparse.Namespace):
+    """Enrich one fleet with each engine, returns [(label, seconds)], emails found, identical outputs"""
+    def make_scheduler():
+        return PolitenessScheduler(domain_limits={}, default_rate=config.rate)
+
+    servers, companies = start_fleet(config.sites, config.latency, config.missing_latency)
+    results = []
+    outputs = {}
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            input_file = os.path.join(tmp, 'companies.json')
+            with open(input_file, 'w') as f:
+                json.dump(companies, f)
+
+            if not config.skip_threaded:
+                output = os.path.join(tmp, 'threaded.json')
+                scraper = EmailEnrichmentScraper(make_scheduler())
+                start = time.perf_counter()
+                scraper.enrich_json_with_emails(input_file, output, max_workers=config.threads)
+                results.append((f"threads x{config.threads}", time.perf_counter() - start))
+                with open(output) as f:
+                    outputs['threaded'] = f.read()
+
+            output = os.path.join(tmp, 'async.json')
+            engine = AsyncEnrichmentEngine(EmailEnrichmentScraper(make_scheduler()), max_in_flight=config.max_in_flight)
+            start = time.perf_counter()
+            engine.enrich_json_with_emails(input_file, output)
+            results.append((f"asyncio x{config.max_in_flight}", time.perf_counter() - start))
+            with open(output) as f:
+                outputs['async'] = f.read()
+    finally:
+        stop_fleet(servers)
+
+    found = sum(1 for c in json.loads(outputs['async']) if c.get('email'))
+    identical = outputs['threaded'] == outputs['async'] if 'threaded' in outputs else None
+    return results, found, identical
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--preset', choices=sorted(PRESETS) + ['all'], default='all')
+    parser.add_argument('--sites', type=int)
+    parser.add_argument('--latency', type=float, help='Seconds each response is delayed')
+    parser.add_argument('--missing-latency', type=float, default=None,
+                        help='Seconds before a 404 (simulates slow dead paths), defaults to --latency')
+    parser.add_argument('--rate', type=float, help='Per-host politeness rate (requests/second)')
+    parser.add_argument('--threads', type=int, help='Workers for the threaded scraper')
+    parser.add_argument('--max-in-flight', type=int, default=200)
+    parser.add_argument('--skip-threaded', action='store_true')
+    args = parser.parse_args()
+
+    presets = sorted(PRESETS) if args.preset == 'all' else [args.preset]
+    reports = []
+    for preset in presets:
+        config = argparse.Namespace(**{**vars(args), **{key: value for key, value in PRESETS[preset].items()
+                                                        if getattr(args, key) is None}})
+        reports.append((preset, config, *run(config)))
+
+    for preset, config, results, found, identical in reports:
+        print(f"\n{'='*70}")
+        print(f"Enrichment Benchmark [{preset}] ({config.sites} sites, {config.latency}s latency, "
+              f"{config.rate} req/s per host)")
+        print(f"{'='*70}")
+        for label, seconds in results:
+            print(f"  {label:16s}: {seconds:6.1f}s -> {config.sites / seconds * 60:7.1f} sites/minute "
+                  f"({results[0][1] / seconds:4.1f}x)")
+        print(f"  Emails found: {found}/{config.sites}")
+        if identical is not None:
+            print(f"  Output files identical: {identical}")
+
+if __name__ == "__main__":
+    main()
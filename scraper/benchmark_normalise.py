@@ -0,0 +1,125 @@
+"""
+Benchmark vectorised field parsing (normalise_fields.py) against the per-row
+DataFrame.apply functions the analysis scripts used to define, and check both
+give the same numbers (fractions such as "2/3 of the first month's rent" are
+now <NA> rather than $2, and are listed as the differences). Every scraper output CSV is timed by default.
+--scale repeats the rows, so the distinct values (all the vectorised parsers
+see) stay the same: scaled timings overstate the gain on more varied data.
+
+Usage: python benchmark_normalise.py [--csv property_managers_ALL_OTHER_STATES.csv ...] [--scale 1] [--repeat 5]
+"""
+
+import argparse
+import glob
+import re
+import time
+from typing import List
+
+import pandas as pd
+
+from normalise_fields import parse_fee, parse_portfolio, parse_years
+
+
+# The previous per-row implementations, kept here as the reference
+def extract_fee(fee_str):
+    if pd.isna(fee_str):
+        return None
+    numbers = re.findall(r'\$?(\d+(?:,\d+)?(?:\.\d+)?)', str(fee_str))
+    if numbers:
+        return float(numbers[0].replace(',', ''))
+    return None
+
+
+def extract_years(year_str):
+    if pd.isna(year_str):
+        return None
+    numbers = re.findall(r'(\d+)', str(year_str))
+    if numbers:
+        return int(numbers[0])
+    return None
+
+
+def extract_portfolio(portfolio_str):
+    if pd.isna(portfolio_str):
+        return None
+    clean = str(portfolio_str).replace(',', '')
+    numbers = re.findall(r'(\d+)', clean)
+    if numbers:
+        return int(numbers[0])
+    return None
+
+
+def per_row(df):
+    return (df['management_fee'].apply(extract_fee),
+            df['years_in_business'].apply(extract_years),
+            df['rentals_managed'].apply(extract_portfolio))
+
+
+def vectorised(df):
+    return (parse_fee(df['management_fee'])['fee_min'],
+            parse_years(df['years_in_business']),
+            parse_portfolio(df['rentals_managed']))
+
+
+def best_of(repeat: int, func, *args) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def different_values(text: pd.Series, old: pd.Series, new: pd.Series) -> List[str]:
+    """Distinct inputs the two implementations read differently (fractions like "2/3 of rent" are now <NA>)"""
+    old = pd.to_numeric(old, errors='coerce').astype('float64')
+    new = new.astype('float64')
+    return sorted(text[~((old == new) | (old.isna() & new.isna()))].astype(str).unique())
+
+
+def run(path: str, scale: int, repeat: int):
+    df = pd.read_csv(path)
+    if scale > 1:
+        df = pd.concat([df] * scale, ignore_index=True)
+
+    old = per_row(df)
+    new = vectorised(df)
+    labels = ['management_fee', 'years_in_business', 'rentals_managed']
+    parity = {label: different_values(df[label], o, n) for label, o, n in zip(labels, old, new)}
+
+    slow = best_of(repeat, per_row, df)
+    fast = best_of(repeat, vectorised, df)
+
+    fees = parse_fee(df['management_fee'])
+    distinct = df[labels].nunique().sum()
+    print(f"\n{'='*70}")
+    print(f"Field Parsing: per-row apply vs vectorised - {path}")
+    print(f"  {len(df):,} rows x{scale}, {distinct:,} distinct values, best of {repeat}")
+    print(f"{'='*70}")
+    print(f"  per-row apply : {slow * 1000:8.1f} ms")
+    print(f"  vectorised    : {fast * 1000:8.1f} ms -> {slow / fast:.1f}x")
+    for label, different in parity.items():
+        print(f"  {label:18s}: same numbers: {not different}" +
+              (f" (differs on {len(different)}: {different[0][:40]!r}...)" if different else ''))
+    print(f"  Fees parsed: {fees['fee_min'].notna().sum():,} "
+          f"({fees['fee_is_percent'].sum():,} percent of rent, "
+          f"{(fees['fee_max'] > fees['fee_min']).sum():,} ranges)")
+    return len(df), slow / fast
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--csv', nargs='+', default=sorted(glob.glob('property_managers_*.csv')))
+    parser.add_argument('--scale', type=int, default=1, help='Repeat the rows N times for a bigger input')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    results = [(path, *run(path, args.scale, args.repeat)) for path in args.csv]
+    print(f"\n{'='*70}")
+    print("Summary (speedup of vectorised over per-row apply)")
+    print(f"{'='*70}")
+    for path, rows, speedup in results:
+        print(f"  {path:45s} {rows:7,} rows {speedup:5.1f}x")
+
+if __name__ == "__main__":
+    main()
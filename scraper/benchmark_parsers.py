@@ -0,0 +1,52 @@
+"""
+Microbenchmark the parser backends on the saved HTML fixtures
+Reports milliseconds per page for html.parser (BeautifulSoup) and lxml
+
+Usage: python benchmark_parsers.py [--repeat 5]
+"""
+
+import argparse
+import contextlib
+import io
+import time
+
+from final_scraper import FinalPropertyManagerScraper, PARSERS
+
+FIXTURES = ['phoenix_page.html', 'page_sample.html', 'companies_main_page.html']
+
+
+def time_parser(parser: str, content: bytes, repeat: int) -> float:
+    """Best-of-N wall time in seconds for one parse_city_page call"""
+    scraper = FinalPropertyManagerScraper(parser=parser)
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            scraper.parse_city_page(content, 'Phoenix', 'AZ', 'benchmark')
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'='*70}")
+    print(f"Parser Benchmark (best of {args.repeat})")
+    print(f"{'='*70}")
+
+    for filename in FIXTURES:
+        with open(filename, 'rb') as f:
+            content = f.read()
+
+        timings = {name: time_parser(name, content, args.repeat) for name in PARSERS}
+        baseline = timings['html.parser']
+
+        print(f"\n{filename} ({len(content) / 1024:.0f} KB)")
+        for name, seconds in timings.items():
+            print(f"  {name:12s}: {seconds * 1000:8.1f} ms  ({baseline / seconds:4.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Scaling report for the fetch/parse pipeline
+Serves a synthetic corpus (the saved phoenix_page.html and page_sample.html,
+alternating) from a local HTTP server and crawls it sequentially and with
+PipelinedCrawl at 1, 2, 4, ... parse processes up to the core count
+
+Usage: python benchmark_pipeline.py [--pages 40] [--parser lxml] [--max-workers 8]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import time
+
+from benchmark_crawl import build_city_list, start_server
+from final_scraper import FinalPropertyManagerScraper, PARSERS
+from pipeline import PipelinedCrawl
+from politeness import PolitenessScheduler
+
+
+def worker_counts(max_workers: int) -> list:
+    counts = []
+    n = 1
+    while n < max_workers:
+        counts.append(n)
+        n *= 2
+    counts.append(max_workers)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pages', type=int, default=40)
+    parser.add_argument('--parser', choices=PARSERS, default='html.parser')
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--fetch-workers', type=int, default=4)
+    args = parser.parse_args()
+
+    # Politeness is not what is being measured here
+    def make_scraper():
+        scheduler = PolitenessScheduler(domain_limits={}, default_rate=10000, default_burst=100)
+        return FinalPropertyManagerScraper(scheduler, parser=args.parser)
+
+    server, base_url = start_server()
+    city_list = build_city_list(base_url, args.pages)
+    results = []
+
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            df = make_scraper().scrape_multiple_cities(city_list)
+        results.append(('sequential', len(df), time.perf_counter() - start, None))
+
+        for workers in worker_counts(args.max_workers):
+            crawl = PipelinedCrawl(make_scraper(), fetch_workers=args.fetch_workers, parse_workers=workers)
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                df = crawl.scrape_multiple_cities(city_list)
+            results.append((f"{workers} process{'es' if workers > 1 else ''}", len(df),
+                            time.perf_counter() - start, crawl.peak_queued))
+    finally:
+        server.shutdown()
+
+    baseline = results[0][2]
+    print(f"\n{'='*70}")
+    print(f"Pipeline Scaling ({args.pages} pages, {args.parser}, {os.cpu_count()} cores)")
+    print(f"{'='*70}")
+    for label, companies, seconds, peak in results:
+        queued = f"  peak queue {peak}" if peak is not None else ''
+        print(f"  {label:12s}: {companies} companies in {seconds:6.2f}s -> {args.pages / seconds:6.1f} pages/s "
+              f"({baseline / seconds:4.1f}x){queued}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Bounded, streaming page fetches for the scrapers
+A company "website" can be a PDF, a video or a multi-megabyte app bundle.
+These helpers check the Content-Type before reading any of the body, stream it
+in chunks, stop at a byte cap, and can return as soon as a complete mailto:
+link has arrived, so memory and bandwidth per page stay bounded.
+"""
+
+import re
+from typing import Optional
+
+import requests
+
+from enrichment_outcomes import NOT_HTML, FetchError
+
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024
+CHUNK_SIZE = 16 * 1024
+
+# Bodies worth reading; a missing Content-Type is given the benefit of the doubt
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml', 'text/plain')
+
+# A mailto: link whose address has been fully received (its terminator is in the buffer)
+COMPLETE_MAILTO_PATTERN = re.compile(rb'(?i:href)\s*=\s*["\']?mailto:[^"\'\s>]*["\'\s>]')
+# Rescanned tail of the previous chunks, so a link split across chunks is still found
+MAILTO_OVERLAP = 512
+
+
+def check_content_type(content_type: Optional[str]):
+    """Raise FetchError(NOT_HTML) unless the response can hold an HTML page"""
+    if not content_type:
+        return
+    media_type = content_type.split(';')[0].strip().lower()
+    if media_type not in HTML_CONTENT_TYPES:
+        raise FetchError(NOT_HTML, f"Content-Type {media_type}")
+
+
+class BoundedBody:
+    """
+    A streamed body, kept to at most max_bytes
+    With stop_at_mailto, reading is done as soon as a complete mailto: link is in
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, stop_at_mailto: bool = False):
+        self.data = bytearray()
+        self.max_bytes = max_bytes
+        self.stop_at_mailto = stop_at_mailto
+        self.truncated = False
+        self.stopped_early = False
+        self.scanned = 0
+
+    def feed(self, chunk: bytes) -> bool:
+        """Append a chunk, True once the rest of the body should not be read"""
+        room = self.max_bytes - len(self.data)
+        self.data += chunk[:room]
+        if len(self.data) >= self.max_bytes:
+            self.truncated = True
+            return True
+
+        if self.stop_at_mailto:
+            if COMPLETE_MAILTO_PATTERN.search(self.data, max(0, self.scanned - MAILTO_OVERLAP)):
+                self.stopped_early = True
+                return True
+            self.scanned = len(self.data)
+        return False
+
+    def content(self) -> bytes:
+        return bytes(self.data)
+
+
+def fetch_bounded(session: requests.Session, url: str, timeout: float,
+                  max_bytes: int = DEFAULT_MAX_BYTES, stop_at_mailto: bool = False,
+                  stream: bool = True) -> bytes:
+    """
+    GET url reading at most max_bytes of an HTML body
+    Raises requests errors as usual, FetchError(NOT_HTML) for other content types
+    stream=False lets a caching adapter answer (it ignores streamed requests);
+    the cap then applies to what is returned rather than to what is downloaded
+    """
+    response = session.get(url, timeout=timeout, stream=stream)
+    try:
+        response.raise_for_status()
+        check_content_type(response.headers.get('Content-Type'))
+        body = BoundedBody(max_bytes, stop_at_mailto)
+        for chunk in response.iter_content(CHUNK_SIZE):
+            if body.feed(chunk):
+                break
+        return body.content()
+    finally:
+        # Unread bytes are never downloaded: the connection is dropped, not drained
+        response.close()
+
+
+async def read_bounded_async(response, max_bytes: int = DEFAULT_MAX_BYTES,
+                             stop_at_mailto: bool = False) -> bytes:
+    """fetch_bounded for an aiohttp response that has just arrived"""
+    check_content_type(response.headers.get('Content-Type'))
+    body = BoundedBody(max_bytes, stop_at_mailto)
+    async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+        if body.feed(chunk):
+            break
+    return body.content()
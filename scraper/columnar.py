@@ -0,0 +1,230 @@
+"""
+Typed columnar (Parquet) storage for scraped companies
+A dataset is a directory partitioned by state (companies.parquet/state=CA/part-00000.parquet)
+with a fixed schema: low-cardinality text (state, city, bbb_rating,
+service_types, source_*) is dictionary-encoded and loads as pandas categoricals,
+and the fee/years/portfolio text is stored next to its parsed numbers
+(normalise_fields.py), so analyses read only the columns and states they need
+instead of re-parsing all-string CSVs.
+
+pyarrow is optional: CSV/JSON output and CSV loading work without it.
+
+Usage:
+    python columnar.py convert property_managers_CA_FL_DC_METRO.csv property_managers_CA_FL_DC_METRO.parquet
+    python columnar.py info property_managers_CA_FL_DC_METRO.parquet
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import time
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from company_record import new_company_record
+from normalise_fields import add_numeric_columns
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet paths only; everything else keeps working
+    pa = None
+
+PARTITION_COLUMN = 'state'
+CATEGORICAL_COLUMNS = ['state', 'city', 'service_types', 'bbb_rating', 'source_city', 'source_state', 'source_url']
+NUMERIC_COLUMNS = {
+    'fee_min': 'float64',
+    'fee_max': 'float64',
+    'fee_is_percent': 'bool',
+    'years_numeric': 'int64',
+    'portfolio_numeric': 'int64',
+}
+# Parsed column -> the text column it comes from
+DERIVED_FROM = {
+    'fee_min': 'management_fee',
+    'fee_max': 'management_fee',
+    'fee_is_percent': 'management_fee',
+    'years_numeric': 'years_in_business',
+    'portfolio_numeric': 'rentals_managed',
+}
+RECORD_COLUMNS = list(new_company_record('', '', ''))
+COLUMNS = RECORD_COLUMNS + list(NUMERIC_COLUMNS)
+PART_PATTERN = re.compile(r'part-(\d+)\.parquet$')
+# Nulls stay <NA> in the same nullable dtypes normalise_fields produces
+ARROW_TO_PANDAS = {} if pa is None else {
+    pa.string(): pd.StringDtype(),
+    pa.float64(): pd.Float64Dtype(),
+    pa.int64(): pd.Int64Dtype(),
+    pa.bool_(): pd.BooleanDtype(),
+}
+
+
+def require_pyarrow():
+    if pa is None:
+        raise ImportError("Parquet output needs pyarrow: pip install pyarrow")
+
+
+def company_schema() -> 'pa.Schema':
+    """Schema of a full record; the partition column is dropped from the files themselves"""
+    require_pyarrow()
+    fields = []
+    for column in COLUMNS:
+        if column in CATEGORICAL_COLUMNS:
+            fields.append(pa.field(column, pa.dictionary(pa.int32(), pa.string())))
+        elif column in NUMERIC_COLUMNS:
+            fields.append(pa.field(column, pa.type_for_alias(NUMERIC_COLUMNS[column])))
+        else:
+            fields.append(pa.field(column, pa.string()))
+    return pa.schema(fields)
+
+
+def _extras_text(extras):
+    """Unmapped list items are stored as JSON text, as CSVSink does"""
+    if isinstance(extras, (dict, list)):
+        return json.dumps(extras) if extras else None
+    return extras
+
+
+def text_to_typed(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Text columns as nullable strings plus the numbers parsed from them
+    Only the columns df has are typed and parsed; none are added
+    """
+    if 'extras' in df:
+        df = df.assign(extras=df['extras'].map(_extras_text))
+    columns = list(df.columns)
+    df = add_numeric_columns(df.astype('string'))
+    return df[columns + [column for column in NUMERIC_COLUMNS if column in df and column not in columns]]
+
+
+def records_to_frame(records) -> pd.DataFrame:
+    """Records (or a DataFrame of them) -> DataFrame of COLUMNS, the fixed schema the Parquet sinks write"""
+    return text_to_typed(pd.DataFrame(records).reindex(columns=RECORD_COLUMNS))[COLUMNS]
+
+
+def frame_to_table(df: pd.DataFrame) -> 'pa.Table':
+    return pa.Table.from_pandas(df[COLUMNS], schema=company_schema(), preserve_index=False)
+
+
+def _typed(df: pd.DataFrame) -> pd.DataFrame:
+    """CATEGORICAL_COLUMNS as categoricals of the values present, sorted like the CSV loads them"""
+    for column in df.columns:
+        if column in CATEGORICAL_COLUMNS:
+            values = df[column].astype('category')
+            df[column] = values.cat.set_categories(sorted(values.dropna().unique()))
+    return df
+
+
+def partition_dir(path: str, value) -> str:
+    value = '__HIVE_DEFAULT_PARTITION__' if value is None else str(value)
+    return os.path.join(path, f"{PARTITION_COLUMN}={value}")
+
+
+def next_part_number(path: str) -> int:
+    numbers = [int(match.group(1)) for match in
+               (PART_PATTERN.search(name) for name in glob.glob(os.path.join(path, '*', 'part-*.parquet')))
+               if match]
+    return max(numbers, default=-1) + 1
+
+
+def write_dataset(df: pd.DataFrame, path: str):
+    """Write a whole DataFrame (already through records_to_frame) as a partitioned dataset"""
+    from sinks import ParquetSink
+
+    with ParquetSink(path) as sink:
+        sink.write_frame(df)
+    return sink.count
+
+
+def open_dataset(path: str) -> 'ds.Dataset':
+    require_pyarrow()
+    partitioning = ds.HivePartitioning.discover(infer_dictionary=True)
+    return ds.dataset(path, format='parquet', partitioning=partitioning)
+
+
+def load_companies(path: str, columns: Optional[List[str]] = None,
+                   states: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Load companies from a Parquet dataset, CSV or JSON with typed columns
+    Parquet reads only the requested columns and the partitions of `states`;
+    text files are parsed in full and typed the same way, keeping the columns
+    the file has (no missing record columns are filled in)
+    """
+    if os.path.isdir(path) or path.endswith('.parquet'):
+        dataset = open_dataset(path)
+        row_filter = ds.field(PARTITION_COLUMN).isin(states) if states else None
+        table = dataset.to_table(columns=columns, filter=row_filter)
+        df = table.to_pandas(types_mapper=ARROW_TO_PANDAS.get)
+        if columns is None:
+            df = df[[column for column in COLUMNS if column in df.columns]]
+        return _typed(df)
+
+    if path.endswith('.json'):
+        df = pd.read_json(path, orient='records', dtype=False)
+    else:
+        text_columns = None
+        if columns is not None:
+            wanted = {DERIVED_FROM.get(column, column) for column in columns} | {PARTITION_COLUMN}
+            text_columns = lambda column: column in wanted
+        df = pd.read_csv(path, usecols=text_columns, dtype=str)
+    if states:
+        df = df[df[PARTITION_COLUMN].isin(states)]
+    df = _typed(text_to_typed(df))
+    return (df[columns] if columns is not None else df).reset_index(drop=True)
+
+
+def convert(source: str, target: str) -> int:
+    """CSV/JSON output -> partitioned Parquet dataset; returns the row count"""
+    require_pyarrow()
+    if source.endswith('.json'):
+        df = pd.read_json(source, orient='records', dtype=False)
+    else:
+        df = pd.read_csv(source, dtype=str)
+    return write_dataset(records_to_frame(df), target)
+
+
+def dataset_size(path: str) -> int:
+    return sum(os.path.getsize(name) for name in glob.glob(os.path.join(path, '*', '*.parquet')))
+
+
+def info(path: str):
+    dataset = open_dataset(path)
+    counts = dataset.to_table(columns=[PARTITION_COLUMN]).column(PARTITION_COLUMN).to_pandas().value_counts()
+    print(f"\n{'='*70}")
+    print(f"Parquet dataset: {path}")
+    print(f"{'='*70}")
+    print(f"  Rows:       {counts.sum():,} in {len(dataset.files)} files ({dataset_size(path) / 1024:,.0f} KB)")
+    print(f"  Partitions: {', '.join(f'{state} ({count:,})' for state, count in counts.sort_index().items())}")
+    print(f"  Schema:")
+    for field in dataset.schema:
+        print(f"    {field.name:22s} {field.type}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Typed Parquet datasets of scraped companies')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    convert_parser = commands.add_parser('convert', help='CSV/JSON output -> Parquet dataset partitioned by state')
+    convert_parser.add_argument('source')
+    convert_parser.add_argument('target')
+
+    info_parser = commands.add_parser('info', help='Rows per state and schema of a dataset')
+    info_parser.add_argument('path')
+
+    args = parser.parse_args()
+
+    if args.command == 'convert':
+        start = time.perf_counter()
+        count = convert(args.source, args.target)
+        print(f"Wrote {count:,} companies to {args.target} in {time.perf_counter() - start:.2f}s "
+              f"({os.path.getsize(args.source) / 1024:,.0f} KB -> {dataset_size(args.target) / 1024:,.0f} KB)")
+    elif args.command == 'info':
+        info(args.path)
+
+
+if __name__ == "__main__":
+    main()
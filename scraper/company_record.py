@@ -0,0 +1,196 @@
+"""
+Company record construction shared by all parser backends
+Backends only walk their own tree and hand over plain strings, so every
+backend produces byte-identical records
+"""
+
+import re
+from typing import Dict, List, Optional
+
+# H2s that are page furniture rather than companies
+SKIP_KEYWORDS = ['table of contents', 'faq', 'conclusion', 'summary', 'introduction', 'overview']
+
+WEBSITE_LINK_PATTERN = re.compile(r'Go to website', re.IGNORECASE)
+WHITESPACE_PATTERN = re.compile(r'\s+')
+ZIP_PATTERN = re.compile(r'\b(\d{5}(?:-\d{4})?)\b')
+
+
+class CompanySection:
+    """
+    One company's elements: the <h2> plus the <p> and <ul> siblings up to the
+    next <hr>, classified as they are collected so extraction never re-scans them
+    """
+
+    __slots__ = ('heading', 'paragraphs', 'lists')
+
+    def __init__(self, heading):
+        self.heading = heading
+        self.paragraphs = []
+        self.lists = []
+
+    def add(self, element, name: str):
+        if name == 'p':
+            self.paragraphs.append(element)
+        elif name == 'ul':
+            self.lists.append(element)
+
+    @classmethod
+    def from_elements(cls, elements: List, name_of=lambda elem: elem.name):
+        """Build a section from the old [<h2>, <p>, <ul>, ...] element list"""
+        section = cls(elements[0])
+        for element in elements[1:]:
+            section.add(element, name_of(element))
+        return section
+
+
+def new_company_record(city_name: str, state: str, url: str) -> Dict:
+    """Empty record with every column in output order"""
+    return {
+        'name': None,
+        'address': None,
+        'city': city_name,
+        'state': state,
+        'zip_code': None,
+        'phone': None,
+        'email': None,
+        'website': None,
+        'description': None,
+        'service_types': None,
+        'years_in_business': None,
+        'rentals_managed': None,
+        'bbb_rating': None,
+        'management_fee': None,
+        'tenant_placement_fee': None,
+        'lease_renewal_fee': None,
+        'miscellaneous_fees': None,
+        'source_city': city_name,
+        'source_state': state,
+        'source_url': url,
+        'extras': None,  # dict of <li> keys that match no column
+    }
+
+
+def is_company_name(name: str) -> bool:
+    """False for empty/short names and headings like 'Table of Contents' or 'FAQ'"""
+    if not name or len(name) < 3:
+        return False
+    lowered = name.lower()
+    return not any(keyword in lowered for keyword in SKIP_KEYWORDS)
+
+
+def clean_description(text: str) -> str:
+    """Collapse runs of whitespace in a paragraph's text"""
+    return WHITESPACE_PATTERN.sub(' ', text)
+
+
+def extract_zip(address: str) -> Optional[str]:
+    """5 or 9 digit ZIP code from an address"""
+    zip_match = ZIP_PATTERN.search(address)
+    return zip_match.group(1) if zip_match else None
+
+
+# Declarative <li> key mapping, in priority order: the first rule with an
+# alias contained in the lower-cased key wins (e.g. "email address" -> address).
+# (aliases, target column, normaliser or None)
+FIELD_RULES = [
+    (('address',), 'address', None),
+    (('phone',), 'phone', None),
+    (('service type',), 'service_types', None),
+    (('years in business', 'years experience'), 'years_in_business', None),
+    (('rentals managed', 'properties managed'), 'rentals_managed', None),
+    (('better business bureau', 'bbb'), 'bbb_rating', None),
+    (('management fee',), 'management_fee', None),
+    (('tenant placement fee', 'placement fee'), 'tenant_placement_fee', None),
+    (('lease renewal fee', 'renewal fee'), 'lease_renewal_fee', None),
+    (('miscellaneous fee', 'misc', 'other fee'), 'miscellaneous_fees', None),
+    (('email',), 'email', None),
+]
+
+# Columns filled from another column's mapped value
+DERIVED_FIELDS = {
+    'address': [('zip_code', extract_zip)],
+}
+
+
+class FieldMapper:
+    """
+    Compiles FIELD_RULES into one anchored alternation regex: each branch is a
+    lookahead for one rule's aliases, so branches are tried in rule order and
+    the first match names the rule. Resolved keys are memoised, so each list
+    item costs a single dict lookup however many rules there are. Keys that
+    match no rule are collected in the record's 'extras' dict.
+    """
+
+    def __init__(self, rules: List = FIELD_RULES, derived: Dict = DERIVED_FIELDS, cache_size: int = 4096):
+        self.rules = rules
+        self.derived = derived
+        self.cache_size = cache_size
+        self.cache = {}
+        branches = [
+            '(?=.*?(?:{}))(?P<r{}>)'.format('|'.join(re.escape(alias) for alias in aliases), i)
+            for i, (aliases, _, _) in enumerate(rules)
+        ]
+        self.pattern = re.compile('^(?:{})'.format('|'.join(branches)), re.DOTALL)
+
+    def resolve(self, key: str):
+        """(column, normaliser) for a lower-cased key, or None if unmapped"""
+        try:
+            return self.cache[key]
+        except KeyError:
+            pass
+
+        match = self.pattern.match(key)
+        target = None
+        if match:
+            _, column, normaliser = self.rules[int(match.lastgroup[1:])]
+            target = (column, normaliser)
+
+        if len(self.cache) < self.cache_size:
+            self.cache[key] = target
+        return target
+
+    def apply(self, data: Dict, text: str):
+        """Store one '<key>: <value>' list item in the matching column"""
+        # Parse key-value pairs
+        if ':' not in text:
+            return
+
+        key, value = text.split(':', 1)
+        key = key.strip().lower()
+        value = value.strip()
+
+        target = self.resolve(key)
+        if target is None:
+            if data['extras'] is None:
+                data['extras'] = {}
+            data['extras'][key] = value
+            return
+
+        column, normaliser = target
+        data[column] = normaliser(value) if normaliser else value
+
+        for derived_column, derive in self.derived.get(column, ()):
+            derived_value = derive(value)
+            if derived_value is not None:
+                data[derived_column] = derived_value
+
+
+DEFAULT_FIELD_MAPPER = FieldMapper()
+
+
+def build_company_record(name: str, website: Optional[str], description_parts: List[str],
+                         detail_texts: List[str], city_name: str, state: str, url: str,
+                         mapper: FieldMapper = DEFAULT_FIELD_MAPPER) -> Dict:
+    """
+    Assemble a record from the strings a backend pulled out of one section:
+    the <h2> name, the "Go to website" href, description paragraphs and <li> texts
+    """
+    data = new_company_record(city_name, state, url)
+    data['name'] = name
+    data['website'] = website
+    data['description'] = ' '.join(description_parts) if description_parts else None
+
+    for text in detail_texts:
+        mapper.apply(data, text)
+
+    return data
@@ -0,0 +1,316 @@
+"""
+Entity resolution for scraped companies
+The same company is listed on several city pages and across output files.
+Rows are normalised (phone digits, website domain and path, name without
+legal suffixes or trade words like "Property Management", abbreviated
+address, state) and exact repeats collapse into one profile.
+Profiles are only compared within blocks that share a phone, a website,
+or a zip prefix plus the first letters of the name, which keeps comparisons near-linear.
+A website only counts as shared when the path matches too and the domain is
+not a multi-tenant host (franchise directories, site builders, social pages:
+domains carrying more than max_domain_names different names in the data).
+Within a block, names and addresses are fuzzy-matched with difflib, profiles
+in different states never match, and matches are joined with union-find
+into one company_id per company.
+
+Usage: python dedupe.py [files ...] [--output property_managers_deduped.csv] [--unique property_managers_unique.csv]
+"""
+
+import argparse
+import re
+import time
+from collections import defaultdict
+from difflib import SequenceMatcher
+from typing import List, Optional
+from urllib.parse import urlparse
+
+import pandas as pd
+
+from enrichment_outcomes import domain_of
+
+DEFAULT_FILES = [
+    'property_managers_CA_FL_DC.csv',
+    'property_managers_ALL_OTHER_STATES.csv',
+    'property_managers_REMAINING_STATES.csv',
+]
+
+NAME_SUFFIXES = {'llc', 'inc', 'co', 'corp', 'corporation', 'company', 'ltd', 'pllc', 'lp', 'the'}
+# Words most names in this trade share; names are compared without them
+GENERIC_NAME_WORDS = {'property', 'properties', 'management', 'managers', 'manager', 'mgmt', 'pm',
+                      'realty', 'real', 'estate', 'group', 'rental', 'rentals', 'residential', 'homes',
+                      'home', 'services', 'service', 'leasing', 'investments', 'solutions', 'and', 'of'}
+ADDRESS_ABBREVIATIONS = {
+    'street': 'st', 'avenue': 'ave', 'road': 'rd', 'drive': 'dr', 'boulevard': 'blvd', 'lane': 'ln',
+    'court': 'ct', 'place': 'pl', 'parkway': 'pkwy', 'highway': 'hwy', 'suite': 'ste', 'floor': 'fl',
+    'north': 'n', 'south': 's', 'east': 'e', 'west': 'w',
+}
+NON_WORD_PATTERN = re.compile(r'[^a-z0-9]+')
+# '..., Los Angeles, CA 90015' -> 'CA'
+ADDRESS_STATE_PATTERN = re.compile(r'\b([A-Z]{2}),?\s+\d{5}(?:-\d{4})?\s*$')
+
+NAME_MATCH = 0.6  # names of rows sharing a phone or website
+STRONG_NAME_MATCH = 0.85  # names of rows with no shared contact, whose addresses also match:
+ADDRESS_MATCH = 0.8  # fuzzily when a phone is missing, exactly when the phones differ
+NAME_PREFIX = 4  # letters of the name in the zip block key
+MAX_BLOCK = 1000  # larger blocks (placeholder phones, chains) are skipped for that key
+MAX_DOMAIN_NAMES = 3  # more different names on one domain: a multi-tenant host, no evidence
+
+
+def normalise_phone(phone) -> Optional[str]:
+    """'(213) 722-6030' / '+1 213.722.6030' -> '2137226030'; None unless 10 digits remain"""
+    if not isinstance(phone, str):
+        return None
+    digits = re.sub(r'\D', '', phone)
+    if len(digits) == 11 and digits.startswith('1'):
+        digits = digits[1:]
+    return digits if len(digits) == 10 else None
+
+
+def normalise_name(name) -> str:
+    """'The Smith Co., LLC' -> 'smith'; '&' reads as 'and'"""
+    if not isinstance(name, str):
+        return ''
+    words = NON_WORD_PATTERN.sub(' ', name.lower().replace('&', ' and ')).split()
+    return ' '.join(word for word in words if word not in NAME_SUFFIXES)
+
+
+def core_name(name) -> str:
+    """
+    normalise_name without the trade words: 'AP Property Management' -> 'ap';
+    a name made only of them is kept whole ('Property Management Inc' -> 'property management')
+    """
+    name = normalise_name(name)
+    core = ' '.join(word for word in name.split() if word not in GENERIC_NAME_WORDS)
+    return core or name
+
+
+def normalise_address(address) -> str:
+    """'1150 S. Olive Street, Suite 10' -> '1150 s olive st ste 10'"""
+    if not isinstance(address, str):
+        return ''
+    words = NON_WORD_PATTERN.sub(' ', address.lower().replace('#', ' ste ')).split()
+    return ' '.join(ADDRESS_ABBREVIATIONS.get(word, word) for word in words)
+
+
+def normalise_state(address, state) -> Optional[str]:
+    """The state in the address ('..., CA 90015'), else the listing's state column"""
+    if isinstance(address, str):
+        match = ADDRESS_STATE_PATTERN.search(address.strip())
+        if match:
+            return match.group(1)
+    return (state.strip().upper() or None) if isinstance(state, str) else None
+
+
+def normalise_website(website) -> Optional[str]:
+    """'https://www.Acme.com/Tucson/?utm_source=x' -> 'acme.com/tucson': domain and path, no query"""
+    if not isinstance(website, str) or not website.strip():
+        return None
+    website = website.strip()
+    url = urlparse(website if '://' in website else 'https://' + website)
+    domain = domain_of(url.geturl())
+    return domain + url.path.lower().rstrip('/') if domain else None
+
+
+def similar(a: str, b: str, minimum: float) -> bool:
+    """difflib ratio >= minimum, checking the cheap upper bounds first"""
+    if not a or not b:
+        return False
+    if a == b:
+        return True
+    matcher = SequenceMatcher(None, a, b, autojunk=False)
+    return (matcher.real_quick_ratio() >= minimum and matcher.quick_ratio() >= minimum
+            and matcher.ratio() >= minimum)
+
+
+class Profile:
+    """One distinct normalised company row"""
+
+    __slots__ = ('name', 'sorted_name', 'address', 'phone', 'website', 'zip_prefix', 'state')
+
+    def __init__(self, name: str, address: str, phone: Optional[str], website: Optional[str], zip_code,
+                 state: Optional[str] = None):
+        self.name = name  # core_name
+        self.sorted_name = ' '.join(sorted(name.split()))  # word order does not matter
+        self.address = address
+        self.phone = phone
+        self.website = website  # normalise_website, None on a multi-tenant domain
+        digits = re.sub(r'\D', '', zip_code) if isinstance(zip_code, str) else ''
+        self.zip_prefix = digits[:3] if len(digits) >= 5 else None
+        self.state = state
+
+    def blocking_keys(self) -> List[str]:
+        keys = []
+        if self.phone:
+            keys.append(f"phone:{self.phone}")
+        if self.website:
+            keys.append(f"website:{self.website}")
+        if self.zip_prefix and self.name:
+            # 'Oak Tree ...' and 'Oaktree ...' share the first letters, not the first word
+            keys.append(f"zip:{self.zip_prefix}:{self.name.replace(' ', '')[:NAME_PREFIX]}")
+        return keys
+
+    def similar_name(self, other: 'Profile', minimum: float) -> bool:
+        return similar(self.name, other.name, minimum) or similar(self.sorted_name, other.sorted_name, minimum)
+
+    def matches(self, other: 'Profile') -> bool:
+        if self.state and other.state and self.state != other.state:
+            return False
+        shared_contact = ((self.phone is not None and self.phone == other.phone)
+                          or (self.website is not None and self.website == other.website))
+        if shared_contact:
+            return self.similar_name(other, NAME_MATCH)
+        if self.phone and other.phone:
+            # Different phones: only the same office listed with another line
+            return self.address == other.address and self.similar_name(other, STRONG_NAME_MATCH)
+        return similar(self.address, other.address, ADDRESS_MATCH) and self.similar_name(other, STRONG_NAME_MATCH)
+
+
+class UnionFind:
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, item: int) -> int:
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]  # path halving
+            item = parent[item]
+        return item
+
+    def union(self, a: int, b: int) -> bool:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return False
+        self.parent[max(root_a, root_b)] = min(root_a, root_b)
+        return True
+
+
+class CompanyDeduplicator:
+    """
+    max_block: blocks with more profiles than this are skipped for that key
+    max_domain_names: domains carrying more different names are multi-tenant hosts
+    stats: rows, profiles, blocks, skipped_blocks, shared_domains, comparisons, matches, companies
+    """
+
+    def __init__(self, max_block: int = MAX_BLOCK, max_domain_names: int = MAX_DOMAIN_NAMES):
+        self.max_block = max_block
+        self.max_domain_names = max_domain_names
+        self.shared_domains = set()
+        self.stats = {}
+
+    def profiles(self, df: pd.DataFrame):
+        """Row -> profile number, and the distinct profiles"""
+        columns = [df[column] if column in df else pd.Series(None, index=df.index, dtype=object)
+                   for column in ('name', 'address', 'phone', 'website', 'zip_code', 'state')]
+        keys = [(core_name(name), normalise_address(address), normalise_phone(phone),
+                 normalise_website(website), zip_code if isinstance(zip_code, str) else None,
+                 normalise_state(address, state))
+                for name, address, phone, website, zip_code, state in zip(*columns)]
+        codes, uniques = pd.factorize(pd.Series(keys, dtype=object))
+        profiles = [Profile(*key) for key in uniques]
+
+        names_per_domain = defaultdict(set)
+        for profile in profiles:
+            if profile.website:
+                names_per_domain[profile.website.split('/')[0]].add(profile.name)
+        self.shared_domains = {domain for domain, names in names_per_domain.items()
+                               if len(names) > self.max_domain_names}
+        for profile in profiles:
+            if profile.website and profile.website.split('/')[0] in self.shared_domains:
+                profile.website = None
+        return codes, profiles
+
+    def company_ids(self, df: pd.DataFrame) -> pd.Series:
+        """company_id per row of df: rows of the same company share the id of its first row"""
+        codes, profiles = self.profiles(df)
+        blocks = defaultdict(list)
+        for number, profile in enumerate(profiles):
+            for key in profile.blocking_keys():
+                blocks[key].append(number)
+
+        clusters = UnionFind(len(profiles))
+        comparisons = matches = skipped = 0
+        for members in blocks.values():
+            if len(members) > self.max_block:
+                skipped += 1
+                continue
+            for i, first in enumerate(members):
+                for second in members[i + 1:]:
+                    if clusters.find(first) == clusters.find(second):
+                        continue  # already joined through another block
+                    comparisons += 1
+                    if profiles[first].matches(profiles[second]):
+                        clusters.union(first, second)
+                        matches += 1
+
+        roots = [clusters.find(number) for number in range(len(profiles))]
+        company_ids = pd.Series(pd.factorize(pd.Series(roots).take(codes))[0], index=df.index, name='company_id')
+        self.stats = {'rows': len(df), 'profiles': len(profiles), 'blocks': len(blocks),
+                      'skipped_blocks': skipped, 'shared_domains': len(self.shared_domains),
+                      'comparisons': comparisons, 'matches': matches,
+                      'companies': int(company_ids.nunique())}
+        return company_ids
+
+
+def add_company_ids(df: pd.DataFrame, deduplicator: Optional[CompanyDeduplicator] = None) -> pd.DataFrame:
+    """Add company_id and cluster_size to df in place"""
+    df['company_id'] = (deduplicator or CompanyDeduplicator()).company_ids(df)
+    df['cluster_size'] = df.groupby('company_id')['company_id'].transform('size')
+    return df
+
+
+def unique_companies(df: pd.DataFrame) -> pd.DataFrame:
+    """One row per company_id: the one with the most fields filled (first on ties)"""
+    filled = df.notna().sum(axis=1)
+    order = filled.sort_values(ascending=False, kind='stable').index
+    return df.loc[order].drop_duplicates('company_id').sort_values('company_id')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cluster scraped companies into company IDs')
+    parser.add_argument('files', nargs='*', default=DEFAULT_FILES)
+    parser.add_argument('--output', default='property_managers_deduped.csv',
+                        help='Every row with company_id and cluster_size')
+    parser.add_argument('--unique', help='Also write the most complete row of each company here')
+    parser.add_argument('--max-block', type=int, default=MAX_BLOCK)
+    parser.add_argument('--max-domain-names', type=int, default=MAX_DOMAIN_NAMES,
+                        help='Domains carrying more different names are treated as multi-tenant hosts')
+    args = parser.parse_args()
+
+    print("="*70)
+    print("Company Deduplication")
+    print("="*70)
+
+    frames = []
+    for path in args.files:
+        frame = pd.read_csv(path, dtype=str)
+        frame['source_file'] = path
+        frames.append(frame)
+        print(f"  {path}: {len(frame):,} rows")
+    df = pd.concat(frames, ignore_index=True)
+
+    start = time.perf_counter()
+    deduplicator = CompanyDeduplicator(args.max_block, args.max_domain_names)
+    add_company_ids(df, deduplicator)
+    elapsed = time.perf_counter() - start
+
+    stats = deduplicator.stats
+    print(f"\n{stats['rows']:,} rows -> {stats['profiles']:,} distinct profiles -> "
+          f"{stats['companies']:,} companies in {elapsed:.2f}s")
+    print(f"  Blocks: {stats['blocks']:,} ({stats['skipped_blocks']} over {args.max_block} skipped), "
+          f"{stats['comparisons']:,} comparisons, {stats['matches']:,} matches")
+    print(f"  Multi-tenant domains (no evidence): {stats['shared_domains']:,}")
+
+    largest = df.drop_duplicates('company_id').nlargest(5, 'cluster_size')
+    print(f"\nLargest clusters:")
+    for _, row in largest.iterrows():
+        print(f"  {row['cluster_size']:4d} rows: {row['name']}")
+
+    df.to_csv(args.output, index=False, encoding='utf-8')
+    print(f"\nData saved to {args.output}")
+    if args.unique:
+        unique_companies(df).to_csv(args.unique, index=False, encoding='utf-8')
+        print(f"Data saved to {args.unique}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Shared DNS cache for the asyncio enrichment engine
+Every company website is a different host, so aiohttp's per-connector cache
+rarely gets a hit within one site's handful of requests and never remembers
+failures. CachingResolver sits between the connector and the real resolver:
+answers are kept for `ttl` seconds, failed lookups (NXDOMAIN, no address) for
+`negative_ttl`, and concurrent lookups of the same name share one query.
+`prefetch` warms it with the hosts workers are about to visit.
+"""
+
+import asyncio
+import socket
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import aiohttp
+from aiohttp.abc import AbstractResolver
+
+
+def host_and_port(url: str) -> Tuple[str, int]:
+    """The (host, port) a connection to url resolves"""
+    parsed = urlparse(url)
+    return parsed.hostname or '', parsed.port or (443 if parsed.scheme == 'https' else 80)
+
+
+class CachingResolver(AbstractResolver):
+    """
+    inner: the resolver doing the real lookups (default: aiohttp's threaded getaddrinfo)
+    ttl / negative_ttl: seconds answers / failures are reused
+    max_entries: cache size; expired entries go first, then the oldest
+    """
+
+    def __init__(self, inner: Optional[AbstractResolver] = None, ttl: float = 300,
+                 negative_ttl: float = 60, max_entries: int = 50000):
+        self.inner = inner
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.entries = {}  # (host, port, family) -> (expires_at, addresses or exception)
+        self.in_flight = {}  # (host, port, family) -> Future of a lookup in progress
+        self.stats = {'hits': 0, 'negative_hits': 0, 'misses': 0, 'shared': 0, 'prefetched': 0}
+
+    async def resolve(self, host: str, port: int = 0, family: socket.AddressFamily = socket.AF_INET):
+        key = (host, port, family)
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            answer = entry[1]
+            if isinstance(answer, BaseException):
+                self.stats['negative_hits'] += 1
+                raise type(answer)(*answer.args)
+            self.stats['hits'] += 1
+            return answer
+
+        lookup = self.in_flight.get(key)
+        if lookup is not None:
+            self.stats['shared'] += 1
+            return await asyncio.shield(lookup)
+
+        self.stats['misses'] += 1
+        lookup = asyncio.get_running_loop().create_future()
+        self.in_flight[key] = lookup
+        try:
+            # ThreadedResolver binds the running loop, so it is made per lookup
+            inner = self.inner or aiohttp.ThreadedResolver()
+            answer = await inner.resolve(host, port, family)
+        except OSError as e:
+            # Covers socket.gaierror: the name does not exist or has no address
+            self._store(key, self.negative_ttl, e)
+            lookup.set_exception(e)
+            lookup.exception()  # retrieved here, so unshared failures are not logged
+            raise
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                lookup.cancel()
+            else:
+                lookup.set_exception(e)
+                lookup.exception()
+            raise
+        else:
+            self._store(key, self.ttl, answer)
+            lookup.set_result(answer)
+            return answer
+        finally:
+            del self.in_flight[key]
+
+    async def prefetch(self, url: str, family: socket.AddressFamily = socket.AF_UNSPEC):
+        """Resolve url's host ahead of its first request; failures are cached too"""
+        host, port = host_and_port(url)
+        if not host:
+            return
+        entry = self.entries.get((host, port, family))
+        if entry is not None and entry[0] > time.monotonic():
+            return
+        self.stats['prefetched'] += 1
+        try:
+            await self.resolve(host, port, family)
+        except OSError:
+            pass
+
+    def _store(self, key, ttl: float, answer):
+        if len(self.entries) >= self.max_entries:
+            now = time.monotonic()
+            for stale in [k for k, (expires_at, _) in self.entries.items() if expires_at <= now]:
+                del self.entries[stale]
+            while len(self.entries) >= self.max_entries:
+                del self.entries[next(iter(self.entries))]
+        self.entries.pop(key, None)  # re-inserted at the end: newest last
+        self.entries[key] = (time.monotonic() + ttl, answer)
+
+    async def close(self):
+        if self.inner is not None:
+            await self.inner.close()
+
+    def summary(self) -> Dict[str, int]:
+        return dict(self.stats, entries=len(self.entries))
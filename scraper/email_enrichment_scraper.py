@@ -3,24 +3,258 @@ Email Enrichment Scraper for Property Managers
 Reads the existing JSON data and attempts to find email addresses from company websites
 """
 
+import bisect
 import json
 import requests
 from bs4 import BeautifulSoup
 import re
-import time
-from typing import Dict, Optional, List
+from typing import Dict, Iterable, Iterator, Optional, List, Tuple
 from urllib.parse import urljoin, urlparse
 import concurrent.futures
+import itertools
+import threading
+import time
+from datetime import timedelta
 from tqdm import tqdm
 
+from bounded_fetch import DEFAULT_MAX_BYTES, fetch_bounded
+from enrichment_delta import DEFAULT_RETRY_AFTER, EnrichmentDelta
+from enrichment_outcomes import NO_EMAIL, SUCCESS, OutcomeCache, classify_error
+from http_cache import HttpCache, install_cache
+from politeness import PolitenessScheduler, RequestCancelled, cancel_on, get_default_scheduler, mount_politeness
+from site_crawler import CrawlFrontier, is_confident_email
+
+EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+
+# Byte-level pre-scan of raw responses, so most pages never need a parse tree
+EMAIL_BYTES_PATTERN = re.compile(rb'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+MAILTO_BYTES_PATTERN = re.compile(rb'(?i:href)\s*=\s*["\']?mailto:([^"\'\s>]*)')
+MAILTO_ADDRESS_PATTERN = re.compile(rb'mailto:([^"\'\s>]*)')
+HREF_BEFORE_MAILTO_PATTERN = re.compile(rb'(?i:href)\s*=\s*["\']?$')
+# An '@' hidden behind a character reference only shows up after a real parse
+OBFUSCATED_AT_PATTERN = re.compile(rb'&(?:#0*64;|#[xX]0*40;|commat;)')
+# How far an address may extend left/right of its '@' (local part / domain)
+EMAIL_WINDOW = (64, 255)
+# Cheap necessary conditions that reject '@media', '@import', 'x @ y' etc. early
+LOCAL_PART_BYTES = frozenset(b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789._%+-')
+DOMAIN_AFTER_AT_PATTERN = re.compile(rb'@[A-Za-z0-9.-]+\.[A-Z|a-z]{2}')
+# Everything that is not page text to BeautifulSoup's get_text(): comments,
+# script/style/template blocks (with their contents) and tags (with their attributes)
+TAG_PATTERN = re.compile(rb'</?([A-Za-z][A-Za-z0-9:-]*)[^>"\']*(?:(?:"[^"]*"|\'[^\']*\')[^>"\']*)*>')
+RAW_BLOCKS = {b'<!--': b'-->', b'<script': b'</script', b'<style': b'</style', b'<template': b'</template'}
+RAW_OPENER_PATTERN = re.compile(rb'<(?:!--|script|style|template)', re.IGNORECASE)
+
+EXCLUDE_EMAIL_PATTERNS = [
+    'example.com', 'yourdomain.com', 'yourcompany.com',
+    'email.com', 'test.com', 'sample.com', '@sentry', '.sentry.io',
+    '@example', '.png', '.jpg', '.jpeg', '.gif', '.webp', '.svg'
+]
+
+
+def find_email_bytes(content: bytes) -> List:
+    """
+    Matches of EMAIL_BYTES_PATTERN.finditer(content), but only tried in a small
+    window around each '@' instead of at every byte of the page (pages have few '@'s)
+    """
+    before, after = EMAIL_WINDOW
+    matches = []
+    pos = 0
+    while True:
+        at = content.find(b'@', pos)
+        if at == -1:
+            return matches
+        if at == 0 or content[at - 1] not in LOCAL_PART_BYTES or not DOMAIN_AFTER_AT_PATTERN.match(content, at):
+            pos = at + 1
+            continue
+        match = EMAIL_BYTES_PATTERN.search(content, max(pos, at - before), at + after)
+        if match and match.start() <= at:
+            matches.append(match)
+            pos = match.end()
+        else:
+            pos = at + 1
+
+
+def find_mailto_bytes(content: bytes) -> List:
+    """
+    Matches of the addresses MAILTO_BYTES_PATTERN finds (group 1), checking only
+    the bytes around each literal 'mailto:' instead of trying the pattern at every byte
+    """
+    matches = []
+    pos = 0
+    while True:
+        at = content.find(b'mailto:', pos)
+        if at == -1:
+            return matches
+        if HREF_BEFORE_MAILTO_PATTERN.search(content, max(0, at - 32), at):
+            match = MAILTO_ADDRESS_PATTERN.match(content, at)
+            matches.append(match)
+            pos = match.end()
+        else:
+            pos = at + 1
+
+
+class MarkupSpans:
+    """
+    What contains a given position of a page: a comment, a script/style/template
+    block, a tag or (None) page text, as (start, end, tag name) with no tag name
+    for comments and blocks. The blocks are located once with plain finds; a tag
+    is matched from the nearest '<', so there is no pass over every tag
+    """
+
+    def __init__(self, content: bytes):
+        self.content = content
+        self.blocks = None
+        self.block_starts = None
+
+    def find_blocks(self):
+        self.blocks = []
+        lower = None
+        end = 0
+        for opener in RAW_OPENER_PATTERN.finditer(self.content):
+            start = opener.start()
+            if start < end:
+                continue  # '<script' inside a comment or another block
+            if lower is None:
+                lower = self.content.lower()
+            name = opener.group().lower()
+            if name == b'<!--':
+                close = lower.find(b'-->', start + 4)
+                end = len(lower) if close == -1 else close + 3
+            else:
+                tag = TAG_PATTERN.match(lower, start)
+                if not tag or tag.group(1) != name[1:]:
+                    continue  # '<scripts>', '<style' in text
+                close = lower.find(RAW_BLOCKS[name], tag.end())
+                end = len(lower) if close == -1 else lower.find(b'>', close) + 1 or len(lower)
+            self.blocks.append((start, end, None))
+        self.block_starts = [block[0] for block in self.blocks]
+
+    def at(self, pos: int) -> Optional[Tuple[int, int, Optional[bytes]]]:
+        """The comment, block or tag containing pos, None in page text"""
+        if self.blocks is None:
+            self.find_blocks()
+        i = bisect.bisect_right(self.block_starts, pos) - 1
+        if i >= 0 and pos < self.blocks[i][1]:
+            return self.blocks[i]
+        tag_start = self.content.rfind(b'<', 0, pos + 1)
+        if tag_start == -1 or (i >= 0 and tag_start < self.blocks[i][1]):
+            return None
+        tag = TAG_PATTERN.match(self.content, tag_start)
+        if tag and pos < tag.end():
+            return tag.start(), tag.end(), tag.group(1).lower()
+        return None
+
+    def joins_text(self, start: int, end: int) -> bool:
+        """
+        Whether text bytes [start:end) that touch markup run into the neighbouring
+        text once get_text() drops the markup between them
+        """
+        while start > 0 and self.at(start - 1) is not None:
+            start = self.at(start - 1)[0]
+        while end < len(self.content) and self.at(end) is not None:
+            end = self.at(end)[1]
+        return ((start > 0 and self.content[start - 1] in LOCAL_PART_BYTES) or
+                (end < len(self.content) and self.content[end] in LOCAL_PART_BYTES))
+
+
+def find_all(content: bytes, needle: bytes) -> Iterator[int]:
+    """Offsets of every occurrence of needle in content"""
+    pos = content.find(needle)
+    while pos != -1:
+        yield pos
+        pos = content.find(needle, pos + 1)
+
+
+def normalise_website(website: str) -> str:
+    """Ensure a company website URL has a scheme"""
+    if not website.startswith(('http://', 'https://')):
+        website = 'https://' + website
+    return website
+
+
+class SiteContext:
+    """
+    Per-company crawl state for one enrichment attempt
+    Each URL is downloaded at most once, and parsed at most once and only when
+    a tree is really needed; the counters make it measurable
+    """
+
+    def __init__(self, website: str, budget: Optional[float] = None):
+        self.website = website
+        self.pages = {}  # url -> raw body, or None if the fetch failed
+        self.soups = {}  # url -> BeautifulSoup, built on demand
+        self.requests = 0
+        self.parses = 0
+        self.email = None
+        self.errors = {}  # url -> (outcome, message) for fetches that raised
+        self.outcome = None  # enrichment_outcomes outcome for the whole site
+        self.cached = False  # outcome reused from the OutcomeCache, nothing fetched
+        # Overall time allowed for this site, None for no limit
+        self.deadline = time.monotonic() + budget if budget is not None else None
+
+    def remaining(self, limit: float) -> float:
+        """Seconds a request may take: limit, cut short by the site's deadline"""
+        if self.deadline is None:
+            return limit
+        return min(limit, self.deadline - time.monotonic())
+
+
+class EnrichmentResults:
+    """
+    Running totals of an enrichment run, updated as each site finishes
+    Keeps counts and the first few finds only, so reporting never rescans the companies
+    """
+
+    def __init__(self, sample_size: int = 10):
+        self.checked = 0
+        self.requests = 0
+        self.parses = 0
+        self.found = 0
+        self.sample = []  # indices of the first sample_size companies given an email
+        self.sample_size = sample_size
+
+    def add(self, idx: int, site: SiteContext):
+        self.checked += 1
+        self.requests += site.requests
+        self.parses += site.parses
+        if site.email:
+            self.found += 1
+            if len(self.sample) < self.sample_size:
+                self.sample.append(idx)
+
+
 class EmailEnrichmentScraper:
-    def __init__(self):
+    def __init__(self, scheduler: Optional[PolitenessScheduler] = None, cache: Optional[HttpCache] = None,
+                 outcomes: Optional[OutcomeCache] = None):
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         }
+        # Every request (GET and HEAD probes) waits for its host's token
+        self.scheduler = scheduler or get_default_scheduler()
         self.session = requests.Session()
         self.session.headers.update(self.headers)
+        mount_politeness(self.session, self.scheduler)
+        self.cache = cache
+        if cache is not None:
+            install_cache(self.session, cache)
+        # Per-website results of earlier runs; dead domains are skipped without a request
+        self.outcomes = outcomes
         self.timeout = 10
+        # Bytes read per page at most; non-HTML responses are not read at all
+        self.max_page_bytes = DEFAULT_MAX_BYTES
+        # Contact probes: per-request timeout, probes in flight per site, and the
+        # overall time budget for one site (homepage, probes and contact page)
+        self.probe_timeout = 5
+        self.probe_concurrency = 4
+        self.site_budget = 20
+        # Threads running the probes of every site (created on first use)
+        self.probe_threads = 32
+        self.probe_pool = None
+        self.probe_pool_lock = threading.Lock()
+        # Extra internal pages (team, leasing, owners, ...) visited per site, and
+        # how many links deep from the homepage they may be
+        self.crawl_pages = 4
+        self.crawl_depth = 2
 
         # Common contact page patterns
         self.contact_page_patterns = [
@@ -29,156 +263,474 @@ class EmailEnrichmentScraper:
             '/get-in-touch', '/reach-us', '/connect'
         ]
 
-    def extract_emails_from_text(self, text: str) -> List[str]:
+    def filter_emails(self, emails: List[str]) -> List[str]:
         """
-        Extract email addresses from text using regex
+        Lower-case, drop placeholder/image addresses and duplicates
         """
-        if not text:
-            return []
-
-        # Email regex pattern
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        emails = re.findall(email_pattern, text)
-
         # Filter out common non-personal emails and email images
         filtered_emails = []
-        exclude_patterns = [
-            'example.com', 'yourdomain.com', 'yourcompany.com',
-            'email.com', 'test.com', 'sample.com', '@sentry',
-            '@example', '.png', '.jpg', '.jpeg', '.gif'
-        ]
-
         for email in emails:
             email = email.lower()
-            if not any(pattern in email for pattern in exclude_patterns):
+            if not any(pattern in email for pattern in EXCLUDE_EMAIL_PATTERNS):
                 filtered_emails.append(email)
 
         return list(set(filtered_emails))  # Remove duplicates
 
-    def find_emails_on_page(self, url: str) -> List[str]:
+    def extract_emails_from_text(self, text: str) -> List[str]:
         """
-        Find email addresses on a given page
+        Extract email addresses from text using regex
+        """
+        if not text:
+            return []
+
+        return self.filter_emails(EMAIL_PATTERN.findall(text))
+
+    def prescan_emails(self, content: bytes) -> Optional[List[str]]:
+        """
+        Find email addresses in a raw response without building a tree
+        Reads what extract_emails_from_soup reads: mailto: links of <a> tags and
+        page text, skipping scripts, styles, comments and other attributes
+        (srcset="logo@2x.webp", Sentry DSNs). Returns None when only a full parse
+        can tell: '@' behind character references, addresses in <meta> tags or
+        split by a tag
+        """
+        if OBFUSCATED_AT_PATTERN.search(content):
+            return None
+        if b'@' not in content:
+            return []
+
+        markup = MarkupSpans(content)
+        mailto_emails = []
+        for match in find_mailto_bytes(content):
+            span = markup.at(match.start())
+            if span is not None and span[2] == b'a':
+                mailto_emails.append(match.group(1).decode('utf-8', errors='replace').split('?')[0])
+
+        text_matches = []
+        for match in find_email_bytes(content):
+            span = markup.at(match.start())
+            if span is None:
+                if markup.joins_text(match.start(), match.end()):
+                    return None
+                text_matches.append(match.group().decode('utf-8', errors='replace'))
+            elif span[2] == b'meta':
+                return None
+
+        # An address split by a tag ('<b>info</b>@acme.com') is joined by get_text()
+        for at in find_all(content, b'@'):
+            if ((content[at + 1:at + 2] == b'<' or content[at - 1:at] == b'>') and
+                    markup.at(at) is None and markup.joins_text(at, at + 1)):
+                return None
+
+        return list(set(mailto_emails + self.filter_emails(text_matches)))
+
+    def extract_emails_from_soup(self, soup: BeautifulSoup) -> List[str]:
+        """
+        Find email addresses in a parsed page
+        """
+        # Method 1: Look for mailto: links
+        mailto_emails = []
+        for link in soup.find_all('a', href=True):
+            if link['href'].startswith('mailto:'):
+                email = link['href'].replace('mailto:', '').split('?')[0]
+                mailto_emails.append(email)
+
+        # Method 2: Extract from visible text
+        text = soup.get_text()
+        text_emails = self.extract_emails_from_text(text)
+
+        # Method 3: Look in meta tags
+        meta_emails = []
+        for meta in soup.find_all('meta'):
+            content = meta.get('content', '')
+            meta_emails.extend(self.extract_emails_from_text(content))
+
+        # Combine all methods
+        all_emails = mailto_emails + text_emails + meta_emails
+        return list(set(all_emails))  # Remove duplicates
+
+    def fetch_page(self, url: str, timeout: float, site: Optional[SiteContext] = None,
+                   stop_at_mailto: bool = False) -> Optional[bytes]:
+        """
+        Download an HTML page (at most max_page_bytes, up to the first mailto: link
+        when stop_at_mailto), None on any error (classified into site.errors when given)
+        RequestCancelled propagates: the request was never sent (see cancel_on)
         """
         try:
-            response = self.session.get(url, timeout=self.timeout)
-            response.raise_for_status()
+            # A caching adapter only answers non-streamed requests
+            return fetch_bounded(self.session, url, timeout, self.max_page_bytes, stop_at_mailto,
+                                 stream=self.cache is None)
+        except RequestCancelled:
+            raise
+        except Exception as e:
+            if site is not None:
+                site.errors[url] = (classify_error(e), str(e))
+            return None
 
-            soup = BeautifulSoup(response.content, 'html.parser')
+    def get_page(self, site: SiteContext, url: str, stop_at_mailto: bool = False) -> Optional[bytes]:
+        """
+        Raw page for url, fetched only the first time a site asks for it
+        stop_at_mailto: the page is only wanted for its emails, a mailto: link is enough
+        """
+        if url in site.pages:
+            return site.pages[url]
 
-            # Method 1: Look for mailto: links
-            mailto_emails = []
-            for link in soup.find_all('a', href=True):
-                if link['href'].startswith('mailto:'):
-                    email = link['href'].replace('mailto:', '').split('?')[0]
-                    mailto_emails.append(email)
+        content = None
+        timeout = site.remaining(self.timeout)
+        if timeout > 0:
+            site.requests += 1
+            content = self.fetch_page(url, timeout, site, stop_at_mailto)
 
-            # Method 2: Extract from visible text
-            text = soup.get_text()
-            text_emails = self.extract_emails_from_text(text)
+        site.pages[url] = content
+        return content
 
-            # Method 3: Look in meta tags
-            meta_emails = []
-            for meta in soup.find_all('meta'):
-                content = meta.get('content', '')
-                meta_emails.extend(self.extract_emails_from_text(content))
+    def get_soup(self, site: SiteContext, url: str) -> Optional[BeautifulSoup]:
+        """
+        Parsed page for url, built the first time a tree is needed
+        """
+        if url in site.soups:
+            return site.soups[url]
 
-            # Combine all methods
-            all_emails = mailto_emails + text_emails + meta_emails
-            return list(set(all_emails))  # Remove duplicates
+        content = self.get_page(site, url)
+        if content is None:
+            return None
 
-        except Exception as e:
+        site.parses += 1
+        soup = BeautifulSoup(content, 'html.parser')
+        site.soups[url] = soup
+        return soup
+
+    def find_emails_on_page(self, url: str, site: Optional[SiteContext] = None,
+                            stop_at_mailto: bool = False) -> List[str]:
+        """
+        Find email addresses on a given page
+        """
+        site = site or SiteContext(url)
+        content = self.get_page(site, url, stop_at_mailto)
+        if content is None:
             return []
 
-    def find_contact_page_url(self, base_url: str) -> Optional[str]:
+        # Fast path on the raw bytes, full parse only for obfuscated pages
+        emails = self.prescan_emails(content)
+        if emails is None:
+            emails = self.extract_emails_from_soup(self.get_soup(site, url))
+        return emails
+
+    def find_contact_link(self, soup: BeautifulSoup, base_url: str) -> Optional[str]:
+        """
+        Contact/about link on a parsed homepage, if any
+        """
+        for link in soup.find_all('a', href=True):
+            href = link['href'].lower()
+            link_text = link.get_text().lower()
+
+            # Check if it's a contact link
+            if any(pattern in href for pattern in ['/contact', '/about']) or \
+               any(word in link_text for word in ['contact', 'about', 'get in touch']):
+                return urljoin(base_url, link['href'])
+
+        return None
+
+    def find_contact_page_url(self, base_url: str, site: Optional[SiteContext] = None) -> Optional[str]:
         """
         Try to find the contact page URL
         """
-        try:
-            # First try the homepage
-            response = self.session.get(base_url, timeout=self.timeout)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-
-            # Look for contact links
-            for link in soup.find_all('a', href=True):
-                href = link['href'].lower()
-                link_text = link.get_text().lower()
-
-                # Check if it's a contact link
-                if any(pattern in href for pattern in ['/contact', '/about']) or \
-                   any(word in link_text for word in ['contact', 'about', 'get in touch']):
-                    full_url = urljoin(base_url, link['href'])
-                    return full_url
-
-            # If no contact link found, try common patterns
-            for pattern in self.contact_page_patterns:
-                try:
-                    contact_url = urljoin(base_url, pattern)
-                    test_response = self.session.head(contact_url, timeout=5)
-                    if test_response.status_code == 200:
-                        return contact_url
-                except:
-                    continue
+        site = site or SiteContext(base_url)
 
-        except Exception as e:
-            pass
+        # First try the homepage
+        soup = self.get_soup(site, base_url)
+        if soup is None:
+            return None
+
+        # Look for contact links
+        contact_url = self.find_contact_link(soup, base_url)
+        if contact_url:
+            return contact_url
 
+        # If no contact link found, try common patterns
+        return self.probe_contact_pages(site, base_url)
+
+    def pick_contact_probe(self, results: Dict, total: int, final: bool) -> Optional[int]:
+        """
+        Winner among probe results {priority: (content, emails, soup)}
+        The best-ranked page with an email wins once every better-ranked probe has
+        answered; when final, fall back to the best-ranked page that exists
+        """
+        for priority in range(total):
+            if priority not in results:
+                if not final:
+                    return None  # a better-ranked probe may still find an email
+                continue
+            if results[priority][1]:
+                return priority
+
+        if final:
+            for priority in range(total):
+                if priority in results and results[priority][0] is not None:
+                    return priority
         return None
 
-    def scrape_email_for_company(self, company: Dict) -> Optional[str]:
+    def probe_executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        """The thread pool shared by every site's contact probes"""
+        with self.probe_pool_lock:
+            if self.probe_pool is None:
+                self.probe_pool = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.probe_threads, thread_name_prefix='contact-probe'
+                )
+            return self.probe_pool
+
+    def probe_contact_pages(self, site: SiteContext, base_url: str) -> Optional[str]:
         """
-        Attempt to find email for a single company
-        Returns the best email found or None
+        Fetch the common contact page paths concurrently (at most probe_concurrency
+        at a time), ranked by contact_page_patterns order; stops early once a
+        winner is certain and never runs past the site's deadline. Nothing is sent
+        after it returns: queued probes are cancelled and ones still waiting for
+        their politeness token are dropped
+        """
+        candidates = [urljoin(base_url, pattern) for pattern in self.contact_page_patterns]
+        results = {}
+        stop = threading.Event()
+        sent = []
+
+        def probe(url):
+            timeout = site.remaining(self.probe_timeout)
+            if stop.is_set() or timeout <= 0:
+                return None, [], None
+            sent.append(url)
+            try:
+                with cancel_on(stop):
+                    content = self.fetch_page(url, timeout, stop_at_mailto=True)
+            except RequestCancelled:
+                sent.remove(url)
+                return None, [], None
+            if content is None:
+                return None, [], None
+            emails = self.prescan_emails(content)
+            if emails is not None:
+                return content, emails, None
+            soup = BeautifulSoup(content, 'html.parser')
+            return content, self.extract_emails_from_soup(soup), soup
+
+        pool = self.probe_executor()
+        queued = iter(enumerate(candidates))
+        futures = {}
+        pending = set()
+        try:
+            while True:
+                for priority, url in itertools.islice(queued, self.probe_concurrency - len(pending)):
+                    future = pool.submit(probe, url)
+                    futures[future] = priority
+                    pending.add(future)
+                timeout = site.remaining(self.probe_timeout * len(candidates))
+                if not pending or timeout <= 0:
+                    break
+                done, pending = concurrent.futures.wait(
+                    pending, timeout=timeout, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    results[futures[future]] = future.result()
+                if self.pick_contact_probe(results, len(candidates), final=False) is not None:
+                    break
+        finally:
+            stop.set()
+            for future in pending:
+                future.cancel()
+
+        site.requests += len(sent)
+        for priority, (content, _, soup) in results.items():
+            site.pages[candidates[priority]] = content
+            if soup is not None:
+                site.soups[candidates[priority]] = soup
+                site.parses += 1
+
+        winner = self.pick_contact_probe(results, len(candidates), final=True)
+        return candidates[winner] if winner is not None else None
+
+    def has_confident_email(self, emails: List[str], website: str) -> bool:
+        """True once the search can stop: a role address or one on the company's domain"""
+        return any(is_confident_email(email, website) for email in emails)
+
+    def crawl_site(self, site: SiteContext, website: str) -> List[str]:
+        """
+        Visit the homepage's most promising internal links (and theirs, up to
+        crawl_depth) best first, at most crawl_pages of them within the site's
+        deadline; stops at the first high-confidence email
+        """
+        soup = self.get_soup(site, website)
+        if soup is None:
+            return []
+
+        frontier = CrawlFrontier(seen=site.pages)
+        frontier.add_links(soup, website, depth=1)
+        emails = []
+        for _ in range(self.crawl_pages):
+            entry = frontier.pop()
+            if entry is None or site.remaining(self.timeout) <= 0:
+                break
+            url, depth = entry
+            # Pages at the depth limit are only read for their emails
+            emails.extend(self.find_emails_on_page(url, site, stop_at_mailto=depth >= self.crawl_depth))
+            if self.has_confident_email(emails, website):
+                break
+            if depth < self.crawl_depth:
+                page_soup = self.get_soup(site, url)
+                if page_soup is not None:
+                    frontier.add_links(page_soup, url, depth + 1)
+        return emails
+
+    def choose_email(self, all_emails: List[str], website: str) -> Optional[str]:
+        """
+        Pick the best of the emails found on a company's pages
+        """
+        if not all_emails:
+            return None
+
+        # 1. info@, contact@, hello@
+        for email in all_emails:
+            if any(prefix in email for prefix in ['info@', 'contact@', 'hello@', 'admin@']):
+                return email
+
+        # 2. Any email from the company domain
+        domain = urlparse(website).netloc.replace('www.', '')
+        for email in all_emails:
+            if domain in email:
+                return email
+
+        # 3. Return the first one found
+        return all_emails[0]
+
+    def cached_site(self, website: str) -> Optional[SiteContext]:
+        """
+        SiteContext filled from the outcome cache (earlier email, no email, or an
+        open circuit breaker), None if the website has to be visited
+        """
+        if self.outcomes is None:
+            return None
+        entry = self.outcomes.lookup(website)
+        if entry is None:
+            return None
+        site = SiteContext(website)
+        site.outcome = entry.outcome
+        site.email = entry.email
+        site.cached = True
+        return site
+
+    def settle_site(self, site: SiteContext, error: Optional[Exception] = None):
+        """
+        Decide the site's outcome (a failed homepage, or an unexpected error
+        while scraping, is the site's failure) and record it in the outcome cache
+        """
+        if error is not None:
+            site.errors[site.website] = (classify_error(error), str(error) or type(error).__name__)
+        if site.website in site.errors:
+            site.outcome = site.errors[site.website][0]
+        else:
+            site.outcome = SUCCESS if site.email else NO_EMAIL
+        if self.outcomes is not None:
+            message = site.errors.get(site.website, (None, None))[1]
+            self.outcomes.record(site.website, site.outcome, site.email, message)
+
+    def scrape_site(self, company: Dict) -> Optional[SiteContext]:
+        """
+        Homepage, linked contact page, best internal links, then contact probes
+        when nothing is linked (stopping at the first confident email); a site
+        already scraped this run is reused. Returns the SiteContext (best email
+        plus request/parse counts), None without a website
         """
         website = company.get('website')
         if not website:
             return None
 
-        # Ensure URL has a scheme
-        if not website.startswith(('http://', 'https://')):
-            website = 'https://' + website
+        website = normalise_website(website)
+        site = self.cached_site(website)
+        if site is not None:
+            return site
+        site = SiteContext(website, self.site_budget)
 
         all_emails = []
 
         try:
             # 1. Check the homepage
-            homepage_emails = self.find_emails_on_page(website)
+            homepage_emails = self.find_emails_on_page(website, site)
             all_emails.extend(homepage_emails)
 
-            # 2. Check the contact page
-            contact_url = self.find_contact_page_url(website)
-            if contact_url and contact_url != website:
-                time.sleep(0.5)  # Small delay between requests
-                contact_emails = self.find_emails_on_page(contact_url)
-                all_emails.extend(contact_emails)
+            soup = None
+            if not self.has_confident_email(all_emails, website):
+                # 2. Check the linked contact page (the homepage tree is reused, not re-fetched)
+                soup = self.get_soup(site, website)
+            if soup is not None:
+                contact_url = self.find_contact_link(soup, website)
+                if contact_url and contact_url != website:
+                    contact_emails = self.find_emails_on_page(contact_url, site, stop_at_mailto=True)
+                    all_emails.extend(contact_emails)
+
+                # 3. Other promising internal pages (team, leasing, owners, footer links)
+                if not self.has_confident_email(all_emails, website):
+                    all_emails.extend(self.crawl_site(site, website))
+
+                # 4. Nothing linked: try the common contact page paths
+                if not contact_url and not self.has_confident_email(all_emails, website):
+                    probe_url = self.probe_contact_pages(site, website)
+                    if probe_url:
+                        all_emails.extend(self.find_emails_on_page(probe_url, site, stop_at_mailto=True))
 
             # Remove duplicates
             all_emails = list(set(all_emails))
 
-            if all_emails:
-                # Prioritize emails
-                # 1. info@, contact@, hello@
-                for email in all_emails:
-                    if any(prefix in email for prefix in ['info@', 'contact@', 'hello@', 'admin@']):
-                        return email
+            site.email = self.choose_email(all_emails, website)
+            self.settle_site(site)
 
-                # 2. Any email from the company domain
-                domain = urlparse(website).netloc.replace('www.', '')
-                for email in all_emails:
-                    if domain in email:
-                        return email
+        except Exception as e:
+            self.settle_site(site, e)
 
-                # 3. Return the first one found
-                return all_emails[0]
+        return site
 
-        except Exception as e:
-            pass
+    def scrape_email_for_company(self, company: Dict) -> Optional[str]:
+        """
+        Attempt to find email for a single company
+        Returns the best email found or None
+        """
+        site = self.scrape_site(company)
+        return site.email if site else None
 
-        return None
+    def iter_site_results(self, companies: List[Dict], indices: Iterable[int], max_workers: int = 5,
+                          window: Optional[int] = None) -> Iterator[Tuple[int, Optional[SiteContext]]]:
+        """
+        Scrape companies[idx] for each index on a thread pool, yielding
+        (idx, site) in completion order (site is None if scrape_site raised)
+        At most `window` (default 2 x max_workers) sites are submitted at once,
+        so memory does not grow with the number of companies
+        """
+        window = window or 2 * max_workers
+        indices = iter(indices)
+        self.peak_in_flight = 0
 
-    def enrich_json_with_emails(self, input_file: str, output_file: str, max_workers: int = 5):
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            in_flight = {}
+
+            def fill():
+                for idx in itertools.islice(indices, window - len(in_flight)):
+                    in_flight[executor.submit(self.scrape_site, companies[idx])] = idx
+                self.peak_in_flight = max(self.peak_in_flight, len(in_flight))
+
+            fill()
+            while in_flight:
+                done, _ = concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    idx = in_flight.pop(future)
+                    try:
+                        site = future.result()
+                    except Exception:
+                        site = None
+                    yield idx, site
+                fill()
+
+    def enrich_json_with_emails(self, input_file: str, output_file: Optional[str], max_workers: int = 5,
+                                delta_file: Optional[str] = None, retry_after: timedelta = DEFAULT_RETRY_AFTER):
         """
         Read JSON file, scrape emails, and save enriched data
+        With delta_file, only new or stale companies are visited and every result
+        is appended to the delta; output_file (the full JSON) is then optional
         """
         print("Loading existing data...")
         with open(input_file, 'r') as f:
@@ -186,49 +738,50 @@ class EmailEnrichmentScraper:
 
         print(f"Found {len(companies)} companies")
 
-        # Filter companies that don't have emails
-        companies_without_email = [c for c in companies if not c.get('email')]
-        print(f"{len(companies_without_email)} companies missing email addresses")
+        delta = EnrichmentDelta(delta_file) if delta_file else None
+        if delta is not None:
+            print(f"Merged {delta.apply(companies)} emails from {delta_file}")
+            pending = delta.pending(companies, retry_after)
+            total = len(pending)
+            print(f"{total} companies new or due for a retry")
+        else:
+            # Indices are generated as the window drains, never materialised
+            pending = (idx for idx, c in enumerate(companies) if not c.get('email') and c.get('website'))
+            total = sum(1 for c in companies if not c.get('email') and c.get('website'))
 
-        # Create a mapping for quick lookup
-        company_map = {i: c for i, c in enumerate(companies)}
+        missing = sum(1 for c in companies if not c.get('email'))
+        print(f"{missing} companies missing email addresses")
 
         print(f"\nStarting email extraction (using {max_workers} threads)...")
-        emails_found = 0
-
-        # Use ThreadPoolExecutor for concurrent scraping
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Submit all tasks
-            future_to_idx = {}
-            for idx, company in enumerate(companies):
-                if not company.get('email') and company.get('website'):
-                    future = executor.submit(self.scrape_email_for_company, company)
-                    future_to_idx[future] = idx
-
-            # Process results as they complete with progress bar
-            with tqdm(total=len(future_to_idx), desc="Scraping emails") as pbar:
-                for future in concurrent.futures.as_completed(future_to_idx):
-                    idx = future_to_idx[future]
-                    try:
-                        email = future.result()
-                        if email:
-                            companies[idx]['email'] = email
-                            emails_found += 1
-                            pbar.set_postfix({'found': emails_found})
-                    except Exception as e:
-                        pass
-                    finally:
-                        pbar.update(1)
-                        time.sleep(0.1)  # Small delay to be respectful
+        results = EnrichmentResults()
+
+        with tqdm(total=total, desc="Scraping emails") as pbar:
+            for idx, site in self.iter_site_results(companies, pending, max_workers):
+                if site is not None:
+                    results.add(idx, site)
+                    if delta is not None:
+                        delta.record(companies[idx], site.outcome, site.email)
+                    if site.email:
+                        companies[idx]['email'] = site.email
+                        pbar.set_postfix({'found': results.found})
+                pbar.update(1)
 
         print(f"\nEmail extraction complete!")
-        print(f"Emails found: {emails_found} out of {len(companies_without_email)} missing")
-        print(f"Success rate: {(emails_found/len(companies_without_email)*100):.1f}%")
-
-        # Save enriched data
-        print(f"\nSaving enriched data to {output_file}...")
-        with open(output_file, 'w') as f:
-            json.dump(companies, f, indent=2)
+        print(f"Emails found: {results.found} out of {missing} missing")
+        if missing:
+            print(f"Success rate: {(results.found/missing*100):.1f}%")
+        if results.checked:
+            print(f"Requests: {results.requests} ({results.requests/results.checked:.1f} per company), "
+                  f"pages parsed: {results.parses} ({results.parses/results.checked:.1f} per company)")
+        if self.outcomes is not None:
+            print(f"Skipped from the outcome cache: {self.outcomes.stats['skipped']}, "
+                  f"circuit breakers tripped: {self.outcomes.stats['tripped']}")
+
+        # Save enriched data (a delta run has already appended its results)
+        if output_file:
+            print(f"\nSaving enriched data to {output_file}...")
+            with open(output_file, 'w') as f:
+                json.dump(companies, f, indent=2)
 
         print("Done!")
 
@@ -241,13 +794,8 @@ class EmailEnrichmentScraper:
 
         # Show sample of found emails
         print(f"\nSample of newly found emails:")
-        sample_count = 0
-        for company in companies:
-            if company.get('email') and company['email'] in [companies[idx].get('email') for idx in future_to_idx.values()]:
-                print(f"  - {company['name']}: {company['email']}")
-                sample_count += 1
-                if sample_count >= 10:
-                    break
+        for idx in results.sample:
+            print(f"  - {companies[idx]['name']}: {companies[idx]['email']}")
 
 
 def main():
@@ -284,7 +832,8 @@ def main():
 
     print(f"\nUsing {max_workers} threads for scraping...")
 
-    scraper = EmailEnrichmentScraper()
+    # Remembers dead domains and finished sites between runs
+    scraper = EmailEnrichmentScraper(outcomes=OutcomeCache('enrichment_outcomes.db'))
 
     try:
         scraper.enrich_json_with_emails(input_file, output_file, max_workers=max_workers)
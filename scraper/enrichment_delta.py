@@ -0,0 +1,178 @@
+"""
+Incremental email enrichment
+Every attempt is appended to an NDJSON delta file next to the company JSON
+(one line per company: stable key, when it was tried, outcome and email), and
+the delta is merged into the companies when they are read. A refresh only
+visits companies that are new or whose last attempt found nothing and is older
+than `retry_after`, and never rewrites the big JSON file.
+
+Usage: python enrichment_delta.py merge BASE.json DELTA.ndjson OUTPUT.json
+       python enrichment_delta.py compact DELTA.ndjson
+       python enrichment_delta.py status BASE.json DELTA.ndjson
+"""
+
+import argparse
+import json
+import os
+import re
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from enrichment_outcomes import domain_of
+
+DEFAULT_RETRY_AFTER = timedelta(days=7)
+
+
+def _now() -> str:
+    return datetime.now().isoformat(sep=' ', timespec='seconds')
+
+
+def _normalise(text: Optional[str]) -> str:
+    return re.sub(r'[^a-z0-9]+', ' ', (text or '').lower()).strip()
+
+
+def company_key(company: Dict) -> str:
+    """Stable identity of a company: website domain, name and city"""
+    website = company.get('website') or ''
+    domain = domain_of(website if '://' in website else 'https://' + website) if website else ''
+    return '|'.join([domain, _normalise(company.get('name')), _normalise(company.get('city'))])
+
+
+def default_delta_path(base_file: str) -> str:
+    """property_managers_X.json -> property_managers_X.delta.ndjson"""
+    return os.path.splitext(base_file)[0] + '.delta.ndjson'
+
+
+class EnrichmentDelta:
+    """
+    Append-only log of enrichment attempts, keyed by company_key
+    The latest line per key wins; appends are flushed one by one so an
+    interrupted run keeps everything it finished
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.latest = {}  # key -> latest entry
+        self.lines = 0
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # torn last line of a crashed run
+                    self.latest[entry['key']] = entry
+                    self.lines += 1
+
+    def record(self, company: Dict, outcome: Optional[str], email: Optional[str]):
+        """Append the result of one attempt"""
+        entry = {'key': company_key(company), 'attempted_at': _now(), 'outcome': outcome, 'email': email}
+        line = json.dumps(entry, ensure_ascii=False) + '\n'
+        with self.lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+            self.latest[entry['key']] = entry
+            self.lines += 1
+
+    def apply(self, companies: List[Dict]) -> int:
+        """Merge found emails into companies that have none, returns how many were filled"""
+        filled = 0
+        for company in companies:
+            if company.get('email'):
+                continue
+            entry = self.latest.get(company_key(company))
+            if entry and entry.get('email'):
+                company['email'] = entry['email']
+                filled += 1
+        return filled
+
+    def pending(self, companies: List[Dict], retry_after: timedelta = DEFAULT_RETRY_AFTER) -> List[int]:
+        """
+        Indices of companies worth visiting: a website, no email, and either
+        never tried or last tried before retry_after
+        """
+        cutoff = (datetime.now() - retry_after).isoformat(sep=' ', timespec='seconds')
+        indices = []
+        for idx, company in enumerate(companies):
+            if company.get('email') or not company.get('website'):
+                continue
+            entry = self.latest.get(company_key(company))
+            if entry is None or entry['attempted_at'] <= cutoff:
+                indices.append(idx)
+        return indices
+
+    def compact(self):
+        """Rewrite the log with only the latest line per key"""
+        with self.lock:
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for entry in self.latest.values():
+                    f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            os.replace(tmp_path, self.path)
+            self.lines = len(self.latest)
+
+    def summary(self) -> Dict[str, int]:
+        """Number of companies per latest outcome"""
+        counts = {}
+        for entry in self.latest.values():
+            outcome = entry.get('outcome') or 'error'
+            counts[outcome] = counts.get(outcome, 0) + 1
+        return counts
+
+
+def load_enriched(base_file: str, delta_file: Optional[str] = None) -> List[Dict]:
+    """Companies from the base JSON with the delta's emails merged in"""
+    with open(base_file, 'r') as f:
+        companies = json.load(f)
+    delta_file = delta_file or default_delta_path(base_file)
+    if os.path.exists(delta_file):
+        EnrichmentDelta(delta_file).apply(companies)
+    return companies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect and merge incremental enrichment deltas")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    merge = sub.add_parser('merge', help='Write the base JSON with the delta merged in')
+    merge.add_argument('base')
+    merge.add_argument('delta')
+    merge.add_argument('output')
+
+    compact = sub.add_parser('compact', help='Keep only the latest attempt per company')
+    compact.add_argument('delta')
+
+    status = sub.add_parser('status', help='Outcomes so far and companies due for a retry')
+    status.add_argument('base')
+    status.add_argument('delta')
+    status.add_argument('--retry-after', type=float, default=DEFAULT_RETRY_AFTER.days, help='Days (default: 7)')
+
+    args = parser.parse_args()
+
+    if args.command == 'merge':
+        companies = load_enriched(args.base, args.delta)
+        with open(args.output, 'w') as f:
+            json.dump(companies, f, indent=2)
+        print(f"Wrote {len(companies)} companies ({sum(1 for c in companies if c.get('email'))} with email) "
+              f"to {args.output}")
+
+    elif args.command == 'compact':
+        delta = EnrichmentDelta(args.delta)
+        before = delta.lines
+        delta.compact()
+        print(f"Compacted {args.delta}: {before} -> {delta.lines} lines")
+
+    elif args.command == 'status':
+        delta = EnrichmentDelta(args.delta)
+        companies = load_enriched(args.base, args.delta)
+        due = delta.pending(companies, timedelta(days=args.retry_after))
+        print(f"{len(delta.latest)} companies attempted")
+        for outcome, count in sorted(delta.summary().items()):
+            print(f"  {outcome}: {count}")
+        print(f"{len(due)} companies new or due for a retry")
+
+
+if __name__ == "__main__":
+    main()
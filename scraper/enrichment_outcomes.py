@@ -0,0 +1,237 @@
+"""
+Persistent outcome cache for email enrichment
+Every enrichment attempt records what happened to the company's website
+(email found, no email, not an HTML site, DNS failure, timeout, HTTP error,
+connection error).
+Good outcomes belong to the website itself (franchises and multi-tenant hosts
+give many companies their own page on one domain) and are reused for that
+website until their TTL runs out. Failures belong to the domain and feed a
+circuit breaker: after `failure_threshold` consecutive failures the domain is
+skipped without a request for a cooldown that doubles with every further
+failure, so reruns over property_managers_*.json stop paying timeouts for dead
+websites.
+"""
+
+import asyncio
+import socket
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+
+SUCCESS = 'success'
+NO_EMAIL = 'no_email'
+NOT_HTML = 'not_html'
+DNS_FAILURE = 'dns_failure'
+TIMEOUT = 'timeout'
+HTTP_ERROR = 'http_error'
+CONNECTION_ERROR = 'connection_error'
+
+FAILURES = (DNS_FAILURE, TIMEOUT, HTTP_ERROR, CONNECTION_ERROR)
+
+DAY = 24 * 3600
+
+# How long an outcome is trusted; for failures, the first cooldown once the breaker trips
+DEFAULT_TTLS = {
+    SUCCESS: 30 * DAY,
+    NO_EMAIL: 14 * DAY,
+    NOT_HTML: 14 * DAY,
+    DNS_FAILURE: 7 * DAY,
+    TIMEOUT: 1 * DAY,
+    HTTP_ERROR: 3 * DAY,
+    CONNECTION_ERROR: 1 * DAY,
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS domain_outcomes (
+    domain TEXT PRIMARY KEY,
+    outcome TEXT NOT NULL,
+    email TEXT,
+    failures INTEGER DEFAULT 0,
+    error_message TEXT,
+    checked_at REAL,
+    expires_at REAL
+);
+CREATE TABLE IF NOT EXISTS site_outcomes (
+    site TEXT PRIMARY KEY,
+    outcome TEXT NOT NULL,
+    email TEXT,
+    error_message TEXT,
+    checked_at REAL,
+    expires_at REAL
+);
+"""
+
+
+class FetchError(Exception):
+    """A fetch failure that already knows its outcome (e.g. an HTTP status)"""
+
+    def __init__(self, outcome: str, message: str):
+        super().__init__(message)
+        self.outcome = outcome
+
+
+def _causes(exc: BaseException):
+    """exc and everything it wraps (requests -> urllib3 -> socket, aiohttp -> OSError)"""
+    pending = [exc]
+    seen = set()
+    while pending:
+        exc = pending.pop()
+        if exc is None or id(exc) in seen:
+            continue
+        seen.add(id(exc))
+        yield exc
+        pending.extend([exc.__cause__, exc.__context__,
+                        getattr(exc, 'reason', None), getattr(exc, 'os_error', None)])
+        pending.extend(arg for arg in exc.args if isinstance(arg, BaseException))
+
+
+def classify_error(exc: BaseException) -> str:
+    """Outcome for an exception raised by requests or aiohttp"""
+    causes = [e for e in _causes(exc) if isinstance(e, BaseException)]
+    for e in causes:
+        if isinstance(e, FetchError):
+            return e.outcome
+        if isinstance(e, socket.gaierror) or type(e).__name__ in ('NameResolutionError', 'ClientConnectorDNSError'):
+            return DNS_FAILURE
+    for e in causes:
+        if isinstance(e, (requests.Timeout, TimeoutError, asyncio.TimeoutError)):
+            return TIMEOUT
+        if type(e).__name__ in ('ReadTimeoutError', 'ConnectTimeoutError', 'ServerTimeoutError'):
+            return TIMEOUT
+    for e in causes:
+        if isinstance(e, requests.HTTPError):
+            return HTTP_ERROR
+    return CONNECTION_ERROR
+
+
+def domain_of(url: str) -> str:
+    """Cache key for a website: its host (and port), without a leading www."""
+    netloc = urlparse(url).netloc.lower()
+    return netloc[4:] if netloc.startswith('www.') else netloc
+
+
+def site_of(url: str) -> str:
+    """Cache key for one company's website: domain_of(url) plus path and query, scheme-less"""
+    parsed = urlparse(url)
+    site = domain_of(url) + parsed.path.rstrip('/')
+    return f"{site}?{parsed.query}" if parsed.query else site
+
+
+class DomainOutcome:
+    """A cached outcome for one website (site_of) or, for failures, its domain"""
+
+    __slots__ = ('domain', 'outcome', 'email', 'failures', 'error_message', 'checked_at', 'expires_at')
+
+    def __init__(self, domain, outcome, email, failures, error_message, checked_at, expires_at):
+        self.domain = domain
+        self.outcome = outcome
+        self.email = email
+        self.failures = failures
+        self.error_message = error_message
+        self.checked_at = checked_at
+        self.expires_at = expires_at
+
+
+class OutcomeCache:
+    """
+    SQLite-backed website outcome cache with a per-domain circuit breaker, shared by threads
+    failure_threshold: consecutive failures before a domain is skipped
+    max_cooldown: cap on the doubling failure cooldown
+    """
+
+    def __init__(self, path: str = 'enrichment_outcomes.db', ttls: Optional[Dict[str, float]] = None,
+                 failure_threshold: int = 2, max_cooldown: float = 90 * DAY):
+        self.path = path
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.failure_threshold = failure_threshold
+        self.max_cooldown = max_cooldown
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+        self.stats = {'skipped': 0, 'recorded': 0, 'tripped': 0}
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def get(self, url: str) -> Optional[DomainOutcome]:
+        """
+        The stored outcome for url, fresh or not: the website's own, else its
+        domain's failure (good outcomes stored per domain by older versions are ignored)
+        """
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT site, outcome, email, 0, error_message, checked_at, expires_at '
+                'FROM site_outcomes WHERE site = ?', (site_of(url),)
+            ).fetchone()
+            if row is None:
+                row = self.conn.execute(
+                    'SELECT domain, outcome, email, failures, error_message, checked_at, expires_at '
+                    'FROM domain_outcomes WHERE domain = ? AND outcome IN ({})'.format(','.join('?' * len(FAILURES))),
+                    (domain_of(url),) + FAILURES
+                ).fetchone()
+        return DomainOutcome(*row) if row else None
+
+    def lookup(self, url: str) -> Optional[DomainOutcome]:
+        """
+        The outcome to reuse instead of visiting url, or None to visit it (nothing
+        stored, expired, or a domain failure that has not tripped the breaker)
+        """
+        entry = self.get(url)
+        if entry is None or entry.expires_at <= time.time():
+            return None
+        with self.lock:
+            self.stats['skipped'] += 1
+        return entry
+
+    def record(self, url: str, outcome: str, email: Optional[str] = None, error_message: Optional[str] = None):
+        """
+        Store the outcome of visiting url: a failure counts against url's domain,
+        anything else is kept for the website and closes the domain's breaker
+        """
+        domain = domain_of(url)
+        now = time.time()
+        with self.lock:
+            if outcome in FAILURES:
+                row = self.conn.execute('SELECT failures FROM domain_outcomes WHERE domain = ?', (domain,)).fetchone()
+                failures = (row[0] if row else 0) + 1
+                if failures >= self.failure_threshold:
+                    # Breaker open: cooldown doubles with every failure past the threshold
+                    cooldown = self.ttls[outcome] * 2 ** (failures - self.failure_threshold)
+                    expires_at = now + min(cooldown, self.max_cooldown)
+                    if failures == self.failure_threshold:
+                        self.stats['tripped'] += 1
+                else:
+                    expires_at = now  # not trusted yet, the next run tries again
+                self.conn.execute(
+                    'INSERT OR REPLACE INTO domain_outcomes VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (domain, outcome, email, failures, error_message, now, expires_at)
+                )
+            else:
+                self.conn.execute('DELETE FROM domain_outcomes WHERE domain = ?', (domain,))
+                self.conn.execute(
+                    'INSERT OR REPLACE INTO site_outcomes VALUES (?, ?, ?, ?, ?, ?)',
+                    (site_of(url), outcome, email, error_message, now, now + self.ttls[outcome])
+                )
+            self.conn.commit()
+            self.stats['recorded'] += 1
+
+    def summary(self) -> Dict[str, int]:
+        """Number of websites (good outcomes) and domains (failures) per stored outcome"""
+        with self.lock:
+            rows = self.conn.execute(
+                'SELECT outcome, COUNT(*) FROM site_outcomes GROUP BY outcome UNION ALL '
+                'SELECT outcome, COUNT(*) FROM domain_outcomes WHERE outcome IN ({}) GROUP BY outcome'.format(
+                    ','.join('?' * len(FAILURES))), FAILURES
+            ).fetchall()
+        return dict(rows)
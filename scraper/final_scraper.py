@@ -6,18 +6,41 @@ Extracts data from company sections starting with H2 tags
 import requests
 from bs4 import BeautifulSoup
 import pandas as pd
-import time
-import re
-from typing import List, Dict
+import json
+from typing import List, Dict, Optional
+
+import lxml_parser
+from company_record import WEBSITE_LINK_PATTERN, CompanySection, build_company_record, clean_description, is_company_name
+from http_cache import HttpCache, install_cache
+from page_archive import PageArchiveWriter, install_capture
+from politeness import PolitenessScheduler, get_default_scheduler, mount_politeness
+
+# Parser backends: BeautifulSoup's html.parser (default) or the lxml fast path
+PARSERS = ('html.parser', 'lxml')
 
 class FinalPropertyManagerScraper:
-    def __init__(self):
+    def __init__(self, scheduler: Optional[PolitenessScheduler] = None, parser: str = 'html.parser',
+                 cache: Optional[HttpCache] = None, capture: Optional[PageArchiveWriter] = None):
+        if parser not in PARSERS:
+            raise ValueError(f"Unknown parser '{parser}', expected one of {PARSERS}")
+        self.parser = parser
         self.base_url = "https://ipropertymanagement.com"
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         }
+        # Requests are rate limited per host by the shared politeness scheduler
+        self.scheduler = scheduler or get_default_scheduler()
         self.session = requests.Session()
         self.session.headers.update(self.headers)
+        mount_politeness(self.session, self.scheduler)
+        # Optional on-disk cache in front of the polite adapter (fresh hits cost no token)
+        self.cache = cache
+        if cache is not None:
+            install_cache(self.session, cache)
+        # Optional page archive: every GET is recorded for offline replay (page_archive.py)
+        self.capture = capture
+        if capture is not None:
+            install_capture(self.session, capture)
 
     def get_all_city_urls(self) -> List[Dict[str, str]]:
         """Get all city URLs from the main companies page"""
@@ -53,13 +76,14 @@ class FinalPropertyManagerScraper:
         print(f"Found {len(unique_cities)} cities")
         return unique_cities
 
-    def scrape_city_page(self, city_url: str, city_name: str, state: str) -> List[Dict]:
+    def scrape_city_page(self, city_url: str, city_name: str, state: str, raise_errors: bool = False) -> List[Dict]:
         """
         Scrape all property managers from a single city page
         The structure is:
         - Each company has an H2 heading with id attribute
         - Followed by paragraphs, UL lists, and more paragraphs
         - Ends with <hr/> tag
+        Errors are logged and an empty list returned unless raise_errors is set
         """
         print(f"\nScraping: {city_name}, {state}")
         print(f"URL: {city_url}")
@@ -67,99 +91,118 @@ class FinalPropertyManagerScraper:
         try:
             response = self.session.get(city_url)
             response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
+            return self.parse_city_page(response.content, city_name, state, city_url)
+
+        except Exception as e:
+            print(f"Error scraping {city_url}: {str(e)}")
+            if raise_errors:
+                raise
+            return []
+
+    def scrape_city_checkpointed(self, city_info: Dict, ledger) -> List[Dict]:
+        """Scrape one city and record the outcome in a ScrapeJobLedger"""
+        ledger.start(city_info)
+        try:
+            companies = self.scrape_city_page(
+                city_info['url'],
+                city_info['city'],
+                city_info['state'],
+                raise_errors=True
+            )
+        except Exception as e:
+            ledger.fail(city_info, str(e))
+            return []
 
-            companies = []
+        ledger.complete(city_info, companies)
+        return companies
 
-            # Find all <h2> tags with id attribute - these mark company sections
-            company_headings = soup.find_all('h2', id=True)
+    def parse_city_page(self, content, city_name: str, state: str, city_url: str) -> List[Dict]:
+        """
+        Parse all property managers out of an already downloaded city page
+        Kept separate from the fetch so other engines can reuse it
+        """
+        if self.parser == 'lxml':
+            sections = lxml_parser.company_sections(content)
+            extract = lxml_parser.extract_company_from_section
+        else:
+            sections = self.company_sections(content)
+            extract = self.extract_company_from_section
 
-            print(f"  Found {len(company_headings)} company sections")
+        companies = []
 
-            for idx, heading in enumerate(company_headings):
-                try:
-                    # Extract all siblings until <hr/> tag
-                    company_elements = [heading]
-                    current = heading.next_sibling
+        print(f"  Found {len(sections)} company sections")
 
-                    while current:
-                        if current.name == 'hr':
-                            break
-                        if current.name:  # Only add tag elements, skip text nodes
-                            company_elements.append(current)
-                        current = current.next_sibling
+        for idx, section in enumerate(sections):
+            try:
+                company_data = extract(section, city_name, state, city_url)
 
-                    company_data = self.extract_company_from_section(company_elements, city_name, state, city_url)
+                if company_data and company_data.get('name'):
+                    companies.append(company_data)
+                    print(f"  {len(companies)}. {company_data['name']}")
+            except Exception as e:
+                print(f"  Error extracting company {idx}: {str(e)}")
+                continue
 
-                    if company_data and company_data.get('name'):
-                        companies.append(company_data)
-                        print(f"  {len(companies)}. {company_data['name']}")
-                except Exception as e:
-                    print(f"  Error extracting company {idx}: {str(e)}")
-                    continue
+        return companies
 
-            # Be respectful with delays
-            time.sleep(2)
+    def company_sections(self, content) -> List[CompanySection]:
+        """
+        Split a city page into company sections in one pass over each content container
+        A section is an <h2 id> plus its <p>/<ul> siblings up to the next <hr>; without
+        an <hr> it runs on through later headings, exactly like the old sibling walk
+        """
+        soup = BeautifulSoup(content, 'html.parser')
 
-            return companies
+        # Find all <h2> tags with id attribute - these mark company sections
+        headings = soup.find_all('h2', id=True)
+        heading_ids = {id(heading) for heading in headings}
+        sections = {}
 
-        except Exception as e:
-            print(f"Error scraping {city_url}: {str(e)}")
-            return []
+        # Usually a single div.entry-content holds every heading
+        containers = {id(heading.parent): heading.parent for heading in headings}
 
-    def extract_company_from_section(self, elements: List, city_name: str, state: str, url: str) -> Dict:
+        for container in containers.values():
+            open_sections = []
+            for child in container.children:
+                name = child.name
+                if not name:  # Skip text nodes and comments
+                    continue
+                if name == 'hr':
+                    open_sections = []
+                    continue
+                for section in open_sections:
+                    section.add(child, name)
+                if id(child) in heading_ids:
+                    section = CompanySection(child)
+                    sections[id(child)] = section
+                    open_sections.append(section)
+
+        return [sections[id(heading)] for heading in headings]
+
+    def extract_company_from_section(self, section, city_name: str, state: str, url: str) -> Dict:
         """
-        Extract company data from a list of company elements
-        Elements structure: [<h2>, <p>, <ul>, <p>, <p>]
+        Extract company data from a CompanySection
+        (a plain [<h2>, <p>, <ul>, <p>, <p>] element list is accepted too)
         """
-        data = {
-            'name': None,
-            'address': None,
-            'city': city_name,
-            'state': state,
-            'zip_code': None,
-            'phone': None,
-            'email': None,
-            'website': None,
-            'description': None,
-            'service_types': None,
-            'years_in_business': None,
-            'rentals_managed': None,
-            'bbb_rating': None,
-            'management_fee': None,
-            'tenant_placement_fee': None,
-            'lease_renewal_fee': None,
-            'miscellaneous_fees': None,
-            'source_city': city_name,
-            'source_state': state,
-            'source_url': url,
-        }
+        if isinstance(section, list):
+            section = CompanySection.from_elements(section)
 
         # Extract company name from <h2> tag
-        h2_tag = elements[0]
-        data['name'] = h2_tag.get_text(strip=True)
+        name = section.heading.get_text(strip=True)
 
-        # If name is generic or too short, skip
-        if not data['name'] or len(data['name']) < 3:
+        # Skip generic/short names and non-company H2s ("Table of Contents", "FAQ", ...)
+        if not is_company_name(name):
             return None
 
-        # Skip if the H2 is not a company name (e.g., "Table of Contents", "FAQ", etc.)
-        skip_keywords = ['table of contents', 'faq', 'conclusion', 'summary', 'introduction', 'overview']
-        if any(keyword in data['name'].lower() for keyword in skip_keywords):
-            return None
-
-        # Find all <p> and <ul> tags
-        p_tags = [elem for elem in elements if elem.name == 'p']
-        ul_tags = [elem for elem in elements if elem.name == 'ul']
-
         # Extract description from all <p> tags (excluding the one with the website link)
+        website = None
         description_parts = []
-        for p in p_tags:
+        for p in section.paragraphs:
             # Check if this <p> contains the "Go to website" link
-            link = p.find('a', string=re.compile(r'Go to website', re.IGNORECASE))
+            link = p.find('a', string=WEBSITE_LINK_PATTERN)
             if link:
                 # This is the website link
-                data['website'] = link.get('href')
+                website = link.get('href')
             else:
                 # This is part of the description
                 # Remove all <a> tags but keep their text content with proper spacing
@@ -168,73 +211,59 @@ class FinalPropertyManagerScraper:
                     a_tag.unwrap()  # Replace <a> with its text content
 
                 # Use separator=' ' to ensure spaces between inline elements
-                text = p.get_text(separator=' ', strip=True)
-                # Clean up any extra whitespace
-                text = re.sub(r'\s+', ' ', text)
+                text = clean_description(p.get_text(separator=' ', strip=True))
                 if text:
                     description_parts.append(text)
 
-        data['description'] = ' '.join(description_parts) if description_parts else None
-
         # Extract details from <ul> tags
-        if ul_tags:
-            for ul in ul_tags:
-                li_tags = ul.find_all('li')
-                for li in li_tags:
-                    text = li.get_text(strip=True)
-
-                    # Parse key-value pairs
-                    if ':' in text:
-                        key, value = text.split(':', 1)
-                        key = key.strip().lower()
-                        value = value.strip()
-
-                        if 'address' in key:
-                            data['address'] = value
-                            # Extract zip code
-                            zip_match = re.search(r'\b(\d{5}(?:-\d{4})?)\b', value)
-                            if zip_match:
-                                data['zip_code'] = zip_match.group(1)
-                        elif 'phone' in key:
-                            data['phone'] = value
-                        elif 'service type' in key:
-                            data['service_types'] = value
-                        elif 'years in business' in key or 'years experience' in key:
-                            data['years_in_business'] = value
-                        elif 'rentals managed' in key or 'properties managed' in key:
-                            data['rentals_managed'] = value
-                        elif 'better business bureau' in key or 'bbb' in key:
-                            data['bbb_rating'] = value
-                        elif 'management fee' in key:
-                            data['management_fee'] = value
-                        elif 'tenant placement fee' in key or 'placement fee' in key:
-                            data['tenant_placement_fee'] = value
-                        elif 'lease renewal fee' in key or 'renewal fee' in key:
-                            data['lease_renewal_fee'] = value
-                        elif 'miscellaneous fee' in key or 'misc' in key or 'other fee' in key:
-                            data['miscellaneous_fees'] = value
-                        elif 'email' in key:
-                            data['email'] = value
-
-        return data
-
-    def scrape_multiple_cities(self, city_list: List[Dict]) -> pd.DataFrame:
+        detail_texts = [li.get_text(strip=True) for ul in section.lists for li in ul.find_all('li')]
+
+        return build_company_record(name, website, description_parts, detail_texts, city_name, state, url)
+
+    def iter_cities(self, city_list: List[Dict], ledger=None):
+        """
+        Scrape cities one by one, yielding (city_info, companies) as each finishes
+        With a ScrapeJobLedger every city is checkpointed as soon as it finishes
+        """
+        for city_info in city_list:
+            if ledger is not None:
+                companies = self.scrape_city_checkpointed(city_info, ledger)
+            else:
+                companies = self.scrape_city_page(
+                    city_info['url'],
+                    city_info['city'],
+                    city_info['state']
+                )
+            yield city_info, companies
+
+    def scrape_multiple_cities(self, city_list: List[Dict], ledger=None) -> pd.DataFrame:
         """Scrape multiple cities"""
         all_companies = []
 
-        for city_info in city_list:
-            companies = self.scrape_city_page(
-                city_info['url'],
-                city_info['city'],
-                city_info['state']
-            )
+        for _, companies in self.iter_cities(city_list, ledger):
             all_companies.extend(companies)
-            time.sleep(3)  # Be respectful
 
         return pd.DataFrame(all_companies)
 
+    def scrape_to_sinks(self, city_list: List[Dict], sinks: List, ledger=None) -> int:
+        """
+        Scrape multiple cities straight into streaming sinks (see sinks.py)
+        Records are flushed per city and not kept in memory; returns the count
+        """
+        total = 0
+
+        for _, companies in self.iter_cities(city_list, ledger):
+            for sink in sinks:
+                sink.write_records(companies)
+            total += len(companies)
+
+        return total
+
     def save_to_csv(self, df: pd.DataFrame, filename: str):
         """Save to CSV"""
+        if 'extras' in df.columns:
+            # Unmapped list items are stored as JSON text, like CSVSink does
+            df = df.assign(extras=df['extras'].map(lambda extras: json.dumps(extras) if extras else None))
         df.to_csv(filename, index=False, encoding='utf-8')
         print(f"\nData saved to {filename}")
 
@@ -0,0 +1,212 @@
+"""
+Persistent HTTP response cache for the scraper sessions
+Bodies are stored zlib-compressed in SQLite with their ETag/Last-Modified
+validators. Fresh entries are served without touching the network, stale ones
+are revalidated with a conditional GET (a 304 costs no body), and the cache is
+kept under a size limit by evicting least recently used entries.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Optional
+
+from requests.adapters import BaseAdapter
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url TEXT PRIMARY KEY,
+    status INTEGER,
+    headers TEXT,
+    body BLOB,
+    etag TEXT,
+    last_modified TEXT,
+    stored_at REAL,
+    last_used REAL,
+    size INTEGER
+);
+"""
+
+# Hop-by-hop / body-encoding headers that no longer describe the stored body
+DROP_HEADERS = ('content-encoding', 'content-length', 'transfer-encoding', 'connection')
+
+
+class CachedResponse:
+    """A cache entry: status, headers, decompressed body and its validators"""
+
+    __slots__ = ('url', 'status', 'headers', 'body', 'etag', 'last_modified', 'stored_at')
+
+    def __init__(self, url, status, headers, body, etag, last_modified, stored_at):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = stored_at
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since headers for revalidation"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    """
+    SQLite-backed response cache shared by threads (and the asyncio engine)
+    max_age: seconds an entry is served without revalidation
+    max_size: total compressed bytes kept before LRU eviction
+    """
+
+    def __init__(self, path: str = 'http_cache.db', max_age: float = 7 * 24 * 3600,
+                 max_size: int = 500 * 1024 * 1024, compression_level: int = 6):
+        self.path = path
+        self.max_age = max_age
+        self.max_size = max_size
+        self.compression_level = compression_level
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.conn:
+            self.conn.execute(SCHEMA)
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses(last_used)')
+        self.stats = {'hits': 0, 'revalidated': 0, 'misses': 0, 'stored': 0, 'evicted': 0}
+
+    def close(self):
+        self.conn.close()
+
+    def count(self, stat: str):
+        with self.lock:
+            self.stats[stat] += 1
+
+    def lookup(self, url: str) -> Optional[CachedResponse]:
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT status, headers, body, etag, last_modified, stored_at FROM responses WHERE url = ?', (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            self.conn.execute('UPDATE responses SET last_used = ? WHERE url = ?', (time.time(), url))
+            self.conn.commit()
+
+        status, headers, body, etag, last_modified, stored_at = row
+        return CachedResponse(url, status, json.loads(headers), zlib.decompress(body),
+                              etag, last_modified, stored_at)
+
+    def is_fresh(self, entry: CachedResponse) -> bool:
+        return time.time() - entry.stored_at < self.max_age
+
+    def store(self, url: str, status: int, headers, body: bytes):
+        """Store a 200 response unless the server forbids it"""
+        if status != 200 or 'no-store' in headers.get('Cache-Control', '').lower():
+            return
+
+        kept = {k: v for k, v in headers.items() if k.lower() not in DROP_HEADERS}
+        compressed = zlib.compress(body, self.compression_level)
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (url, status, json.dumps(kept), compressed, headers.get('ETag'),
+                 headers.get('Last-Modified'), now, now, len(compressed))
+            )
+            self.stats['stored'] += 1
+            self._evict()
+            self.conn.commit()
+
+    def refresh(self, url: str, headers=None):
+        """Mark an entry fresh again after a 304, taking any new validators"""
+        headers = headers or {}
+        with self.lock:
+            self.conn.execute(
+                'UPDATE responses SET stored_at = ?, last_used = ?, '
+                'etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified) WHERE url = ?',
+                (time.time(), time.time(), headers.get('ETag'), headers.get('Last-Modified'), url)
+            )
+            self.conn.commit()
+
+    def size(self) -> int:
+        with self.lock:
+            return self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+    def _evict(self):
+        total = self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total <= self.max_size:
+            return
+        for url, size in self.conn.execute('SELECT url, size FROM responses ORDER BY last_used').fetchall():
+            self.conn.execute('DELETE FROM responses WHERE url = ?', (url,))
+            self.stats['evicted'] += 1
+            total -= size
+            if total <= self.max_size:
+                break
+
+
+class CachingAdapter(BaseAdapter):
+    """
+    requests adapter that answers GETs from an HttpCache and otherwise delegates
+    to the wrapped adapter (normally the PoliteAdapter), so cache hits never
+    spend a politeness token
+    """
+
+    def __init__(self, cache: HttpCache, inner: BaseAdapter):
+        super().__init__()
+        self.cache = cache
+        self.inner = inner
+
+    def send(self, request, stream=False, **kwargs):
+        # Streaming callers read bodies incrementally, leave them uncached
+        if request.method != 'GET' or stream:
+            return self.inner.send(request, stream=stream, **kwargs)
+
+        entry = self.cache.lookup(request.url)
+        if entry is not None and self.cache.is_fresh(entry):
+            self.cache.count('hits')
+            return self._build_response(request, entry, 'HIT')
+
+        if entry is not None:
+            request = request.copy()
+            request.headers.update(entry.conditional_headers())
+
+        response = self.inner.send(request, stream=False, **kwargs)
+
+        if entry is not None and response.status_code == 304:
+            self.cache.count('revalidated')
+            self.cache.refresh(request.url, response.headers)
+            response.close()
+            return self._build_response(request, entry, 'REVALIDATED')
+
+        self.cache.count('misses')
+        self.cache.store(request.url, response.status_code, response.headers, response.content)
+        return response
+
+    def close(self):
+        self.inner.close()
+
+    @staticmethod
+    def _build_response(request, entry: CachedResponse, cache_status: str) -> Response:
+        response = Response()
+        response.status_code = entry.status
+        response.reason = 'OK'
+        response.headers = CaseInsensitiveDict(entry.headers)
+        response.headers['X-Cache'] = cache_status
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        response._content = entry.body
+        response._content_consumed = True
+        return response
+
+
+def install_cache(session, cache: HttpCache):
+    """Put the cache in front of a session's existing http(s) adapters"""
+    for prefix in ('http://', 'https://'):
+        session.mount(prefix, CachingAdapter(cache, session.adapters[prefix]))
+    return session
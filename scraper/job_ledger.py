@@ -0,0 +1,165 @@
+"""
+Scrape job ledger backed by the scrape_jobs table from database_schema.sql
+Uses a local SQLite file as a stand-in for Postgres so a long crawl can be
+checkpointed city by city and resumed after a crash
+"""
+
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, List
+
+# Same columns and constraint as scrape_jobs in database_schema.sql
+# (SERIAL becomes INTEGER PRIMARY KEY AUTOINCREMENT in SQLite)
+SCRAPE_JOBS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scrape_jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    city VARCHAR(100),
+    state VARCHAR(2),
+    url TEXT,
+    status VARCHAR(50),  -- 'pending', 'in_progress', 'completed', 'failed'
+    companies_found INTEGER DEFAULT 0,
+    started_at TIMESTAMP,
+    completed_at TIMESTAMP,
+    error_message TEXT,
+
+    CONSTRAINT unique_city_state UNIQUE(city, state)
+);
+"""
+
+# Scraped records are checkpointed alongside the job that produced them
+JOB_COMPANIES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scrape_job_companies (
+    job_id INTEGER REFERENCES scrape_jobs(id) ON DELETE CASCADE,
+    position INTEGER,
+    record TEXT,
+
+    PRIMARY KEY (job_id, position)
+);
+"""
+
+STATUS_PENDING = 'pending'
+STATUS_IN_PROGRESS = 'in_progress'
+STATUS_COMPLETED = 'completed'
+STATUS_FAILED = 'failed'
+
+
+def _now() -> str:
+    return datetime.now().isoformat(sep=' ', timespec='seconds')
+
+
+class ScrapeJobLedger:
+    """
+    Records the status of every city in a crawl
+    Each city is committed together with its companies as soon as it finishes
+    """
+
+    def __init__(self, path: str = 'scrape_jobs.db'):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA foreign_keys = ON')
+        with self.conn:
+            self.conn.execute(SCRAPE_JOBS_SCHEMA)
+            self.conn.execute(JOB_COMPANIES_SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def reset(self):
+        """Forget all jobs and checkpointed companies (fresh run)"""
+        with self.lock, self.conn:
+            self.conn.execute('DELETE FROM scrape_job_companies')
+            self.conn.execute('DELETE FROM scrape_jobs')
+
+    def register(self, city_list: List[Dict]):
+        """Add a pending job for every city not already in the ledger"""
+        with self.lock, self.conn:
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO scrape_jobs (city, state, url, status) VALUES (?, ?, ?, ?)',
+                [(c['city'], c['state'], c['url'], STATUS_PENDING) for c in city_list]
+            )
+
+    def start(self, city_info: Dict):
+        """Mark a city as in progress"""
+        with self.lock, self.conn:
+            self.conn.execute(
+                'UPDATE scrape_jobs SET status = ?, started_at = ?, error_message = NULL WHERE city = ? AND state = ?',
+                (STATUS_IN_PROGRESS, _now(), city_info['city'], city_info['state'])
+            )
+
+    def complete(self, city_info: Dict, companies: List[Dict]):
+        """Checkpoint a finished city and its companies in one transaction"""
+        with self.lock, self.conn:
+            job_id = self._job_id(city_info)
+            self.conn.execute('DELETE FROM scrape_job_companies WHERE job_id = ?', (job_id,))
+            self.conn.executemany(
+                'INSERT INTO scrape_job_companies (job_id, position, record) VALUES (?, ?, ?)',
+                [(job_id, i, json.dumps(company)) for i, company in enumerate(companies)]
+            )
+            self.conn.execute(
+                'UPDATE scrape_jobs SET status = ?, companies_found = ?, completed_at = ?, error_message = NULL WHERE id = ?',
+                (STATUS_COMPLETED, len(companies), _now(), job_id)
+            )
+
+    def fail(self, city_info: Dict, error: str):
+        """Mark a city as failed so a resumed run retries it"""
+        with self.lock, self.conn:
+            self.conn.execute(
+                'UPDATE scrape_jobs SET status = ?, completed_at = ?, error_message = ? WHERE city = ? AND state = ?',
+                (STATUS_FAILED, _now(), error, city_info['city'], city_info['state'])
+            )
+
+    def remaining(self, city_list: List[Dict]) -> List[Dict]:
+        """Cities that still need scraping: pending, failed or interrupted mid-run"""
+        completed = self._completed_keys()
+        return [c for c in city_list if (c['city'], c['state']) not in completed]
+
+    def load_companies(self, city_list: List[Dict]) -> List[Dict]:
+        """All checkpointed companies for the given cities, in city_list order"""
+        with self.lock:
+            rows = self.conn.execute(
+                'SELECT j.city, j.state, c.record FROM scrape_job_companies c '
+                'JOIN scrape_jobs j ON j.id = c.job_id ORDER BY c.job_id, c.position'
+            ).fetchall()
+
+        by_city = {}
+        for city, state, record in rows:
+            by_city.setdefault((city, state), []).append(json.loads(record))
+
+        companies = []
+        for city_info in city_list:
+            companies.extend(by_city.get((city_info['city'], city_info['state']), []))
+        return companies
+
+    def summary(self) -> Dict[str, int]:
+        """Number of jobs per status"""
+        with self.lock:
+            rows = self.conn.execute('SELECT status, COUNT(*) FROM scrape_jobs GROUP BY status').fetchall()
+        return dict(rows)
+
+    def _completed_keys(self):
+        with self.lock:
+            rows = self.conn.execute(
+                'SELECT city, state FROM scrape_jobs WHERE status = ?', (STATUS_COMPLETED,)
+            ).fetchall()
+        return set(rows)
+
+    def _job_id(self, city_info: Dict) -> int:
+        row = self.conn.execute(
+            'SELECT id FROM scrape_jobs WHERE city = ? AND state = ?', (city_info['city'], city_info['state'])
+        ).fetchone()
+        if row:
+            return row[0]
+        cursor = self.conn.execute(
+            'INSERT INTO scrape_jobs (city, state, url, status) VALUES (?, ?, ?, ?)',
+            (city_info['city'], city_info['state'], city_info['url'], STATUS_PENDING)
+        )
+        return cursor.lastrowid
@@ -0,0 +1,129 @@
+"""
+lxml fast parse path for city pages
+Mirrors FinalPropertyManagerScraper.company_sections/extract_company_from_section
+on an lxml tree with precompiled XPath, producing byte-identical records
+Select it with FinalPropertyManagerScraper(parser='lxml')
+"""
+
+import re
+from typing import Dict, List, Optional
+
+from lxml import etree
+from lxml import html as lxml_html
+
+from company_record import WEBSITE_LINK_PATTERN, CompanySection, build_company_record, clean_description, is_company_name
+
+CHARSET_PATTERN = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.IGNORECASE)
+
+# Company sections start at <h2 id="...">
+FIND_HEADINGS = etree.XPath('//h2[@id]')
+
+# Text nodes as BeautifulSoup's get_text() sees them: no comments, no script/style
+FIND_STRINGS = etree.XPath('.//text()[not(ancestor::script or ancestor::style or ancestor::template)]')
+
+
+def parse_document(content):
+    """Parse raw page bytes (or text) into an lxml HTML tree"""
+    if isinstance(content, bytes):
+        match = CHARSET_PATTERN.search(content[:4096])
+        encoding = match.group(1).decode('ascii') if match else 'utf-8'
+        try:
+            content = content.decode(encoding, errors='replace')
+        except LookupError:
+            content = content.decode('utf-8', errors='replace')
+    return lxml_html.document_fromstring(content)
+
+
+def company_sections(content) -> List[CompanySection]:
+    """
+    Split a city page into company sections in one pass over each content container
+    (same semantics as FinalPropertyManagerScraper.company_sections)
+    """
+    root = parse_document(content)
+
+    headings = FIND_HEADINGS(root)
+    heading_set = set(headings)
+    sections = {}
+
+    containers = {heading.getparent(): None for heading in headings}
+
+    for container in containers:
+        open_sections = []
+        for child in container:
+            name = child.tag
+            if not isinstance(name, str):  # comments / processing instructions
+                continue
+            if name == 'hr':
+                open_sections = []
+                continue
+            for section in open_sections:
+                section.add(child, name)
+            if child in heading_set:
+                section = CompanySection(child)
+                sections[child] = section
+                open_sections.append(section)
+
+    return [sections[heading] for heading in headings]
+
+
+def stripped_strings(element) -> List[str]:
+    """Non-empty stripped text nodes under element, in document order"""
+    return [s for s in (text.strip() for text in FIND_STRINGS(element)) if s]
+
+
+def single_string(element) -> Optional[str]:
+    """Equivalent of BeautifulSoup's Tag.string: the only child string, else None"""
+    nodes = []
+    if element.text:
+        nodes.append(element.text)
+    for child in element:
+        nodes.append(child)
+        if child.tail:
+            nodes.append(child.tail)
+        if len(nodes) > 1:
+            return None
+
+    if len(nodes) != 1:
+        return None
+    node = nodes[0]
+    if isinstance(node, str):
+        return node
+    if not isinstance(node.tag, str):  # a lone comment is still a string to bs4
+        return node.text
+    return single_string(node)
+
+
+def find_website_link(p):
+    """First <a> inside the paragraph whose only string matches 'Go to website'"""
+    for a in p.iter('a'):
+        string = single_string(a)
+        if string is not None and WEBSITE_LINK_PATTERN.search(string):
+            return a
+    return None
+
+
+def extract_company_from_section(section: CompanySection, city_name: str, state: str, url: str) -> Optional[Dict]:
+    """Extract company data from a CompanySection of lxml elements"""
+    name = ''.join(stripped_strings(section.heading))
+    if not is_company_name(name):
+        return None
+
+    website = None
+    description_parts = []
+    for p in section.paragraphs:
+        link = find_website_link(p)
+        if link is not None:
+            website = link.get('href')
+        else:
+            # <a> text is kept, links are never copied into descriptions
+            text = clean_description(' '.join(stripped_strings(p)))
+            if text:
+                description_parts.append(text)
+
+    detail_texts = [
+        ''.join(stripped_strings(li))
+        for ul in section.lists
+        for li in ul.iter('li')
+    ]
+
+    return build_company_record(name, website, description_parts, detail_texts, city_name, state, url)
@@ -0,0 +1,98 @@
+"""
+Vectorised parsing of the free-text numeric fields in the scraped data
+management_fee, years_in_business and rentals_managed arrive as text like
+"$75 – $110 per month", "8% – 10% of monthly rent", "13+ years" or "4,000+".
+Each parser runs one precompiled pattern with Series.str.extract over the
+column's distinct values only (a few hundred phrasings repeat across thousands
+of companies), spreads the results back with the factorize codes, and returns
+nullable numeric columns (missing values stay <NA>), so the analysis scripts
+never call a Python function per row.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+# A number as the analysis scripts have always read it: one thousands separator, optional decimals
+NUMBER = r'\d+(?:,\d+)?(?:\.\d+)?'
+
+# First number of a fee, an optional second one after a dash/"to" (a range), and % after either;
+# a first number followed by /digits is a fraction ("2/3 of the first month's rent"), not dollars
+FEE_PATTERN = re.compile(
+    rf'\$?(?P<low>{NUMBER})(?P<fraction>/\d)?\s*(?P<low_percent>%)?'
+    rf'(?:\s*(?:-|–|—|to)\s*\$?(?P<high>{NUMBER})\s*(?P<high_percent>%)?)?'
+)
+FIRST_INTEGER_PATTERN = re.compile(r'(\d+)')
+
+
+def _to_number(text: pd.Series, dtype: str) -> pd.Series:
+    return pd.to_numeric(text.str.replace(',', '', regex=False), errors='coerce').astype(dtype)
+
+
+def _as_text(series: pd.Series) -> pd.Series:
+    return series.astype('string')
+
+
+def _per_distinct_value(series: pd.Series, parse):
+    """Apply a vectorised parser to the distinct values of series and expand back to every row"""
+    codes, uniques = pd.factorize(series)  # missing values get code -1
+    # A trailing missing value parses to <NA> and stands in for code -1
+    text = _as_text(pd.Series(list(uniques) + [None], dtype=object))
+    result = parse(text).take(np.where(codes < 0, len(uniques), codes))
+    result.index = series.index
+    return result
+
+
+def parse_fee(series: pd.Series) -> pd.DataFrame:
+    """
+    Fee text -> DataFrame of fee_min, fee_max (Float64) and fee_is_percent (boolean)
+    "$150 per month" -> 150, 150, False; "$75-110" -> 75, 110, False;
+    "8 – 10% of monthly rent" -> 8, 10, True; "7.9 or 9.9% of rent" -> 7.9, 7.9, True
+    (a % and no $ anywhere); "2/3 of the first month's rent" and "Contact for pricing" -> <NA>
+    """
+    def parse(text):
+        parts = text.str.extract(FEE_PATTERN)
+        fraction = parts['fraction'].notna()
+        fee_min = _to_number(parts['low'].mask(fraction), 'Float64')
+        fee_max = _to_number(parts['high'].mask(fraction), 'Float64').fillna(fee_min)
+        percent_only = text.str.contains('%', regex=False) & ~text.str.contains('$', regex=False)
+        is_percent = (parts['low_percent'].notna() | parts['high_percent'].notna() | percent_only).astype('boolean')
+        is_percent[fee_min.isna()] = pd.NA
+        return pd.DataFrame({'fee_min': fee_min, 'fee_max': fee_max, 'fee_is_percent': is_percent})
+
+    return _per_distinct_value(series, parse)
+
+
+def parse_years(series: pd.Series) -> pd.Series:
+    """'13+ years' -> 13 (Int64), <NA> without a number"""
+    def parse(text):
+        return _to_number(text.str.extract(FIRST_INTEGER_PATTERN, expand=False), 'Int64')
+
+    return _per_distinct_value(series, parse)
+
+
+def parse_portfolio(series: pd.Series) -> pd.Series:
+    """'4,000+' -> 4000 (Int64), 'Unknown' -> <NA>"""
+    def parse(text):
+        digits = text.str.replace(',', '', regex=False).str.extract(FIRST_INTEGER_PATTERN, expand=False)
+        return _to_number(digits, 'Int64')
+
+    return _per_distinct_value(series, parse)
+
+
+def add_numeric_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add fee_numeric (first number of management_fee), fee_min, fee_max,
+    fee_is_percent, years_numeric and portfolio_numeric to df in place
+    """
+    if 'management_fee' in df:
+        fees = parse_fee(df['management_fee'])
+        df['fee_numeric'] = fees['fee_min']
+        for col in fees.columns:
+            df[col] = fees[col]
+    if 'years_in_business' in df:
+        df['years_numeric'] = parse_years(df['years_in_business'])
+    if 'rentals_managed' in df:
+        df['portfolio_numeric'] = parse_portfolio(df['rentals_managed'])
+    return df
@@ -0,0 +1,327 @@
+"""
+Capture / replay archive for crawled pages
+During a live crawl every response is appended to a WARC-style archive
+(one gzip member per record, WARC/1.0 headers, latest capture per URL wins,
+except that an error response never replaces an earlier 2xx capture).
+The parse stage can then run entirely from the archive with no network, so
+parser changes can be re-applied to a full crawl in seconds.
+
+Usage:
+  python page_archive.py replay crawl.warc.gz [--parser lxml] [--output out.csv]
+  python page_archive.py import crawl.warc.gz phoenix_page.html=https://ipropertymanagement.com/companies/phoenix-az
+  python page_archive.py list crawl.warc.gz
+"""
+
+import argparse
+import contextlib
+import io
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional
+
+from requests.adapters import BaseAdapter
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+CRLF = b'\r\n'
+MEMBER_PIECE = 64 * 1024  # compressed bytes fed to the decompressor at a time
+
+
+class ArchivedPage:
+    """One captured response"""
+
+    __slots__ = ('url', 'status', 'headers', 'body', 'captured_at')
+
+    def __init__(self, url: str, status: int, headers: Dict[str, str], body: bytes, captured_at: str):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.captured_at = captured_at
+
+
+def _encode_record(url: str, status: int, headers, body: bytes) -> bytes:
+    http_lines = [f"HTTP/1.1 {status}".encode('latin-1')]
+    for key, value in headers.items():
+        if key.lower() in ('content-encoding', 'transfer-encoding', 'content-length'):
+            continue
+        http_lines.append(f"{key}: {value}".encode('latin-1', errors='replace'))
+    http_lines.append(f"Content-Length: {len(body)}".encode('latin-1'))
+    http_block = CRLF.join(http_lines) + CRLF + CRLF + body
+
+    warc_headers = [
+        b'WARC/1.0',
+        b'WARC-Type: response',
+        b'WARC-Target-URI: ' + url.encode('utf-8'),
+        b'WARC-Date: ' + datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ').encode('ascii'),
+        b'Content-Type: application/http; msgtype=response',
+        b'Content-Length: ' + str(len(http_block)).encode('ascii'),
+    ]
+    return CRLF.join(warc_headers) + CRLF + CRLF + http_block + CRLF + CRLF
+
+
+def _decode_record(data: bytes) -> ArchivedPage:
+    warc_head, _, rest = data.partition(CRLF + CRLF)
+    warc = _parse_header_lines(warc_head.split(CRLF)[1:])
+    http_block = rest[:int(warc['Content-Length'])]
+
+    http_head, _, body = http_block.partition(CRLF + CRLF)
+    lines = http_head.split(CRLF)
+    status = int(lines[0].split()[1])
+    headers = _parse_header_lines(lines[1:])
+    return ArchivedPage(warc['WARC-Target-URI'], status, headers, body, warc.get('WARC-Date'))
+
+
+def _parse_header_lines(lines: List[bytes]) -> Dict[str, str]:
+    headers = {}
+    for line in lines:
+        key, _, value = line.decode('utf-8', errors='replace').partition(':')
+        headers[key.strip()] = value.strip()
+    return headers
+
+
+class PageArchiveWriter:
+    """Appends captured responses to an archive file; safe to share between threads"""
+
+    def __init__(self, path: str, compression_level: int = 6):
+        self.path = path
+        self.compression_level = compression_level
+        self.lock = threading.Lock()
+        self.file = open(path, 'ab')
+        self.count = 0
+
+    def write(self, url: str, status: int, headers, body: bytes):
+        compressor = zlib.compressobj(self.compression_level, zlib.DEFLATED, 31)  # gzip member
+        member = compressor.compress(_encode_record(url, status, headers, body)) + compressor.flush()
+        with self.lock:
+            self.file.write(member)
+            self.file.flush()
+            self.count += 1
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class PageArchive:
+    """
+    Read side of an archive: iterate captured pages or look one up by URL
+    When a URL was captured more than once, the latest capture is used, unless
+    it is an error (429/503/404...) and an earlier capture succeeded: a later
+    throttled or failed fetch must not hide a good page from replay.
+    The archive is decompressed once, on open: the page kept per URL is
+    decided and superseded captures are dropped as the scan passes them
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            data = f.read()
+        self.pages = {}  # url -> ArchivedPage, in order of the latest capture
+        for record in _iter_members(data):
+            page = _decode_record(record)
+            kept = self.pages.pop(page.url, None)
+            if kept is not None and _succeeded(kept) and not _succeeded(page):
+                page = kept
+            self.pages[page.url] = page
+
+    def __len__(self):
+        return len(self.pages)
+
+    def __contains__(self, url: str):
+        return url in self.pages
+
+    def __iter__(self) -> Iterator[ArchivedPage]:
+        return iter(list(self.pages.values()))
+
+    def urls(self) -> List[str]:
+        return list(self.pages)
+
+    def get(self, url: str) -> Optional[ArchivedPage]:
+        return self.pages.get(url)
+
+
+def _succeeded(page: ArchivedPage) -> bool:
+    return 200 <= page.status < 300
+
+
+def _iter_members(data: bytes, piece_size: int = MEMBER_PIECE) -> Iterator[bytes]:
+    """
+    Decompressed gzip members of data, in order
+    Input is fed through a memoryview piece by piece, so finding where a member
+    ends copies at most one piece (unused_data), never the rest of the file.
+    A truncated last member (a crawl killed mid-write) is skipped
+    """
+    view = memoryview(data)
+    offset = 0
+    while offset < len(view):
+        decompressor = zlib.decompressobj(31)
+        parts = []
+        position = offset
+        while not decompressor.eof and position < len(view):
+            piece = view[position:position + piece_size]
+            parts.append(decompressor.decompress(piece))
+            position += len(piece)
+        if not decompressor.eof:
+            return
+        yield b''.join(parts)
+        offset = position - len(decompressor.unused_data)
+
+
+class CaptureAdapter(BaseAdapter):
+    """requests adapter that records every response passing through the wrapped adapter"""
+
+    def __init__(self, writer: PageArchiveWriter, inner: BaseAdapter):
+        super().__init__()
+        self.writer = writer
+        self.inner = inner
+
+    def send(self, request, stream=False, **kwargs):
+        response = self.inner.send(request, stream=stream, **kwargs)
+        if request.method == 'GET' and not stream:
+            self.writer.write(request.url, response.status_code, response.headers, response.content)
+        return response
+
+    def close(self):
+        self.inner.close()
+
+
+class ReplayAdapter(BaseAdapter):
+    """requests adapter that answers from an archive only; unarchived URLs get a 404"""
+
+    def __init__(self, archive: PageArchive):
+        super().__init__()
+        self.archive = archive
+
+    def send(self, request, **kwargs):
+        page = self.archive.get(request.url)
+        response = Response()
+        response.url = request.url
+        response.request = request
+        if page is None:
+            response.status_code = 404
+            response.reason = 'Not Archived'
+            response._content = b''
+        else:
+            response.status_code = page.status
+            response.reason = 'OK'
+            response.headers = CaseInsensitiveDict(page.headers)
+            response.encoding = get_encoding_from_headers(response.headers)
+            response._content = page.body
+        response._content_consumed = True
+        return response
+
+    def close(self):
+        pass
+
+
+def install_capture(session, writer: PageArchiveWriter):
+    """Record everything a session downloads (outermost, so cache hits are captured too)"""
+    for prefix in ('http://', 'https://'):
+        session.mount(prefix, CaptureAdapter(writer, session.adapters[prefix]))
+    return session
+
+
+def install_replay(session, archive: PageArchive):
+    """Serve a session entirely from an archive, no network"""
+    adapter = ReplayAdapter(archive)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def city_from_url(url: str) -> Optional[Dict[str, str]]:
+    """City info for a /companies/<city>-<state> URL, using get_all_city_urls' slug rules"""
+    path = url.split('://', 1)[-1]
+    if '/companies/' not in path or path.count('/') != 2:
+        return None
+    city_slug = path.rstrip('/').split('/')[-1]
+    parts = city_slug.rsplit('-', 1)
+    if len(parts) != 2 or not parts[0]:
+        return None
+    return {
+        'city': parts[0].replace('-', ' ').title(),
+        'state': parts[1].upper(),
+        'slug': city_slug,
+        'url': url,
+    }
+
+
+def replay_city_pages(archive: PageArchive, scraper, city_list: Optional[List[Dict]] = None,
+                      quiet: bool = True) -> List[Dict]:
+    """
+    Run the parse stage over archived city pages at CPU speed
+    Without a city_list, every archived /companies/<city>-<state> page is parsed
+    """
+    if city_list is None:
+        city_list = [c for c in (city_from_url(url) for url in archive.urls()) if c]
+
+    all_companies = []
+    for city_info in city_list:
+        page = archive.get(city_info['url'])
+        if page is None or page.status != 200:
+            print(f"Not archived: {city_info['url']}")
+            continue
+        output = io.StringIO() if quiet else None
+        with contextlib.redirect_stdout(output) if quiet else contextlib.nullcontext():
+            companies = scraper.parse_city_page(page.body, city_info['city'], city_info['state'], city_info['url'])
+        all_companies.extend(companies)
+    return all_companies
+
+
+def main():
+    import pandas as pd
+    from final_scraper import FinalPropertyManagerScraper, PARSERS
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    replay = commands.add_parser('replay', help='Parse every archived city page')
+    replay.add_argument('archive')
+    replay.add_argument('--parser', choices=PARSERS, default='html.parser')
+    replay.add_argument('--output', help='Write records to this CSV file')
+
+    importer = commands.add_parser('import', help='Add saved HTML files to an archive')
+    importer.add_argument('archive')
+    importer.add_argument('pages', nargs='+', metavar='FILE=URL')
+
+    lister = commands.add_parser('list', help='List archived URLs')
+    lister.add_argument('archive')
+
+    args = parser.parse_args()
+
+    if args.command == 'import':
+        with PageArchiveWriter(args.archive) as writer:
+            for item in args.pages:
+                filename, url = item.split('=', 1)
+                with open(filename, 'rb') as f:
+                    writer.write(url, 200, {'Content-Type': 'text/html; charset=utf-8'}, f.read())
+        print(f"Archived {len(args.pages)} pages to {args.archive}")
+
+    elif args.command == 'list':
+        archive = PageArchive(args.archive)
+        for page in archive:
+            print(f"{page.status}  {len(page.body):9,d} bytes  {page.captured_at}  {page.url}")
+        print(f"\n{len(archive)} URLs")
+
+    else:
+        archive = PageArchive(args.archive)
+        scraper = FinalPropertyManagerScraper(parser=args.parser)
+        start = time.perf_counter()
+        companies = replay_city_pages(archive, scraper)
+        elapsed = time.perf_counter() - start
+        print(f"Parsed {len(companies)} companies from {len(archive)} archived pages in {elapsed:.2f}s")
+        if args.output:
+            scraper.save_to_csv(pd.DataFrame(companies), args.output)
+
+
+if __name__ == "__main__":
+    main()
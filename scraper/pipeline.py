@@ -0,0 +1,158 @@
+"""
+Two-stage crawl pipeline for FinalPropertyManagerScraper
+Fetch threads download city pages onto a bounded queue; a process pool parses
+whole pages and sends back plain record dicts, so parsing scales past the GIL.
+The queue and a cap on unconsumed parse jobs bound how many raw pages are held
+in memory: when parsing falls behind, fetchers block instead of piling up pages.
+"""
+
+import contextlib
+import io
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from final_scraper import FinalPropertyManagerScraper
+from politeness import PolitenessScheduler
+
+# Per-process scraper used by parse_page (set by the pool initializer)
+_worker_scraper = None
+
+
+def _init_worker(parser: str):
+    global _worker_scraper
+    _worker_scraper = FinalPropertyManagerScraper(PolitenessScheduler(), parser=parser)
+
+
+def parse_page(content: bytes, city_name: str, state: str, city_url: str) -> List[Dict]:
+    """Process-pool task: parse one downloaded city page into record dicts"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return _worker_scraper.parse_city_page(content, city_name, state, city_url)
+
+
+class PipelinedCrawl:
+    """
+    Fetch/parse pipeline with the same interface as the scraper's crawl methods
+    fetch_workers: threads downloading pages (politeness still applies per host)
+    parse_workers: processes parsing pages (default: all cores)
+    queue_size: downloaded pages waiting for a parse worker
+    """
+
+    def __init__(self, scraper: Optional[FinalPropertyManagerScraper] = None, fetch_workers: int = 4,
+                 parse_workers: Optional[int] = None, queue_size: Optional[int] = None):
+        self.scraper = scraper or FinalPropertyManagerScraper()
+        self.fetch_workers = fetch_workers
+        self.parse_workers = parse_workers or os.cpu_count() or 1
+        self.queue_size = queue_size or 2 * self.parse_workers
+        # Parse jobs submitted but not yet handed to the caller
+        self.max_in_flight = 2 * self.parse_workers
+        self.peak_queued = 0
+
+    def _fetch_worker(self, todo: queue.Queue, pages: queue.Queue, ledger):
+        """Download cities until the work queue is empty"""
+        while True:
+            try:
+                city_info = todo.get_nowait()
+            except queue.Empty:
+                return
+            if ledger is not None:
+                ledger.start(city_info)
+            try:
+                response = self.scraper.session.get(city_info['url'])
+                response.raise_for_status()
+                item = (city_info, response.content, None)
+            except Exception as e:
+                item = (city_info, None, e)
+            # Blocks while the queue is full: backpressure on the fetch stage
+            pages.put(item)
+            self.peak_queued = max(self.peak_queued, pages.qsize())
+
+    def _dispatch(self, pool: ProcessPoolExecutor, pages: queue.Queue, results: queue.Queue,
+                  slots: threading.Semaphore, total: int):
+        """Move downloaded pages into the process pool, at most max_in_flight at a time"""
+        for _ in range(total):
+            city_info, content, error = pages.get()
+            slots.acquire()
+            if error is not None:
+                results.put((city_info, None, error))
+                continue
+            try:
+                future = pool.submit(parse_page, content, city_info['city'], city_info['state'], city_info['url'])
+            except RuntimeError:  # pool shut down, the caller stopped early
+                return
+            future.add_done_callback(
+                lambda f, city_info=city_info: results.put((city_info, *_outcome(f)))
+            )
+
+    def iter_cities(self, city_list: List[Dict], ledger=None):
+        """
+        Crawl cities, yielding (city_info, companies) in completion order
+        With a ScrapeJobLedger every city is checkpointed as it is yielded
+        """
+        if not city_list:
+            return
+
+        todo = queue.Queue()
+        for city_info in city_list:
+            todo.put(city_info)
+        pages = queue.Queue(maxsize=self.queue_size)
+        results = queue.Queue()
+        slots = threading.Semaphore(self.max_in_flight)
+
+        with ProcessPoolExecutor(self.parse_workers, initializer=_init_worker,
+                                 initargs=(self.scraper.parser,)) as pool:
+            # Start the workers before any fetch thread exists (forking a threaded process is unsafe)
+            pool.submit(int).result()
+
+            threads = [
+                threading.Thread(target=self._fetch_worker, args=(todo, pages, ledger), daemon=True)
+                for _ in range(min(self.fetch_workers, len(city_list)))
+            ]
+            threads.append(threading.Thread(target=self._dispatch, daemon=True,
+                                            args=(pool, pages, results, slots, len(city_list))))
+            for thread in threads:
+                thread.start()
+
+            for _ in range(len(city_list)):
+                city_info, companies, error = results.get()
+                slots.release()
+                if error is not None:
+                    print(f"Error scraping {city_info['url']}: {str(error)}")
+                    if ledger is not None:
+                        ledger.fail(city_info, str(error))
+                    companies = []
+                else:
+                    print(f"Scraped: {city_info['city']}, {city_info['state']} - {len(companies)} companies")
+                    if ledger is not None:
+                        ledger.complete(city_info, companies)
+                yield city_info, companies
+
+    def scrape_multiple_cities(self, city_list: List[Dict], ledger=None) -> pd.DataFrame:
+        """Drop-in replacement for the sequential scraper method (records in completion order)"""
+        all_companies = []
+
+        for _, companies in self.iter_cities(city_list, ledger):
+            all_companies.extend(companies)
+
+        return pd.DataFrame(all_companies)
+
+    def scrape_to_sinks(self, city_list: List[Dict], sinks: List, ledger=None) -> int:
+        """Streaming counterpart of scrape_multiple_cities, returns the record count"""
+        total = 0
+
+        for _, companies in self.iter_cities(city_list, ledger):
+            for sink in sinks:
+                sink.write_records(companies)
+            total += len(companies)
+
+        return total
+
+
+def _outcome(future):
+    """(companies, error) of a finished parse job"""
+    error = future.exception()
+    return (None, error) if error is not None else (future.result(), None)
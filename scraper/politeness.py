@@ -0,0 +1,206 @@
+"""
+Per-host token-bucket politeness scheduler shared by all scrapers
+Replaces the hard-coded time.sleep() calls: every request takes a token
+from its host's bucket, and 429/503 responses (with Retry-After) slow the
+host down until it recovers
+"""
+
+import asyncio
+import contextlib
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# requests/second and burst size per domain (subdomains match too)
+DOMAIN_LIMITS = {
+    'ipropertymanagement.com': (0.5, 1),
+}
+
+# Company websites each live on their own host, so the default only
+# limits how hard we hit a single site (homepage + contact page)
+DEFAULT_RATE = 2.0
+DEFAULT_BURST = 2
+
+THROTTLE_STATUSES = (429, 503)
+
+# Per-thread cancel event for requests still waiting for their token (see cancel_on)
+_cancel = threading.local()
+
+
+class RequestCancelled(requests.RequestException):
+    """The caller gave up on a request while it waited for its host's token; it was never sent"""
+
+
+@contextlib.contextmanager
+def cancel_on(event: threading.Event):
+    """Requests this thread makes inside the block are dropped, unsent, once event is set"""
+    previous = getattr(_cancel, 'event', None)
+    _cancel.event = event
+    try:
+        yield
+    finally:
+        _cancel.event = previous
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP-date) into seconds"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class TokenBucket:
+    """
+    Token bucket for a single host
+    Tokens may go negative: each caller reserves a token and is told how long
+    to wait for it, so waiting happens outside the scheduler lock
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.backoff = 0.0
+
+    def reserve(self, now: float) -> float:
+        """Take one token, returning the delay before it may be used"""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        delay = 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+        return max(delay, self.blocked_until - now)
+
+
+class PolitenessScheduler:
+    """
+    Shared per-host scheduler, safe to use from threads and from asyncio
+    Backoff is multiplicative on 429/503 and recovers gradually on success
+    """
+
+    def __init__(self, domain_limits: Optional[Dict[str, Tuple[float, int]]] = None,
+                 default_rate: float = DEFAULT_RATE, default_burst: int = DEFAULT_BURST,
+                 initial_backoff: float = 5.0, max_backoff: float = 300.0):
+        self.domain_limits = DOMAIN_LIMITS if domain_limits is None else domain_limits
+        self.default_rate = default_rate
+        self.default_burst = default_burst
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def limits_for(self, host: str) -> Tuple[float, int]:
+        """Look up (rate, burst) for a host, matching parent domains too"""
+        host = host.split(':')[0].lower()
+        parts = host.split('.')
+        for i in range(len(parts)):
+            limits = self.domain_limits.get('.'.join(parts[i:]))
+            if limits:
+                return limits
+        return self.default_rate, self.default_burst
+
+    def _bucket(self, host: str) -> TokenBucket:
+        bucket = self.buckets.get(host)
+        if bucket is None:
+            bucket = TokenBucket(*self.limits_for(host))
+            self.buckets[host] = bucket
+        return bucket
+
+    def reserve(self, url: str) -> float:
+        """Reserve a request slot for url's host, returns seconds to wait"""
+        host = urlparse(url).netloc
+        with self.lock:
+            return self._bucket(host).reserve(time.monotonic())
+
+    def wait(self, url: str, cancel: Optional[threading.Event] = None):
+        """
+        Block the calling thread until url's host allows another request
+        Raises RequestCancelled if cancel is set before then
+        """
+        delay = self.reserve(url)
+        if cancel is not None:
+            if cancel.wait(delay) if delay > 0 else cancel.is_set():
+                raise RequestCancelled(f"Cancelled before sending {url}")
+        elif delay > 0:
+            time.sleep(delay)
+
+    async def wait_async(self, url: str):
+        """Asyncio version of wait(), does not block the event loop"""
+        delay = self.reserve(url)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def observe(self, url: str, status_code: int, retry_after: Optional[str] = None):
+        """Feed a response back so the host's rate adapts to it"""
+        host = urlparse(url).netloc
+        with self.lock:
+            bucket = self._bucket(host)
+            now = time.monotonic()
+
+            if status_code in THROTTLE_STATUSES:
+                bucket.backoff = min(self.max_backoff, max(self.initial_backoff, bucket.backoff * 2))
+                pause = parse_retry_after(retry_after)
+                if pause is None:
+                    pause = bucket.backoff
+                bucket.blocked_until = max(bucket.blocked_until, now + min(pause, self.max_backoff))
+                bucket.rate = max(bucket.base_rate / 16, bucket.rate / 2)
+            elif status_code < 400:
+                bucket.backoff = bucket.backoff / 2 if bucket.backoff > 1 else 0.0
+                bucket.rate = min(bucket.base_rate, bucket.rate + bucket.base_rate / 10)
+
+
+class PoliteAdapter(HTTPAdapter):
+    """
+    requests transport adapter that routes every request through the scheduler
+    Throttled responses are retried after the host's Retry-After/backoff; a
+    request made inside cancel_on(event) is dropped if event is set while it waits
+    """
+
+    def __init__(self, scheduler: PolitenessScheduler, throttle_retries: int = 2, **kwargs):
+        super().__init__(**kwargs)
+        self.scheduler = scheduler
+        self.throttle_retries = throttle_retries
+
+    def send(self, request, **kwargs):
+        for attempt in range(self.throttle_retries + 1):
+            self.scheduler.wait(request.url, getattr(_cancel, 'event', None))
+            response = super().send(request, **kwargs)
+            self.scheduler.observe(request.url, response.status_code,
+                                   response.headers.get('Retry-After'))
+            if response.status_code not in THROTTLE_STATUSES or attempt == self.throttle_retries:
+                return response
+            response.close()
+        return response
+
+
+_default_scheduler = None
+
+
+def get_default_scheduler() -> PolitenessScheduler:
+    """The process-wide scheduler all scrapers share unless given their own"""
+    global _default_scheduler
+    if _default_scheduler is None:
+        _default_scheduler = PolitenessScheduler()
+    return _default_scheduler
+
+
+def mount_politeness(session: requests.Session, scheduler: Optional[PolitenessScheduler] = None, **adapter_kwargs) -> requests.Session:
+    """Route all of a session's http(s) traffic through the scheduler"""
+    adapter = PoliteAdapter(scheduler or get_default_scheduler(), **adapter_kwargs)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
@@ -0,0 +1,66 @@
+"""
+Profile per-section extraction time on a saved city page
+Times the single-pass section split once, then every company section's
+extraction, for each parser backend
+
+Usage: python profile_sections.py [--page phoenix_page.html] [--parser lxml] [--top 10]
+"""
+
+import argparse
+import time
+
+import lxml_parser
+from final_scraper import FinalPropertyManagerScraper, PARSERS
+
+
+def profile(parser: str, content: bytes, top: int):
+    scraper = FinalPropertyManagerScraper(parser=parser)
+    if parser == 'lxml':
+        split, extract = lxml_parser.company_sections, lxml_parser.extract_company_from_section
+    else:
+        split, extract = scraper.company_sections, scraper.extract_company_from_section
+
+    start = time.perf_counter()
+    sections = split(content)
+    split_seconds = time.perf_counter() - start
+
+    timings = []
+    for section in sections:
+        start = time.perf_counter()
+        record = extract(section, 'Phoenix', 'AZ', 'profile')
+        elapsed = time.perf_counter() - start
+        name = record['name'] if record else '(skipped)'
+        nodes = 1 + len(section.paragraphs) + len(section.lists)
+        timings.append((elapsed, name, nodes))
+
+    extract_seconds = sum(t[0] for t in timings)
+
+    print(f"\n{'='*70}")
+    print(f"{parser}: {len(sections)} sections")
+    print(f"{'='*70}")
+    print(f"  Parse + split:   {split_seconds * 1000:8.2f} ms")
+    print(f"  Extraction:      {extract_seconds * 1000:8.2f} ms total, "
+          f"{extract_seconds / max(len(sections), 1) * 1000:.3f} ms/section")
+
+    print(f"\n  Slowest {min(top, len(timings))} sections:")
+    for elapsed, name, nodes in sorted(timings, reverse=True)[:top]:
+        print(f"    {elapsed * 1000:7.3f} ms  {nodes:2d} elements  {name[:45]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--page', default='phoenix_page.html')
+    parser.add_argument('--parser', choices=PARSERS, help='Profile one backend only')
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    with open(args.page, 'rb') as f:
+        content = f.read()
+
+    print(f"Profiling {args.page} ({len(content) / 1024:.0f} KB)")
+    for name in ([args.parser] if args.parser else PARSERS):
+        profile(name, content, args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,403 @@
+"""
+Data-quality report for scraped companies, computed in one pass and rendered as text, JSON or HTML
+build_report() takes one notna() matrix and one groupby over state and derives
+every metric from them: completeness, missing fields, fee availability,
+per-state breakdowns, BBB distribution and quality scores. Completeness covers
+the input's own columns only, not the numbers parsed from them. The result is a
+plain dict, so it can be saved as JSON next to an output file or rendered
+later without touching the data again.
+
+Usage: python quality_report.py [property_managers_CA_FL_DC_METRO.csv] [--format text|json|html] [--output report.html] [--states CA FL]
+"""
+
+import argparse
+import html
+import json
+import sys
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from columnar import NUMERIC_COLUMNS, load_companies
+
+CORE_FIELDS = ['name', 'address', 'phone', 'city', 'state', 'zip_code']
+BUSINESS_FIELDS = ['bbb_rating', 'years_in_business', 'rentals_managed', 'service_types']
+FEE_COLUMNS = {
+    'Management Fee': 'management_fee',
+    'Tenant Placement': 'tenant_placement_fee',
+    'Lease Renewal': 'lease_renewal_fee',
+    'Miscellaneous': 'miscellaneous_fees',
+}
+SERVICE_KEYWORDS = {
+    'Residential': 'residential',
+    'Commercial': 'commercial',
+    'Multi-Family': 'multi-family',
+    'Single Family': 'single family',
+    'HOA': 'hoa',
+    'Vacation Rental': 'vacation',
+}
+# (label, upper bound): fee and experience bounds are inclusive, portfolio bounds exclusive
+FEE_RANGES = [('$0-50', 50), ('$51-100', 100), ('$101-150', 150), ('$151+', np.inf)]
+EXPERIENCE_GROUPS = [('New (0-5 years)', 5), ('Established (6-15 years)', 15), ('Veteran (15+ years)', np.inf)]
+PORTFOLIO_GROUPS = [('Boutique (<100)', 100), ('Small (100-499)', 500), ('Medium (500-1,999)', 2000),
+                    ('Large (2,000+)', np.inf)]
+COMPLETE_PERCENT = 90
+SAMPLE_FIELDS = ['name', 'address', 'phone', 'bbb_rating', 'years_in_business', 'management_fee']
+
+
+def _value(value):
+    """numpy/pandas scalars -> plain JSON values, missing -> None"""
+    if value is None or value is pd.NA or (isinstance(value, float) and np.isnan(value)):
+        return None
+    if isinstance(value, (np.integer, np.bool_)):
+        return value.item()
+    if isinstance(value, np.floating):
+        return float(value)
+    return value
+
+
+def _stats(values: pd.Series) -> Optional[Dict]:
+    if len(values) == 0:
+        return None
+    return {'count': len(values), 'mean': float(values.mean()), 'median': float(values.median()),
+            'min': _value(values.min()), 'max': _value(values.max())}
+
+
+def _grouped(values: pd.Series, groups: List, right: bool = True) -> List[Dict]:
+    """Counts per (label, upper bound) group"""
+    labels = [label for label, _ in groups]
+    bins = [-np.inf] + [bound for _, bound in groups]
+    counts = pd.cut(values.astype('float64'), bins=bins, labels=labels, right=right).value_counts(sort=False)
+    return [{'label': label, 'companies': int(counts[label])} for label in labels]
+
+
+def _keyword_counts(series: pd.Series, keywords: Dict[str, str]) -> List[Dict]:
+    """Rows containing each keyword (case-insensitive), matched once per distinct value"""
+    codes, uniques = pd.factorize(series)
+    rows_per_value = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    lowered = pd.Series(uniques, dtype=object).astype(str).str.lower()
+    counts = []
+    for label, keyword in keywords.items():
+        hits = lowered.str.contains(keyword, regex=False).to_numpy()
+        counts.append({'label': label, 'companies': int(rows_per_value[hits].sum())})
+    return counts
+
+
+def build_report(df: pd.DataFrame, title: str = 'Scraped Companies') -> Dict:
+    """Every metric of the report from one pass over df (expects load_companies() columns)"""
+    rows = len(df)
+    present = df.notna()
+    filled = present.sum()  # the one null-count pass every section reads from
+    input_columns = [column for column in df.columns if column not in NUMERIC_COLUMNS]
+
+    def share(count: int, total: int = rows) -> float:
+        return count / total * 100 if total else 0.0
+
+    states = df['state'].astype(object)
+    by_state = present[input_columns].groupby(states).sum()
+    a_plus = (df['bbb_rating'] == 'A+').fillna(False).groupby(states).sum()
+    companies = states.value_counts()
+    samples = df.drop_duplicates('state').dropna(subset=['state']).sort_values('state')
+
+    bbb = df['bbb_rating'].astype(object).value_counts().sort_index()
+
+    fee_min = df['fee_min']
+    is_percent = df['fee_is_percent'].fillna(False).astype(bool)
+    flat_fees = fee_min[fee_min.notna() & ~is_percent]
+    percent_fees = fee_min[is_percent]
+    years = df['years_numeric'].dropna()
+    portfolio = df['portfolio_numeric'].dropna()
+
+    def score(fields: List[str]) -> float:
+        return share(int(filled[fields].sum()), rows * len(fields))
+
+    scores = {
+        'core': score(CORE_FIELDS),
+        'business': score(BUSINESS_FIELDS),
+        'pricing': score(['management_fee']),
+        'description': score(['description']),
+    }
+    scores['overall'] = sum(scores.values()) / 4
+
+    top_cities = df.groupby([df['city'].astype(object), states]).size().sort_values(ascending=False).head(20)
+    top_portfolios = df[df['portfolio_numeric'].notna()].nlargest(10, 'portfolio_numeric')
+
+    return {
+        'title': title,
+        'companies': rows,
+        'states': int(df['state'].nunique()),
+        'cities': int(df['city'].nunique()),
+        'completeness': [{'column': column, 'present': int(filled[column]), 'percent': share(int(filled[column]))}
+                         for column in input_columns],
+        'by_state': [{'state': state, 'companies': int(companies[state]), 'a_plus': int(a_plus[state]),
+                      'present': {column: int(count) for column, count in by_state.loc[state].items()}}
+                     for state in sorted(companies.index)],
+        'top_cities': [{'city': city, 'state': state, 'companies': int(count)}
+                       for (city, state), count in top_cities.items()],
+        'bbb_ratings': [{'rating': rating, 'companies': int(count)} for rating, count in bbb.items()],
+        'bbb_rated': int(filled['bbb_rating']),
+        'fees': {
+            'parsed': int(filled['fee_min']),
+            'flat': _stats(flat_fees),
+            'percent': _stats(percent_fees),
+            'ranges_quoted': int((df['fee_max'] > fee_min).fillna(False).sum()),
+            'flat_ranges': _grouped(flat_fees, FEE_RANGES),
+            'availability': [{'label': label, 'column': column, 'present': int(filled[column])}
+                             for label, column in FEE_COLUMNS.items()],
+        },
+        'service_types': _keyword_counts(df['service_types'], SERVICE_KEYWORDS),
+        'years': _stats(years),
+        'experience_groups': _grouped(years, EXPERIENCE_GROUPS),
+        'portfolio': _stats(portfolio),
+        'portfolio_groups': _grouped(portfolio, PORTFOLIO_GROUPS, right=False),
+        'top_portfolios': [{'name': row['name'], 'city': _value(row['city']), 'state': row['state'],
+                            'portfolio': _value(row['portfolio_numeric'])} for _, row in top_portfolios.iterrows()],
+        'samples': [{'state': row['state'], **{field: _value(row[field]) for field in SAMPLE_FIELDS}}
+                    for _, row in samples.iterrows()],
+        'scores': scores,
+    }
+
+
+def _check(percent: float, threshold: float) -> str:
+    return '✅' if percent >= threshold else '⚠️'
+
+
+def _percent(count: int, total: int) -> float:
+    """count as a percentage of total; 0 for an empty selection"""
+    return count / total * 100 if total else 0.0
+
+
+def _text(value) -> str:
+    return '-' if value is None else str(value)
+
+
+def render_text(report: Dict) -> str:
+    """The report as analyze_ca_fl_data.py prints it"""
+    rows = report['companies']
+    lines = []
+    out = lines.append
+
+    out(f"\n📊 OVERVIEW")
+    out("="*70)
+    out(f"Total Companies: {rows}")
+    out(f"States: {report['states']}")
+    out(f"Cities: {report['cities']}")
+
+    out(f"\n📍 COMPANIES BY STATE")
+    out("="*70)
+    for state in report['by_state']:
+        out(f"  {state['state']}: {state['companies']:4d} companies ({_percent(state['companies'], rows):5.1f}%)")
+
+    out(f"\n🏙️  TOP 20 CITIES")
+    out("="*70)
+    for city in report['top_cities']:
+        out(f"  {city['city']:25s} {city['state']:2s}: {city['companies']:3d} companies")
+
+    out(f"\n✅ DATA COMPLETENESS")
+    out("="*70)
+    for column in report['completeness']:
+        pct = column['percent']
+        status = "✅" if pct >= COMPLETE_PERCENT else "⚠️ " if pct >= 50 else "❌"
+        out(f"{status} {column['column']:30s}: {column['present']:4d}/{rows} ({pct:5.1f}%)")
+
+    out(f"\n⭐ BBB RATINGS DISTRIBUTION")
+    out("="*70)
+    for rating in report['bbb_ratings']:
+        pct = _percent(rating['companies'], report['bbb_rated'])
+        out(f"  {rating['rating']:3s}: {rating['companies']:4d} ({pct:5.1f}%) {'█' * int(pct / 2)}")
+
+    out(f"\n🏆 A+ RATED COMPANIES BY STATE")
+    out("="*70)
+    for state in report['by_state']:
+        pct = _percent(state['a_plus'], state['companies'])
+        out(f"  {state['state']}: {state['a_plus']:3d}/{state['companies']:3d} ({pct:5.1f}%)")
+
+    fees = report['fees']
+    out(f"\n💰 FEE STRUCTURE ANALYSIS")
+    out("="*70)
+    flat, percent = fees['flat'], fees['percent']
+    out(f"\nCompanies with extractable fees: {fees['parsed']} "
+        f"({flat['count'] if flat else 0} flat, {percent['count'] if percent else 0} percent of rent, "
+        f"{fees['ranges_quoted']} quoted as a range)")
+
+    if percent:
+        out(f"\nPercent-of-Rent Fees (lower bound):")
+        out(f"  Average: {percent['mean']:.1f}%")
+        out(f"  Median:  {percent['median']:.1f}%")
+        out(f"  Min:     {percent['min']:.1f}%")
+        out(f"  Max:     {percent['max']:.1f}%")
+
+    if flat:
+        out(f"\nFlat Management Fee Statistics:")
+        out(f"  Count:   {flat['count']} companies with flat fees")
+        out(f"  Average: ${flat['mean']:.2f}")
+        out(f"  Median:  ${flat['median']:.2f}")
+        out(f"  Min:     ${flat['min']:.2f}")
+        out(f"  Max:     ${flat['max']:.2f}")
+        out(f"\n  Fee Ranges:")
+        for group in fees['flat_ranges']:
+            out(f"    {group['label'] + ':':9s} {group['companies']} companies")
+
+    out(f"\n  Fee Type Availability:")
+    for fee in fees['availability']:
+        out(f"    {fee['label'] + ':':21s} {fee['present']:4d} ({_percent(fee['present'], rows):5.1f}%)")
+
+    out(f"\n🏢 SERVICE TYPES")
+    out("="*70)
+    for service in report['service_types']:
+        if service['companies'] > 0:
+            out(f"  {service['label']:20s}: {service['companies']:4d} companies ({_percent(service['companies'], rows):5.1f}%)")
+
+    out(f"\n📅 EXPERIENCE LEVELS")
+    out("="*70)
+    years = report['years']
+    if years:
+        out(f"\nYears in Business:")
+        out(f"  Average: {years['mean']:.1f} years")
+        out(f"  Median:  {years['median']:.1f} years")
+        out(f"  Min:     {years['min']:.0f} years")
+        out(f"  Max:     {years['max']:.0f} years")
+        out(f"\n  Experience Distribution:")
+        for group in report['experience_groups']:
+            out(f"    {group['label'] + ':':25s} {group['companies']:4d} ({_percent(group['companies'], years['count']):5.1f}%)")
+
+    out(f"\n🏘️  PORTFOLIO SIZES")
+    out("="*70)
+    portfolio = report['portfolio']
+    if portfolio:
+        out(f"\nProperties Managed:")
+        out(f"  Companies reporting: {portfolio['count']}")
+        out(f"  Average: {portfolio['mean']:.0f} properties")
+        out(f"  Median:  {portfolio['median']:.0f} properties")
+        out(f"  Min:     {portfolio['min']:.0f} properties")
+        out(f"  Max:     {portfolio['max']:.0f} properties")
+        out(f"\n  Portfolio Size Distribution:")
+        for group in report['portfolio_groups']:
+            out(f"    {group['label'] + ':':21s} {group['companies']:4d} ({_percent(group['companies'], portfolio['count']):5.1f}%)")
+
+    out(f"\n🌟 TOP 10 COMPANIES BY PORTFOLIO SIZE")
+    out("="*70)
+    for company in report['top_portfolios']:
+        out(f"  {company['name'][:40]:40s} {_text(company['city']):15s} {company['state']}: "
+            f"{company['portfolio']:>6,.0f} properties")
+
+    out(f"\n⚠️  MISSING DATA ANALYSIS")
+    out("="*70)
+    out(f"\nFields with <{COMPLETE_PERCENT}% completion:")
+    for column in report['completeness']:
+        if column['percent'] < COMPLETE_PERCENT:
+            out(f"  {column['column']:30s}: {rows - column['present']:4d} missing ({100 - column['percent']:5.1f}%)")
+
+    out(f"\n📋 SAMPLE COMPANIES (1 per state)")
+    out("="*70)
+    for sample in report['samples']:
+        out(f"\n{sample['state']} - {_text(sample['name'])}")
+        out(f"  Address: {_text(sample['address'])}")
+        out(f"  Phone: {_text(sample['phone'])}")
+        out(f"  BBB: {_text(sample['bbb_rating'])} | Experience: {_text(sample['years_in_business'])}")
+        out(f"  Fee: {_text(sample['management_fee'])}")
+
+    scores = report['scores']
+    out(f"\n{'='*70}")
+    out("📊 DATA QUALITY SCORES")
+    out("="*70)
+    out(f"\n  Core Contact Info:     {scores['core']:5.1f}%  {_check(scores['core'], 95)}")
+    out(f"  Business Information:  {scores['business']:5.1f}%  {_check(scores['business'], 90)}")
+    out(f"  Pricing Information:   {scores['pricing']:5.1f}%  {_check(scores['pricing'], 90)}")
+    out(f"  Descriptions:          {scores['description']:5.1f}%  {_check(scores['description'], 90)}")
+    out(f"  " + "-"*50)
+    out(f"  OVERALL QUALITY:       {scores['overall']:5.1f}%  {_check(scores['overall'], 90)}")
+
+    return '\n'.join(lines)
+
+
+def render_json(report: Dict) -> str:
+    return json.dumps(report, indent=2, ensure_ascii=False)
+
+
+def _table(headers: List[str], rows: List[List]) -> str:
+    head = ''.join(f"<th>{html.escape(str(header))}</th>" for header in headers)
+    body = ''.join('<tr>' + ''.join(f"<td>{html.escape(_text(cell))}</td>" for cell in row) + '</tr>'
+                   for row in rows)
+    return f"<table><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>"
+
+
+def _stats_rows(stats: Optional[Dict], unit: str = '') -> List[List]:
+    if not stats:
+        return []
+    return [[name.title(), f"{stats[name]:,.1f}{unit}" if name != 'count' else stats[name]]
+            for name in ('count', 'mean', 'median', 'min', 'max')]
+
+
+def render_html(report: Dict) -> str:
+    """Standalone HTML page with one table per section"""
+    rows = report['companies']
+    scores = report['scores']
+    fees = report['fees']
+    columns = [column['column'] for column in report['completeness']]
+    sections = [
+        ('Overview', _table(['Companies', 'States', 'Cities', 'Overall quality'],
+                            [[rows, report['states'], report['cities'], f"{scores['overall']:.1f}%"]])),
+        ('Quality scores', _table(['Score', 'Percent'],
+                                  [[name.title(), f"{value:.1f}%"] for name, value in scores.items()])),
+        ('Completeness', _table(['Column', 'Present', 'Percent'],
+                                [[column['column'], column['present'], f"{column['percent']:.1f}%"]
+                                 for column in report['completeness']])),
+        ('Completeness by state', _table(
+            ['State', 'Companies', 'A+'] + columns,
+            [[state['state'], state['companies'], state['a_plus']] +
+             [f"{_percent(state['present'][column], state['companies']):.0f}%" for column in columns]
+             for state in report['by_state']])),
+        ('Top cities', _table(['City', 'State', 'Companies'],
+                              [[city['city'], city['state'], city['companies']] for city in report['top_cities']])),
+        ('BBB ratings', _table(['Rating', 'Companies'],
+                               [[rating['rating'], rating['companies']] for rating in report['bbb_ratings']])),
+        ('Flat management fees ($)', _table(['Statistic', 'Value'], _stats_rows(fees['flat'])) +
+         _table(['Range', 'Companies'], [[group['label'], group['companies']] for group in fees['flat_ranges']])),
+        ('Percent-of-rent fees', _table(['Statistic', 'Value'], _stats_rows(fees['percent'], '%'))),
+        ('Fee availability', _table(['Fee', 'Companies'],
+                                    [[fee['label'], fee['present']] for fee in fees['availability']])),
+        ('Service types', _table(['Service', 'Companies'],
+                                 [[service['label'], service['companies']] for service in report['service_types']])),
+        ('Years in business', _table(['Statistic', 'Value'], _stats_rows(report['years'])) +
+         _table(['Group', 'Companies'], [[group['label'], group['companies']] for group in report['experience_groups']])),
+        ('Portfolio sizes', _table(['Statistic', 'Value'], _stats_rows(report['portfolio'])) +
+         _table(['Group', 'Companies'], [[group['label'], group['companies']] for group in report['portfolio_groups']])),
+        ('Top portfolios', _table(['Company', 'City', 'State', 'Properties'],
+                                  [[company['name'], company['city'], company['state'], f"{company['portfolio']:,}"]
+                                   for company in report['top_portfolios']])),
+    ]
+    title = html.escape(report['title'])
+    body = ''.join(f"<h2>{html.escape(heading)}</h2>{table}" for heading, table in sections)
+    return (f"<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>{title}</title>"
+            "<style>body{font-family:sans-serif;margin:2em}table{border-collapse:collapse;margin:0 0 1em}"
+            "th,td{border:1px solid #ccc;padding:2px 8px;text-align:left}th{background:#eee}</style></head>"
+            f"<body><h1>{title}</h1>{body}</body></html>\n")
+
+
+RENDERERS = {'text': render_text, 'json': render_json, 'html': render_html}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Data-quality report for scraped companies')
+    parser.add_argument('data', nargs='?', default='property_managers_CA_FL_DC_METRO.csv',
+                        help='CSV, JSON or Parquet dataset (see columnar.py)')
+    parser.add_argument('--format', choices=sorted(RENDERERS), default='text')
+    parser.add_argument('--output', help='Write the report here instead of stdout')
+    parser.add_argument('--states', nargs='+', help='Only these states')
+    args = parser.parse_args()
+
+    df = load_companies(args.data, states=args.states)
+    rendered = RENDERERS[args.format](build_report(df, title=f"Data Quality Report - {args.data}"))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(rendered)
+        print(f"Report saved to {args.output}")
+    else:
+        sys.stdout.write(rendered + '\n')
+
+
+if __name__ == "__main__":
+    main()
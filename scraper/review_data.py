@@ -5,8 +5,10 @@ Review the scraped test data
 import pandas as pd
 import json
 
-# Load the data
-df = pd.read_csv('property_managers_final.csv')
+from columnar import NUMERIC_COLUMNS, load_companies
+
+# Load the data (typed, with numeric fee/years/portfolio columns)
+df = load_companies('property_managers_final.csv')
 
 print("="*70)
 print("SCRAPED DATA REVIEW")
@@ -21,7 +23,7 @@ print(f"States: {df['source_state'].nunique()}")
 print("\n" + "="*70)
 print("COMPANIES BY CITY")
 print("="*70)
-city_counts = df.groupby(['source_city', 'source_state']).size().sort_values(ascending=False)
+city_counts = df.groupby(['source_city', 'source_state'], observed=True).size().sort_values(ascending=False)
 for (city, state), count in city_counts.items():
     print(f"  {city}, {state}: {count} companies")
 
@@ -29,7 +31,7 @@ for (city, state), count in city_counts.items():
 print("\n" + "="*70)
 print("DATA COMPLETENESS")
 print("="*70)
-for col in df.columns:
+for col in df.columns.difference(list(NUMERIC_COLUMNS), sort=False):  # the scraped fields, not the parsed numbers
     non_null = df[col].notna().sum()
     pct = (non_null / len(df)) * 100
     status = "✅" if pct >= 90 else "⚠️ " if pct >= 50 else "❌"
@@ -88,23 +90,17 @@ print("\n" + "="*70)
 print("FEE STRUCTURE ANALYSIS")
 print("="*70)
 
-# Extract numeric fees from management_fee column
-def extract_fee(fee_str):
-    if pd.isna(fee_str):
-        return None
-    import re
-    # Look for patterns like $150, $75-110, 10%, etc.
-    numbers = re.findall(r'\$?(\d+(?:,\d+)?(?:\.\d+)?)', str(fee_str))
-    if numbers:
-        # Return first number found, removing commas
-        return float(numbers[0].replace(',', ''))
-    return None
-
-df['fee_numeric'] = df['management_fee'].apply(extract_fee)
-valid_fees = df[df['fee_numeric'].notna()]['fee_numeric']
+# Numeric fees (fee_min/fee_max/fee_is_percent from normalise_fields): $150, $75-110, 10%, etc.
+is_percent = df['fee_is_percent'].fillna(False)
+valid_fees = df.loc[df['fee_min'].notna() & ~is_percent, 'fee_min']
+percent_fees = df.loc[is_percent, 'fee_min']
+
+if len(percent_fees) > 0:
+    print(f"\nPercent-of-Rent Fees: {len(percent_fees)} companies, "
+          f"average {percent_fees.mean():.1f}%, median {percent_fees.median():.1f}%")
 
 if len(valid_fees) > 0:
-    print(f"\nManagement Fee Statistics:")
+    print(f"\nFlat Management Fee Statistics:")
     print(f"  Average: ${valid_fees.mean():.2f}")
     print(f"  Median: ${valid_fees.median():.2f}")
     print(f"  Min: ${valid_fees.min():.2f}")
@@ -132,16 +128,6 @@ print("\n" + "="*70)
 print("EXPERIENCE LEVELS")
 print("="*70)
 
-def extract_years(year_str):
-    if pd.isna(year_str):
-        return None
-    import re
-    numbers = re.findall(r'(\d+)', str(year_str))
-    if numbers:
-        return int(numbers[0])
-    return None
-
-df['years_numeric'] = df['years_in_business'].apply(extract_years)
 valid_years = df[df['years_numeric'].notna()]['years_numeric']
 
 if len(valid_years) > 0:
@@ -2,13 +2,35 @@
 Scrape ALL OTHER cities from iPropertyManagement.com (excluding CA, FL, DC)
 Run this after scraping CA, FL, DC separately
 Estimated time: 20-30 minutes for remaining ~45 states
+
+Progress is checkpointed per city in scrape_jobs.db; after a crash run
+`python scrape_all_cities.py --resume` to scrape only the cities left
+
+With --capture crawl.warc.gz every downloaded page is archived, so the parse
+stage can be re-run offline with `python page_archive.py replay crawl.warc.gz`
 """
 
 from final_scraper import FinalPropertyManagerScraper
+from job_ledger import ScrapeJobLedger
+from page_archive import PageArchiveWriter
+import argparse
 import time
 from datetime import datetime
+import pandas as pd
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Scrape all cities outside CA, FL, DC")
+    parser.add_argument('--resume', action='store_true',
+                        help='Skip cities already completed in the job ledger and retry failed ones')
+    parser.add_argument('--ledger', default='scrape_jobs.db',
+                        help='SQLite job ledger file (default: scrape_jobs.db)')
+    parser.add_argument('--capture', metavar='ARCHIVE',
+                        help='Append every downloaded page to this archive for offline replay')
+    return parser.parse_args()
 
 def main():
+    args = parse_args()
+
     print("="*70)
     print("FULL SCRAPE - All Cities")
     print("="*70)
@@ -16,7 +38,8 @@ def main():
     start_time = datetime.now()
 
     # Initialize scraper
-    scraper = FinalPropertyManagerScraper()
+    capture = PageArchiveWriter(args.capture) if args.capture else None
+    scraper = FinalPropertyManagerScraper(capture=capture)
 
     # Get all cities
     print("\nFetching list of all cities...")
@@ -28,7 +51,20 @@ def main():
     all_cities = [c for c in all_cities if c['state'] not in excluded_states]
 
     print(f"\n{len(all_cities)} cities found (after excluding CA, FL, DC)")
-    print(f"Estimated time: {len(all_cities) * 4 / 60:.1f} minutes")
+
+    # Job ledger: a fresh run starts over, --resume only does what is left
+    ledger = ScrapeJobLedger(args.ledger)
+    cities_to_scrape = all_cities
+
+    if args.resume:
+        ledger.register(all_cities)
+        cities_to_scrape = ledger.remaining(all_cities)
+        print(f"\nResuming from {args.ledger}: {len(all_cities) - len(cities_to_scrape)} cities already completed")
+        for status, count in sorted(ledger.summary().items()):
+            print(f"  {status}: {count}")
+
+    print(f"\n{len(cities_to_scrape)} cities to scrape")
+    print(f"Estimated time: {len(cities_to_scrape) * 4 / 60:.1f} minutes")
     print("\nThis will scrape:")
     print(f"  - {len(all_cities)} cities across remaining US states")
     print(f"  - Estimated 2,000-3,500 property management companies")
@@ -40,14 +76,29 @@ def main():
     response = input("\nContinue? (yes/no): ").strip().lower()
     if response != 'yes':
         print("Cancelled.")
+        ledger.close()
+        if capture is not None:
+            capture.close()
         return
 
+    if not args.resume:
+        ledger.reset()
+        ledger.register(all_cities)
+
     print(f"\n{'='*70}")
     print("Starting scrape...")
     print(f"{'='*70}\n")
 
-    # Scrape all cities
-    df = scraper.scrape_multiple_cities(all_cities)
+    # Scrape remaining cities, committing each one to the ledger as it finishes
+    scraper.scrape_multiple_cities(cities_to_scrape, ledger=ledger)
+
+    # Final dataset includes cities completed by earlier (interrupted) runs
+    df = pd.DataFrame(ledger.load_companies(all_cities))
+    failed = ledger.summary().get('failed', 0)
+    ledger.close()
+    if capture is not None:
+        capture.close()
+        print(f"\nArchived {capture.count} pages to {args.capture}")
 
     # Calculate stats
     end_time = datetime.now()
@@ -59,6 +110,8 @@ def main():
     print(f"Time taken: {duration/60:.1f} minutes")
     print(f"Total companies scraped: {len(df)}")
     print(f"Average per city: {len(df)/len(all_cities):.1f}")
+    if failed:
+        print(f"Failed cities: {failed} (re-run with --resume to retry them)")
 
     # Show breakdown by state
     print(f"\nTop 10 states by company count:")
@@ -86,7 +139,7 @@ def main():
     print("\nNext steps:")
     print("  1. Review the CSV file to verify data quality")
     print("  2. Import into PostgreSQL using database_schema.sql")
-    print("  3. Run data validation and deduplication")
+    print("  3. Deduplicate across output files: python dedupe.py --unique property_managers_unique.csv")
     print("\n")
 
 
@@ -0,0 +1,189 @@
+"""
+Streaming record sinks for the scrapers
+Records are written and flushed as each city finishes, so memory stays flat
+and partial output can be read while a crawl is still running
+"""
+
+import csv
+import glob
+from abc import ABC, abstractmethod
+import json
+import os
+from typing import Dict, List, Optional
+
+
+class RecordSink(ABC):
+    """Base class: append records, flush, close (also usable as a context manager)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self.closed = False
+
+    def write_records(self, records: List[Dict]):
+        if not records:
+            return
+        for record in records:
+            self._write(record)
+        self.count += len(records)
+        self.file.flush()
+
+    @abstractmethod
+    def _write(self, record: Dict):
+        """Write one record to self.file"""
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CSVSink(RecordSink):
+    """
+    Append-only CSV writer
+    The header comes from `fieldnames` or the first record; with append=True an
+    existing file is continued without writing a second header
+    """
+
+    def __init__(self, path: str, fieldnames: Optional[List[str]] = None, append: bool = False):
+        super().__init__(path)
+        resume = append and os.path.exists(path) and os.path.getsize(path) > 0
+        if resume and fieldnames is None:
+            with open(path, newline='', encoding='utf-8') as f:
+                fieldnames = next(csv.reader(f))
+        self.file = open(path, 'a' if resume else 'w', newline='', encoding='utf-8')
+        self.fieldnames = fieldnames
+        self.header_written = resume
+        self.writer = None
+
+    def _write(self, record: Dict):
+        if self.writer is None:
+            if self.fieldnames is None:
+                self.fieldnames = list(record.keys())
+            self.writer = csv.DictWriter(self.file, fieldnames=self.fieldnames, extrasaction='ignore')
+            if not self.header_written:
+                self.writer.writeheader()
+                self.header_written = True
+        self.writer.writerow({key: _csv_value(value) for key, value in record.items()})
+
+
+class NDJSONSink(RecordSink):
+    """Newline-delimited JSON, one record per line"""
+
+    def __init__(self, path: str, append: bool = False):
+        super().__init__(path)
+        self.file = open(path, 'a' if append else 'w', encoding='utf-8')
+
+    def _write(self, record: Dict):
+        self.file.write(json.dumps(record))
+        self.file.write('\n')
+
+
+class JSONArraySink(RecordSink):
+    """
+    JSON array writer in the same records layout as save_to_json
+    The closing bracket is written on close(), so always use it as a context manager
+    """
+
+    def __init__(self, path: str, indent: int = 2):
+        super().__init__(path)
+        self.indent = indent
+        self.file = open(path, 'w', encoding='utf-8')
+        self.file.write('[')
+        self.empty = True
+
+    def _write(self, record: Dict):
+        body = json.dumps(record, indent=self.indent)
+        if self.indent:
+            body = body.replace('\n', '\n' + ' ' * self.indent)
+        self.file.write('\n' if self.empty else ',\n')
+        self.file.write(' ' * (self.indent or 0) + body)
+        self.empty = False
+
+    def close(self):
+        if not self.closed:
+            self.file.write(']\n' if self.empty else '\n]\n')
+        super().close()
+
+
+class ParquetSink(RecordSink):
+    """
+    Typed Parquet dataset partitioned by state (schema in columnar.py)
+    Each write_records() call adds one row group per state; a part file can be
+    read once close() has written its footer. With append=True new part files
+    are added next to existing ones, otherwise existing parts are replaced
+    """
+
+    def __init__(self, path: str, append: bool = False):
+        super().__init__(path)
+        import columnar  # pyarrow is only needed for Parquet output
+        columnar.require_pyarrow()
+        self.columnar = columnar
+        if not append:
+            for old in glob.glob(os.path.join(path, '*', 'part-*.parquet')):
+                os.remove(old)
+        self.part = columnar.next_part_number(path)
+        schema = columnar.company_schema()
+        self.schema = schema.remove(schema.get_field_index(columnar.PARTITION_COLUMN))
+        self.writers = {}  # state -> ParquetWriter of this sink's part file
+
+    def write_records(self, records: List[Dict]):
+        if records:
+            self.write_frame(self.columnar.records_to_frame(records))
+
+    def _write(self, record: Dict):
+        self.write_records([record])  # row groups are written per batch, never per record
+
+    def write_frame(self, df):
+        """Write a DataFrame already shaped by columnar.records_to_frame"""
+        partition = self.columnar.PARTITION_COLUMN
+        for state, group in df.groupby(partition, dropna=False, sort=False):
+            state = None if state is None or state != state else state
+            table = self.columnar.frame_to_table(group).drop_columns([partition])
+            self._writer(state).write_table(table)
+            self.count += len(group)
+
+    def _writer(self, state):
+        writer = self.writers.get(state)
+        if writer is None:
+            directory = self.columnar.partition_dir(self.path, state)
+            os.makedirs(directory, exist_ok=True)
+            target = os.path.join(directory, f"part-{self.part:05d}.parquet")
+            writer = self.columnar.pq.ParquetWriter(target, self.schema, compression='zstd')
+            self.writers[state] = writer
+        return writer
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            for writer in self.writers.values():
+                writer.close()
+
+
+def _csv_value(value):
+    """Nested values (dicts/lists) are stored as JSON text in CSV cells"""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value) if value else None
+    return value
+
+
+def open_sink(path: str, append: bool = False) -> RecordSink:
+    """Pick a sink from the file extension: .csv, .ndjson/.jsonl, .json or .parquet (a partitioned directory)"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.csv':
+        return CSVSink(path, append=append)
+    if ext in ('.ndjson', '.jsonl'):
+        return NDJSONSink(path, append=append)
+    if ext == '.json':
+        if append:
+            raise ValueError(f"JSON arrays cannot be appended to, use .ndjson instead: {path}")
+        return JSONArraySink(path)
+    if ext == '.parquet':
+        return ParquetSink(path, append=append)
+    raise ValueError(f"Unsupported output format: {path}")
@@ -0,0 +1,120 @@
+"""
+Link scoring and a bounded crawl frontier for email enrichment
+Internal links are scored by how likely the page behind them lists contact
+details (URL path, anchor text, footer placement); the enrichment scrapers
+visit the best ones first within a per-site page and time budget and stop as
+soon as a high-confidence email turns up.
+"""
+
+import heapq
+import re
+from typing import List, Optional, Tuple
+from urllib.parse import urljoin, urldefrag, urlparse
+
+from bs4 import BeautifulSoup
+
+# Words in a link's path or text, and how strongly they point at contact details
+LINK_KEYWORDS = {
+    'contact': 10, 'get in touch': 9, 'get-in-touch': 9, 'email': 8,
+    'team': 6, 'staff': 6, 'leasing': 6, 'owners': 5, 'people': 5,
+    'about': 5, 'office': 4, 'locations': 3, 'management': 2, 'support': 2,
+}
+# Pages that rarely list a company address, or are not pages at all
+SKIP_LINK_PATTERN = re.compile(
+    r'(blog|news|press|listing|login|sign-?in|portal|privacy|terms|careers|jobs|calendar|'
+    r'wp-content|wp-json|/feed|\.(pdf|jpe?g|png|gif|svg|zip|mp4|docx?|xlsx?)$)',
+    re.IGNORECASE
+)
+FOOTER_BONUS = 2
+
+# Role addresses that reach the office rather than one person
+ROLE_LOCAL_PARTS = (
+    'info', 'contact', 'hello', 'admin', 'office', 'leasing', 'rentals',
+    'management', 'manager', 'support', 'sales', 'inquiries', 'service',
+)
+
+
+def registered_host(url: str) -> str:
+    """Hostname without port and leading www."""
+    host = (urlparse(url).hostname or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+def is_confident_email(email: str, website: str) -> bool:
+    """A role address, or any address on the company's own domain"""
+    local, _, domain = email.lower().partition('@')
+    if local in ROLE_LOCAL_PARTS:
+        return True
+    host = registered_host(website)
+    return bool(host) and (domain == host or domain.endswith('.' + host) or host.endswith('.' + domain))
+
+
+def normalise_link(url: str) -> str:
+    """Dedupe key: no fragment, no trailing slash, lower-case host"""
+    url = urldefrag(url)[0]
+    parsed = urlparse(url)
+    path = parsed.path.rstrip('/') or '/'
+    return parsed._replace(netloc=parsed.netloc.lower(), path=path).geturl()
+
+
+def score_link(url: str, text: str, in_footer: bool = False) -> int:
+    """Contact likelihood of an internal link, 0 or less to skip it"""
+    path = urlparse(url).path.lower()
+    if SKIP_LINK_PATTERN.search(path):
+        return 0
+    text = ' '.join(text.lower().split())
+    score = max([weight for word, weight in LINK_KEYWORDS.items() if word in path or word in text] or [0])
+    if score and in_footer:
+        score += FOOTER_BONUS
+    if score and path.count('/') > 2:
+        score -= 1  # deep pages are usually listings, not contact pages
+    return score
+
+
+def scored_links(soup: BeautifulSoup, page_url: str) -> List[Tuple[int, str]]:
+    """(score, absolute url) for every scoring link to the same host as page_url"""
+    host = urlparse(page_url).netloc.lower()
+    links = []
+    for link in soup.find_all('a', href=True):
+        href = link['href'].strip()
+        if href.startswith(('mailto:', 'tel:', 'javascript:', '#')):
+            continue
+        url = urljoin(page_url, href)
+        parsed = urlparse(url)
+        if parsed.scheme not in ('http', 'https') or parsed.netloc.lower() != host:
+            continue
+        score = score_link(url, link.get_text(), link.find_parent('footer') is not None)
+        if score > 0:
+            links.append((score, url))
+    return links
+
+
+class CrawlFrontier:
+    """
+    Best-first queue of links to visit on one site
+    Every URL is queued at most once, and never if the site already fetched it
+    """
+
+    def __init__(self, seen=()):
+        self.heap = []
+        self.seen = {normalise_link(url) for url in seen}
+        self.order = 0  # ties keep document order
+
+    def add_links(self, soup: BeautifulSoup, page_url: str, depth: int):
+        for score, url in scored_links(soup, page_url):
+            key = normalise_link(url)
+            if key in self.seen:
+                continue
+            self.seen.add(key)
+            heapq.heappush(self.heap, (-score, self.order, url, depth))
+            self.order += 1
+
+    def pop(self) -> Optional[Tuple[str, int]]:
+        """Best remaining (url, depth), None when empty"""
+        if not self.heap:
+            return None
+        _, _, url, depth = heapq.heappop(self.heap)
+        return url, depth
+
+    def __len__(self):
+        return len(self.heap)
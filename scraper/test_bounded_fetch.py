@@ -0,0 +1,93 @@
+"""
+Test the bounded streaming fetch against a local server: non-HTML bodies are
+refused from the headers, large pages are cut at the byte cap, and reading
+stops at the first complete mailto: link
+"""
+
+import asyncio
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import aiohttp
+import requests
+
+from bounded_fetch import fetch_bounded, read_bounded_async
+from enrichment_outcomes import NOT_HTML, FetchError, classify_error
+
+FILLER = b'<p>' + b'Full-service residential property management. ' * 20 + b'</p>\n'
+HUGE_PAGE = b'<html><body>' + FILLER * 5000 + b'</body></html>'  # ~4.6 MB
+MAILTO_PAGE = b'<html><body><a href="mailto:office@acme.net">Email</a>' + FILLER * 2000 + b'</body></html>'
+
+PAGES = {
+    '/brochure.pdf': ('application/pdf', b'%PDF-1.4 ' + FILLER * 100),
+    '/huge': ('text/html; charset=utf-8', HUGE_PAGE),
+    '/contact': ('text/html', MAILTO_PAGE),
+}
+
+
+class StreamingHandler(BaseHTTPRequestHandler):
+    """Serves PAGES in 8 KB writes"""
+
+    def do_GET(self):
+        content_type, body = PAGES[self.path]
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        try:
+            for start in range(0, len(body), 8192):
+                self.wfile.write(body[start:start + 8192])
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client stopped reading
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_bounded_fetch():
+    print("=== Bounded fetch: content-type guard, byte cap, mailto early return ===\n")
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StreamingHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    try:
+        session = requests.Session()
+        try:
+            fetch_bounded(session, base_url + '/brochure.pdf', 5)
+            assert False, "PDF was read"
+        except FetchError as e:
+            assert classify_error(e) == NOT_HTML
+        print("✓ non-HTML content type refused before reading")
+
+        body = fetch_bounded(session, base_url + '/huge', 5, max_bytes=64 * 1024)
+        assert body == HUGE_PAGE[:64 * 1024]
+        print(f"✓ {len(HUGE_PAGE):,} byte page cut at {len(body):,} bytes")
+
+        full = fetch_bounded(session, base_url + '/contact', 5)
+        early = fetch_bounded(session, base_url + '/contact', 5, stop_at_mailto=True)
+        assert full == MAILTO_PAGE
+        assert b'mailto:office@acme.net"' in early and len(early) < 64 * 1024
+        print(f"✓ stopped at the mailto: link after {len(early):,} of {len(full):,} bytes")
+
+        async def fetch_async(path, **kwargs):
+            async with aiohttp.ClientSession() as client:
+                async with client.get(base_url + path) as response:
+                    return await read_bounded_async(response, **kwargs)
+
+        assert asyncio.run(fetch_async('/huge', max_bytes=64 * 1024)) == body
+        assert asyncio.run(fetch_async('/contact', stop_at_mailto=True)) == early
+        try:
+            asyncio.run(fetch_async('/brochure.pdf'))
+            assert False, "PDF was read"
+        except FetchError:
+            pass
+        print("✓ asyncio reader gives the same bodies")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    test_bounded_fetch()
@@ -0,0 +1,79 @@
+"""
+Test the typed Parquet output: records streamed through ParquetSink come back
+with the same values as the CSV, numbers parsed, and a load of a few columns
+and states reads only those partitions. CSV loads keep the file's own columns
+"""
+
+import os
+import tempfile
+
+import pandas as pd
+
+from columnar import COLUMNS, NUMERIC_COLUMNS, load_companies
+from sinks import CSVSink, open_sink
+
+CSV_FILE = 'property_managers_CA_FL_DC_METRO.csv'
+
+
+def sample_records():
+    records = pd.read_csv(CSV_FILE, dtype=str).groupby('state').head(100)
+    records = records.astype(object).where(records.notna(), None).to_dict('records')
+    records[0]['extras'] = {'Office Hours': 'Mon-Fri'}
+    return records
+
+
+def test_columnar():
+    print("=== Parquet sink: typed schema, partitioned by state ===\n")
+
+    records = sample_records()
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'companies.csv')
+        parquet_path = os.path.join(tmp, 'companies.parquet')
+
+        with CSVSink(csv_path) as csv_sink, open_sink(parquet_path) as parquet_sink:
+            for start in range(0, len(records), 100):  # one batch per "city"
+                csv_sink.write_records(records[start:start + 100])
+                parquet_sink.write_records(records[start:start + 100])
+        assert parquet_sink.count == len(records)
+
+        states = sorted({record['state'] for record in records})
+        assert sorted(os.listdir(parquet_path)) == [f"state={state}" for state in states]
+
+        from_csv = load_companies(csv_path)
+        from_parquet = load_companies(parquet_path)
+        assert list(from_parquet.columns) == COLUMNS
+        assert str(from_parquet['state'].dtype) == 'category' and str(from_parquet['fee_min'].dtype) == 'Float64'
+        key = ['state', 'name', 'address']
+        pd.testing.assert_frame_equal(from_parquet.sort_values(key).reset_index(drop=True),
+                                      from_csv.sort_values(key).reset_index(drop=True), check_categorical=False)
+        print(f"✓ {len(records)} records in {len(states)} state partitions, same values as the CSV")
+
+        first = from_parquet[from_parquet['name'] == records[0]['name']].iloc[0]
+        assert first['extras'] == '{"Office Hours": "Mon-Fri"}'
+        assert first['fee_min'] == 150 and not first['fee_is_percent'] and first['portfolio_numeric'] == 4000
+
+        state = states[-1]
+        subset = load_companies(parquet_path, columns=['name', 'fee_min', 'fee_is_percent', 'state'], states=[state])
+        assert list(subset.columns) == ['name', 'fee_min', 'fee_is_percent', 'state']
+        assert len(subset) == sum(record['state'] == state for record in records)
+        assert list(subset['state'].cat.categories) == [state]
+        print(f"✓ Column/state pruning: {len(subset)} {state} rows, 4 columns")
+
+        with open_sink(parquet_path, append=True) as parquet_sink:
+            parquet_sink.write_records(records[:10])
+        assert len(load_companies(parquet_path, columns=['name'])) == len(records) + 10
+        print(f"✓ Append adds part files next to the existing ones")
+
+        # An older CSV (no extras) with a column of its own: typed as is, nothing added or dropped
+        old_path = os.path.join(tmp, 'old.csv')
+        old = pd.read_csv(CSV_FILE, dtype=str).head(50).assign(reviewed_by='ops')
+        old.to_csv(old_path, index=False)
+        loaded = load_companies(old_path)
+        assert list(loaded.columns) == list(old.columns) + list(NUMERIC_COLUMNS)
+        assert (loaded['reviewed_by'] == 'ops').all() and str(loaded['reviewed_by'].dtype) == 'string'
+        assert loaded['portfolio_numeric'].notna().any()
+        print(f"✓ Older CSV loads with its own {len(old.columns)} columns plus the parsed ones")
+
+
+if __name__ == "__main__":
+    test_columnar()
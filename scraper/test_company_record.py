@@ -0,0 +1,73 @@
+"""
+Test the <li> key mapping of FieldMapper: when several labels match a key the
+earliest FIELD_RULES entry wins (as the old if/elif chain did), unknown
+labels land in extras, and the compiled regex agrees with a plain loop
+over the rules
+"""
+
+from company_record import FIELD_RULES, FieldMapper, new_company_record
+
+# Keys that contain the aliases of more than one rule -> the column that must win
+PRECEDENCE = {
+    'email address': 'address',  # 'address' is listed before 'email'
+    'office address & phone': 'address',
+    'phone / email': 'phone',
+    'bbb rating (years in business)': 'years_in_business',
+    'management fee and other fees': 'management_fee',
+    'misc placement fee': 'tenant_placement_fee',
+    'renewal fee (misc)': 'lease_renewal_fee',
+    'properties managed by service type': 'service_types',
+}
+
+UNKNOWN = ['office hours', 'languages spoken', 'license #', 'fees', '']
+
+
+def reference_column(key: str):
+    """First rule with an alias contained in key, the way the old if/elif chain read it"""
+    for aliases, column, _ in FIELD_RULES:
+        if any(alias in key for alias in aliases):
+            return column
+    return None
+
+
+def test_field_mapper():
+    print("=== FieldMapper: rule precedence and extras ===\n")
+
+    mapper = FieldMapper()
+    for key, column in PRECEDENCE.items():
+        assert mapper.resolve(key)[0] == column, (key, mapper.resolve(key))
+        assert reference_column(key) == column
+    print(f"✓ {len(PRECEDENCE)} keys matching several labels go to the earliest rule")
+
+    for key in UNKNOWN:
+        assert mapper.resolve(key) is None, key
+    all_aliases = [alias for aliases, _, _ in FIELD_RULES for alias in aliases]
+    for key in all_aliases + list(PRECEDENCE) + UNKNOWN:
+        for variant in (key, f"your {key} here", f"{key}\nsecond line"):
+            target = mapper.resolve(variant)
+            assert (target[0] if target else None) == reference_column(variant), variant
+    print(f"✓ Compiled alternation agrees with a plain loop over {len(FIELD_RULES)} rules")
+
+    data = new_company_record('Phoenix', 'AZ', 'https://example.com')
+    for text in ['Email Address: 1 Main St, Phoenix, AZ 85004',
+                 'Office Hours: Mon-Fri 9-5',
+                 'Languages Spoken: English: Spanish',
+                 'No colon here',
+                 'Phone: 602-555-0100']:
+        mapper.apply(data, text)
+    assert data['address'] == '1 Main St, Phoenix, AZ 85004' and data['zip_code'] == '85004'
+    assert data['email'] is None
+    assert data['phone'] == '602-555-0100'
+    assert data['extras'] == {'office hours': 'Mon-Fri 9-5', 'languages spoken': 'English: Spanish'}
+    print("✓ Unknown labels are kept in extras; items without a colon are ignored")
+
+    # Memoised answers match fresh ones, and the cache stops growing at its limit
+    small = FieldMapper(cache_size=2)
+    for key in ['phone', 'office hours', 'bbb', 'phone']:
+        assert small.resolve(key) == mapper.resolve(key)
+    assert len(small.cache) == 2
+    print("✓ Cached and uncached lookups agree")
+
+
+if __name__ == "__main__":
+    test_field_mapper()
@@ -0,0 +1,95 @@
+"""
+Test the bulk exporter against the SQLite stand-in (and Postgres when
+TEST_DATABASE_URL is set): one upsert per load keyed on name/city, last
+record wins, values fitted to the schema, a later load without emails keeps
+the stored ones, and a failed load writes nothing
+"""
+
+import os
+import sqlite3
+import tempfile
+
+from db_export import PostgresTarget, SQLiteTarget, export_companies
+
+RECORDS = [
+    {'name': 'Ziprent', 'city': 'Bakersfield', 'state': 'CA', 'phone': '(213) 722-6030',
+     'years_in_business': '6+ years', 'rentals_managed': '4,000+', 'service_types': 'Residential'},
+    {'name': 'Ziprent', 'city': 'Stockton', 'state': 'CA', 'phone': '+1 213.722.6030',
+     'management_fee': '$150 per month ' + 'x' * 200},
+    {'name': 'Oak Tree Property Management', 'city': 'Fresno', 'state': 'California', 'phone': 'call us'},
+    {'name': 'Ziprent', 'city': 'Bakersfield', 'state': 'CA', 'email': 'hello@ziprent.com'},  # later listing wins
+    {'name': '', 'city': 'Fresno'},
+]
+
+
+def fetch(target, sql):
+    target.cursor.execute(sql)
+    return target.cursor.fetchall()
+
+
+def check_target(make_target):
+    target = make_target()
+    target.create_schema()
+
+    stats = export_companies([RECORDS[:2], RECORDS[2:]], target)
+    assert (stats['inserted'], stats['updated'], stats['skipped']) == (3, 0, 1), stats
+    rows = fetch(target, "SELECT name, city, state, phone, email, years_experience, properties_managed, "
+                         "length(management_fee) FROM property_managers ORDER BY name, city")
+    assert rows[0][2:4] == (None, None)  # not a state code, not a phone
+    assert rows[1] == ('Ziprent', 'Bakersfield', 'CA', None, 'hello@ziprent.com', None, None, None)  # the whole later row
+    assert rows[2][3] == '(213) 722-6030' and rows[2][7] == 100
+
+    stats = export_companies([RECORDS[:1]], target)
+    assert (stats['inserted'], stats['updated']) == (0, 1), stats
+    assert fetch(target, "SELECT COUNT(*), MAX(years_experience), MAX(properties_managed) FROM property_managers")[0] == (3, 6, 4000)
+
+    # An enriched file, then a plain scrape of the same companies: the emails survive
+    enriched = [{'name': 'Acme Rentals', 'city': 'Reno', 'email': 'office@acme.com', 'website': 'https://acme.com'},
+                {'name': 'Ziprent', 'city': 'Stockton', 'email': 'stockton@ziprent.com'}]
+    plain = [{'name': 'Acme Rentals', 'city': 'Reno', 'phone': '775-555-0100'},
+             {'name': 'Ziprent', 'city': 'Stockton', 'email': None}]
+    export_companies([enriched], target)
+    stats = export_companies([plain], target)
+    assert (stats['inserted'], stats['updated']) == (0, 2), stats
+    assert fetch(target, "SELECT name, email, website, phone FROM property_managers "
+                         "WHERE name = 'Acme Rentals' OR city = 'Stockton' ORDER BY name") == [
+        ('Acme Rentals', 'office@acme.com', 'https://acme.com', '775-555-0100'),
+        ('Ziprent', 'stockton@ziprent.com', None, '(213) 722-6030'),
+    ]
+
+    def failing_batches():
+        yield [{'name': 'New Company', 'city': 'Reno'}]
+        raise RuntimeError('input truncated')
+
+    try:
+        export_companies(failing_batches(), target)
+        raise AssertionError('expected the load to fail')
+    except RuntimeError:
+        pass
+    assert fetch(target, "SELECT COUNT(*) FROM property_managers")[0][0] == 4
+    target.close()
+
+
+def test_db_export():
+    print("=== Bulk export: staged load + set-based upsert ===\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'propertifi.db')
+        check_target(lambda: SQLiteTarget(path))
+        assert sqlite3.connect(path).execute("SELECT COUNT(*) FROM property_managers").fetchone()[0] == 4
+    print("✓ SQLite: 3 inserted, rerun updates in place, emails kept over a plain reload, failed load rolled back")
+
+    dsn = os.environ.get('TEST_DATABASE_URL')
+    if dsn:
+        setup = PostgresTarget(dsn)
+        setup.cursor.execute('DROP TABLE IF EXISTS property_manager_reviews, scrape_jobs, property_managers')
+        setup.commit()
+        setup.close()
+        check_target(lambda: PostgresTarget(dsn))
+        print("✓ Postgres (COPY): same results")
+    else:
+        print("  (set TEST_DATABASE_URL to also run against Postgres)")
+
+
+if __name__ == "__main__":
+    test_db_export()
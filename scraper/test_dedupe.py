@@ -0,0 +1,101 @@
+"""
+Test company deduplication: formatting variants of one listing and branches
+sharing a website in one state cluster together; look-alike neighbours,
+companies that only share "Property Management", a multi-tenant host or a
+call-centre phone, and branches in other states stay apart; blocking keeps
+the comparisons far below all pairs
+"""
+
+import pandas as pd
+
+from dedupe import (CompanyDeduplicator, add_company_ids, core_name, normalise_address, normalise_phone,
+                    normalise_state, normalise_website, unique_companies)
+
+ROWS = [
+    # One office listed on three city pages, formatted differently
+    ('Ziprent', '1150 S Olive St 10th Floor, Los Angeles, CA 90015', '(213) 722-6030', None, '90015'),
+    ('Ziprent, LLC', '1150 S. Olive Street 10th Floor, Los Angeles, CA 90015', '213-722-6030', None, '90015'),
+    ('Ziprent', '1150 S Olive St 10th Floor, Los Angeles, CA 90015', '+1 213.722.6030', None, '90015'),
+    # Branches of a chain in one state: different phones and addresses, one website
+    ('Evernest Tucson', '5151 E Broadway Blvd, Tucson, AZ 85711', '520-299-5850', 'https://www.evernest.co/', '85711'),
+    ('Evernest Phoenix', '4222 E Thomas Rd, Phoenix, AZ 85018', '602-555-0101', 'evernest.co', '85018'),
+    # Same name and address, phone missing on one listing
+    ('Oak Tree Property Management', '12 Main Street Suite 4, Fresno, CA 93721', '559-555-0100', None, '93721'),
+    ('Oaktree Property Management Inc', '12 Main St Ste 4, Fresno, CA 93721', None, None, '93721'),
+    # Neighbours with similar names but nothing else in common
+    ('Oak Tree Realty', '900 Fulton St, Fresno, CA 93721', '559-555-0199', None, '93721'),
+    ('Sunrise Rentals', '44 Elm Ave, Fresno, CA 93722', '559-555-0142', 'https://facebook.com/sunrise', '93722'),
+    ('Sunset Homes', '77 Pine Ave, Fresno, CA 93722', '559-555-0177', 'https://facebook.com/sunset', '93722'),
+]
+
+# Real pairs that used to merge: only "Property Management" in common, plus
+# a multi-tenant host (different paths) or a shared call-centre phone
+APART = [
+    ('AP Property Management', '726 13th St Suite B, Fortuna, CA 95540', '707-726-2379',
+     'https://propertymanage.biz/ap', '95540'),
+    ('JKM Property Management, LLC', '211 E. Arlington Blvd., Greenville, NC 27858', '252-215-0651',
+     'https://propertymanage.biz/jkm', '27858'),
+    ('House Match Property Management', '27247 Madison Ave Ste 113, Temecula, CA 92590', '951-225-4020',
+     'https://www.housematchca.com/oceanside-property-management/', '92590'),
+    ('PURE Property Management', '29995 Technology Dr Ste 105A, Murrieta, CA 92563', '951-225-4020',
+     'https://temecula.purepm.co/', '92563'),
+    # The same chain in another state
+    ('Evernest Denver', '1350 17th St, Denver, CO 80202', '303-555-0101', 'evernest.co', '80202'),
+]
+
+
+def test_dedupe():
+    print("=== Deduplication: blocking + fuzzy matching into company IDs ===\n")
+
+    assert normalise_phone('+1 (213) 722-6030') == normalise_phone('213.722.6030') == '2137226030'
+    assert normalise_phone('722-6030') is None
+    assert normalise_address('12 Main Street Suite 4') == normalise_address('12 Main St Ste 4')
+
+    df = pd.DataFrame(ROWS, columns=['name', 'address', 'phone', 'website', 'zip_code'])
+    add_company_ids(df)
+    ids = df['company_id'].tolist()
+    assert ids[0] == ids[1] == ids[2]
+    assert ids[3] == ids[4]
+    assert ids[5] == ids[6]
+    assert len(set(ids)) == 6, ids  # Oak Tree Realty and both facebook pages stay separate
+    assert df['cluster_size'].tolist()[:3] == [3, 3, 3]
+    assert len(unique_companies(df)) == 6
+    print(f"✓ {len(df)} rows -> {len(set(ids))} companies")
+
+    assert core_name('JKM Property Management, LLC') == 'jkm'
+    assert core_name('Property Management Inc') == 'property management'
+    assert normalise_state('1150 S Olive St, Los Angeles, CA 90015', 'NV') == 'CA'
+    assert normalise_state('Downtown', 'nv') == 'NV'
+    assert normalise_website('https://www.Evernest.co/Tucson/?utm_source=x') == 'evernest.co/tucson'
+
+    df = pd.DataFrame(ROWS[3:5] + APART, columns=['name', 'address', 'phone', 'website', 'zip_code'])
+    ids = add_company_ids(df)['company_id'].tolist()
+    assert ids[0] == ids[1]
+    assert len(set(ids)) == len(ids) - 1, ids
+    print("✓ real look-alike pairs and out-of-state branches stay apart")
+
+    # A host carrying many different names is multi-tenant: its website proves nothing
+    tenants = pd.DataFrame([(f"{name} Property Management", f"{i} Oak St, Fresno, CA 9372{i}", f"559-555-01{i}0",
+                             'https://pmsites.net/', f"9372{i}")
+                            for i, name in enumerate(['Summit', 'Summit Realty', 'Harbor', 'Cedar', 'Birch'])],
+                           columns=['name', 'address', 'phone', 'website', 'zip_code'])
+    deduplicator = CompanyDeduplicator()
+    assert deduplicator.company_ids(tenants).nunique() == len(tenants)
+    assert deduplicator.shared_domains == {'pmsites.net'}
+    assert CompanyDeduplicator().company_ids(tenants[:3]).nunique() == 2  # a few names: one company's site
+    print(f"✓ multi-tenant domains found in the data: {sorted(deduplicator.shared_domains)}")
+
+    # Many look-alike companies in one zip: only names sharing their first letters are compared,
+    # and numbered names/addresses with different phones stay apart
+    many = pd.DataFrame([(f"{chr(65 + i % 26)}{chr(65 + i // 26 % 2)}x {i} Properties",
+                          f"{i} Main St, Fresno, CA 93721", f"559-555-{i:04d}", None, '93721')
+                         for i in range(2000)], columns=['name', 'address', 'phone', 'website', 'zip_code'])
+    deduplicator = CompanyDeduplicator()
+    ids = deduplicator.company_ids(many)
+    assert ids.nunique() == len(many)
+    assert deduplicator.stats['comparisons'] < len(many) * (len(many) - 1) // 2
+    print(f"✓ {len(many)} distinct companies kept apart with {deduplicator.stats['comparisons']:,} comparisons")
+
+
+if __name__ == "__main__":
+    test_dedupe()
@@ -0,0 +1,91 @@
+"""
+Test the shared DNS cache with a fake resolver in front of the local company
+fleet: one lookup per host however many requests a site makes, failures
+remembered, and prefetching hides lookup latency from the workers
+"""
+
+import asyncio
+import socket
+import time
+
+from aiohttp.abc import AbstractResolver
+
+from async_enrichment import AsyncEnrichmentEngine
+from benchmark_enrichment import start_fleet, stop_fleet
+from dns_cache import CachingResolver
+from email_enrichment_scraper import EmailEnrichmentScraper
+from enrichment_outcomes import DNS_FAILURE
+from politeness import PolitenessScheduler
+
+
+class FakeResolver(AbstractResolver):
+    """Resolves *.test to 127.0.0.1 after a delay, except gone.test; counts lookups per host"""
+
+    def __init__(self, delay: float = 0):
+        self.delay = delay
+        self.lookups = {}
+
+    async def resolve(self, host, port=0, family=socket.AF_INET):
+        self.lookups[host] = self.lookups.get(host, 0) + 1
+        await asyncio.sleep(self.delay)
+        if host == 'gone.test':
+            raise socket.gaierror(socket.EAI_NONAME, 'Name or service not known')
+        return [{'hostname': host, 'host': '127.0.0.1', 'port': port, 'family': socket.AF_INET,
+                 'proto': 0, 'flags': socket.AI_NUMERICHOST}]
+
+    async def close(self):
+        pass
+
+
+def named_companies(companies):
+    """Point each fleet company at siteN.test on its server's port"""
+    for i, company in enumerate(companies):
+        port = company['website'].rsplit(':', 1)[1].strip('/')
+        company['website'] = f"http://site{i}.test:{port}/"
+    return companies
+
+
+def make_engine(resolver, **kwargs):
+    scraper = EmailEnrichmentScraper(PolitenessScheduler(domain_limits={}, default_rate=1000, default_burst=100))
+    return AsyncEnrichmentEngine(scraper, resolver=resolver, **kwargs)
+
+
+def test_dns_cache():
+    print("=== Shared DNS cache: one lookup per host, negative entries, prefetch ===\n")
+
+    servers, companies = start_fleet(5, latency=0)
+    try:
+        companies = named_companies(companies)
+        dead = [{'name': f"Gone {i}", 'website': 'http://gone.test/'} for i in range(2)]
+
+        fake = FakeResolver()
+        engine = make_engine(CachingResolver(fake), max_in_flight=1)
+        outcomes = {}
+
+        def on_result(idx, site):
+            outcomes[idx] = site.outcome
+
+        found = asyncio.run(engine.enrich(companies + dead, on_result=on_result))
+        assert set(found) == {0, 1, 2, 4}
+        assert engine.stats['requests'] > len(companies)  # probes and crawls hit the same hosts
+        assert all(count == 1 for count in fake.lookups.values()), fake.lookups
+        assert outcomes[5] == outcomes[6] == DNS_FAILURE
+        assert engine.resolver.stats['negative_hits'] >= 1
+        print(f"✓ {engine.stats['requests']} requests, {len(fake.lookups)} lookups; failed name looked up once")
+
+        timings = {}
+        for prefetch_dns in (0, 10):
+            slow = FakeResolver(delay=0.3)
+            engine = make_engine(CachingResolver(slow), max_in_flight=1, prefetch_dns=prefetch_dns)
+            start = time.perf_counter()
+            asyncio.run(engine.enrich(companies))
+            timings[prefetch_dns] = time.perf_counter() - start
+            assert all(count == 1 for count in slow.lookups.values())
+        assert timings[0] >= 1.5 and timings[10] < 1.0, timings
+        print(f"✓ 5 sites, 0.3s lookups: {timings[0]:.2f}s sequential, {timings[10]:.2f}s with prefetch")
+    finally:
+        stop_fleet(servers)
+
+
+if __name__ == "__main__":
+    test_dns_cache()
@@ -0,0 +1,320 @@
+"""
+Test email enrichment against the local fake company fleet from
+benchmark_enrichment.py: emails found (link crawl, ranked probes), each page
+fetched once and parsed only when needed, the per-site deadline, dead domains
+skipped by the outcome cache's circuit breaker, incremental runs that only
+visit new or stale companies, and the bounded submission window
+"""
+
+import asyncio
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+from datetime import timedelta
+
+from bs4 import BeautifulSoup
+
+from async_enrichment import AsyncEnrichmentEngine
+from benchmark_enrichment import start_fleet, stop_fleet
+from email_enrichment_scraper import EmailEnrichmentScraper, EnrichmentResults, SiteContext
+from enrichment_delta import EnrichmentDelta, load_enriched
+from enrichment_outcomes import CONNECTION_ERROR, DNS_FAILURE, SUCCESS, TIMEOUT, OutcomeCache, classify_error
+from politeness import PolitenessScheduler, RequestCancelled
+from site_crawler import CrawlFrontier, is_confident_email, score_link
+
+# Per layout: (email found, fewest requests, most requests, pages parsed)
+# At most the homepage is parsed (for its links); emails come from the byte pre-scan
+EXPECTED = {
+    0: (True, 1, 1, 0),     # homepage mailto office@ is confident, nothing else fetched
+    1: (True, 2, 2, 1),     # homepage + linked contact page
+    2: (True, 7, 12, 1),    # homepage + probes; later-ranked ones cancelled once /about-us (6th) wins
+    3: (False, 12, 12, 1),  # homepage + 11 probes
+    4: (True, 2, 2, 1),     # homepage + /team, the only scoring footer link
+}
+
+
+def make_scraper(outcomes=None):
+    return EmailEnrichmentScraper(PolitenessScheduler(domain_limits={}, default_rate=1000, default_burst=100),
+                                  outcomes=outcomes)
+
+
+def check_site(site, layout):
+    found, fewest, most, parses = EXPECTED[layout]
+    assert (site.email == f"office@company{layout}.net") == found, layout
+    assert fewest <= site.requests <= most, (layout, site.requests)
+    assert site.parses == parses, (layout, site.parses)
+
+
+def test_prescan():
+    scraper = make_scraper()
+    page = b'<a HREF="mailto:Info@Acme.com?subject=x">mail</a> <p>leasing@acme.com @media x@y</p>'
+    assert sorted(scraper.prescan_emails(page)) == ['Info@Acme.com', 'leasing@acme.com']
+    assert scraper.prescan_emails(b'<style>@media screen {}</style>') == []
+    # Entity-obfuscated addresses need the full parse
+    assert scraper.prescan_emails(b'<p>leasing&#64;acme.com</p>') is None
+    print("✓ byte pre-scan: mailto and text addresses, parse fallback when obfuscated")
+
+
+# Real addresses next to '@'s the parse never reads as text
+PARITY_PAGES = [
+    b'<html><head><script>Sentry.init({dsn: "https://abc123@o45.ingest.sentry.io/678"})</script></head>'
+    b'<body><img srcset="logo@2x.webp 2x, hero@3x.png 3x" src="logo.png"><p>Email leasing@acme.com</p></body></html>',
+    b'<style>@import url(a.css); .x{background:url(icon@2x.svg)}</style><!-- old: admin@acme.com -->'
+    b'<a href="mailto:office@acme.com">Mail</a><div data-contact="hidden@acme.com">Call us</div>',
+    b'<a title="a > b" href="/x" data-owner="owner@acme.com">x</a><template>tpl@acme.com</template>'
+    b'<noscript>Write to ns@acme.com</noscript>\n<textarea>form@acme.com</textarea>',
+    b'<p>ns@acme.com</p><p>form@acme.com</p>',
+    b'<script type="text/template"><a href="mailto:js@acme.com">x</a></script><p>Nothing here</p>',
+    b'<meta name="reply-to" content="meta@acme.com"><p>team@acme.com</p>',
+    b'<p><b>info</b>@acme.com and sales@<i>acme.com</i></p>',
+    b'<p>Unterminated <script>var owner = "ghost@acme.com";',
+    b'<link rel="icon" href="/favicon@2x.png"><p>Help: help@acme.com, Sentry: x@sentry.io</p>',
+]
+
+
+def test_prescan_parity():
+    scraper = make_scraper()
+    for page in PARITY_PAGES:
+        parsed = sorted(scraper.extract_emails_from_soup(BeautifulSoup(page, 'html.parser')))
+        prescanned = scraper.prescan_emails(page)
+        assert prescanned is None or sorted(prescanned) == parsed, (page, prescanned, parsed)
+    assert sorted(scraper.prescan_emails(PARITY_PAGES[0])) == ['leasing@acme.com']
+    assert scraper.choose_email(scraper.prescan_emails(PARITY_PAGES[0]), 'https://acme.com') == 'leasing@acme.com'
+    print(f"✓ byte pre-scan finds what the parse finds on {len(PARITY_PAGES)} pages with decoy '@'s")
+
+
+def test_link_scoring():
+    assert score_link('https://acme.com/contact-us', '') > score_link('https://acme.com/about', '') > 0
+    assert score_link('https://acme.com/p/1', 'Meet the Team', in_footer=True) > score_link('https://acme.com/team', '')
+    assert score_link('https://acme.com/blog/contact-tips', 'Contact tips') == 0
+    assert score_link('https://acme.com/brochure.pdf', 'Email brochure') == 0
+
+    soup = BeautifulSoup('<a href="/team#top">Team</a><a href="/team/">Staff</a><a href="/contact">Contact</a>'
+                         '<a href="https://other.com/contact">Partner</a><a href="/">Home</a>', 'html.parser')
+    frontier = CrawlFrontier(seen=['https://acme.com/'])
+    frontier.add_links(soup, 'https://acme.com/', depth=1)
+    assert [frontier.pop()[0] for _ in range(len(frontier))] == ['https://acme.com/contact', 'https://acme.com/team#top']
+
+    assert is_confident_email('leasing@gmail.com', 'https://acme.com')
+    assert is_confident_email('jane@acme.com', 'https://www.acme.com')
+    assert not is_confident_email('jane@gmail.com', 'https://acme.com')
+    print("✓ link scoring, frontier dedupe and email confidence")
+
+
+def test_enrichment():
+    print("=== Email Enrichment: one fetch per page, link crawl, ranked concurrent probes ===\n")
+
+    servers, companies = start_fleet(len(EXPECTED), latency=0)
+    try:
+        scraper = make_scraper()
+        for layout, company in enumerate(companies):
+            check_site(scraper.scrape_site(company), layout)
+        print("✓ threaded scraper: homepage downloaded and parsed once per company")
+
+        engine = AsyncEnrichmentEngine(make_scraper())
+        found = asyncio.run(engine.enrich(companies))
+        assert found == {i: f"office@company{i}.net" for i in EXPECTED if EXPECTED[i][0]}
+        assert engine.stats['parses'] == sum(p for *_, p in EXPECTED.values())
+        print("✓ asyncio engine: same emails and parse counts")
+    finally:
+        stop_fleet(servers)
+
+    # Dead paths that hang: probing stops at the site budget instead of 11 x 2s
+    servers, companies = start_fleet(4, latency=0, missing_latency=2)
+    try:
+        scraper = make_scraper()
+        scraper.site_budget = 1
+        start = time.monotonic()
+        site = scraper.scrape_site(companies[2])
+        assert time.monotonic() - start < 1.5
+        assert site.email is None
+        print("✓ slow probes cut off at the per-site deadline")
+
+        # Probes still waiting for the host's politeness token when the deadline
+        # passes are dropped: the server only ever sees requests the site had
+        # started (some may land after it returns on a loaded machine)
+        scheduler = PolitenessScheduler(domain_limits={}, default_rate=1, default_burst=1)
+        scheduler.wait(companies[3]['website'])
+        stop = threading.Event()
+        threading.Timer(0.1, stop.set).start()
+        start = time.monotonic()
+        try:
+            scheduler.wait(companies[3]['website'], stop)
+            raise AssertionError('expected the waiting request to be cancelled')
+        except RequestCancelled:
+            assert time.monotonic() - start < 0.5
+        for engine in ('threads', 'asyncio'):
+            scraper = EmailEnrichmentScraper(PolitenessScheduler(domain_limits={}, default_rate=4, default_burst=1))
+            scraper.site_budget = 1
+            before = servers[3].requests_served
+            sites = []
+            if engine == 'threads':
+                sites.append(scraper.scrape_site(companies[3]))
+            else:
+                asyncio.run(AsyncEnrichmentEngine(scraper).enrich([companies[3]],
+                                                                  on_result=lambda idx, site: sites.append(site)))
+            time.sleep(1.5)
+            served = servers[3].requests_served - before
+            assert served <= sites[0].requests < 12, (engine, served, sites[0].requests)
+        print("✓ no probe is sent after the site returns")
+    finally:
+        stop_fleet(servers)
+
+
+def test_outcome_cache():
+    print("\n=== Outcome cache and circuit breaker ===\n")
+
+    assert classify_error(socket.gaierror(-2, 'Name or service not known')) == DNS_FAILURE
+    assert classify_error(asyncio.TimeoutError()) == TIMEOUT
+    assert classify_error(ConnectionRefusedError(111, 'Connection refused')) == CONNECTION_ERROR
+    print("✓ errors classified")
+
+    servers, companies = start_fleet(2, latency=0)
+    stop_fleet(servers[1:])  # company 1's port now refuses connections
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            outcomes = OutcomeCache(os.path.join(tmp, 'outcomes.db'), failure_threshold=2)
+            scraper = make_scraper(outcomes)
+
+            live, dead = companies
+            first = scraper.scrape_site(live)
+            assert first.outcome == SUCCESS and first.requests > 0
+            again = scraper.scrape_site(live)
+            assert again.cached and again.requests == 0 and again.email == first.email
+            print("✓ found email reused without a request")
+
+            # One failure is retried, the second trips the breaker
+            for attempt in range(2):
+                site = scraper.scrape_site(dead)
+                assert site.outcome == CONNECTION_ERROR and site.requests == 1 and not site.cached
+            assert outcomes.stats['tripped'] == 1
+            site = scraper.scrape_site(dead)
+            assert site.cached and site.requests == 0 and site.email is None
+            print("✓ dead domain skipped once the breaker trips")
+
+            # Later runs (either engine) start from the stored outcomes
+            rerun = AsyncEnrichmentEngine(make_scraper(OutcomeCache(os.path.join(tmp, 'outcomes.db'))))
+            assert asyncio.run(rerun.enrich(companies)) == {0: first.email}
+            assert rerun.stats['requests'] == 0
+            print("✓ rerun makes no requests")
+    finally:
+        stop_fleet(servers[:1])
+
+    # Franchise pages: two companies on one host, each with its own page and email
+    servers, _ = start_fleet(1, latency=0)
+    host = f"http://127.0.0.1:{servers[0].server_address[1]}"
+    for branch in ('dallas', 'austin'):
+        servers[0].pages[f'/locations/{branch}/'] = f'<a href="mailto:office@{branch}-franchise.com">Email</a>'
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            outcomes = OutcomeCache(os.path.join(tmp, 'outcomes.db'))
+            scraper = make_scraper(outcomes)
+            dallas = scraper.scrape_site({'website': f"{host}/locations/dallas/"})
+            austin = scraper.scrape_site({'website': f"{host}/locations/austin/"})
+            assert (dallas.email, austin.email) == ('office@dallas-franchise.com', 'office@austin-franchise.com')
+            assert not austin.cached and austin.requests == 1
+            again = scraper.scrape_site({'website': f"{host}/locations/dallas"})
+            assert again.cached and again.email == 'office@dallas-franchise.com'
+            assert outcomes.summary() == {SUCCESS: 2}
+
+            # Failures still count against the whole host
+            for _ in range(2):
+                outcomes.record(f"{host}/locations/houston/", CONNECTION_ERROR)
+            assert outcomes.lookup(f"{host}/locations/el-paso/").outcome == CONNECTION_ERROR
+            assert outcomes.lookup(f"{host}/locations/austin/").outcome == SUCCESS
+            print("✓ emails reused per website, failures per domain")
+
+            # An unexpected error is classified and recorded like a failed fetch, in both engines
+            def broken_choice(emails, website):
+                raise RuntimeError('parser bug')
+            for branch in ('dallas', 'austin'):
+                failing = make_scraper(OutcomeCache(os.path.join(tmp, f'{branch}.db')))
+                failing.choose_email = broken_choice
+                company = {'website': f"{host}/locations/{branch}/"}
+                if branch == 'dallas':
+                    site = failing.scrape_site(company)
+                else:
+                    settled = {}
+                    asyncio.run(AsyncEnrichmentEngine(failing).enrich([company], on_result=settled.__setitem__))
+                    site = settled[0]
+                assert site.outcome == CONNECTION_ERROR and site.email is None
+                entry = failing.outcomes.get(company['website'])
+                assert (entry.outcome, entry.error_message) == (CONNECTION_ERROR, 'parser bug')
+            print("✓ unexpected errors settle the site with a classified outcome")
+    finally:
+        stop_fleet(servers)
+
+
+def test_incremental():
+    print("\n=== Incremental enrichment: delta log merged on read ===\n")
+
+    servers, companies = start_fleet(5, latency=0)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            base = os.path.join(tmp, 'companies.json')
+            delta_file = os.path.join(tmp, 'companies.delta.ndjson')
+            with open(base, 'w') as f:
+                json.dump(companies[:4], f)
+
+            def run(retry_after=timedelta(days=7)):
+                engine = AsyncEnrichmentEngine(make_scraper())
+                engine.enrich_json_with_emails(base, None, delta_file=delta_file, retry_after=retry_after)
+                return engine.stats['companies']
+
+            assert run() == 4
+            merged = load_enriched(base, delta_file)
+            assert [c['email'] for c in merged] == [f"office@company{i}.net" for i in range(3)] + [None]
+            with open(base) as f:
+                assert not any(c['email'] for c in json.load(f))  # the base file is never rewritten
+            print("✓ first run tries every company, results only in the delta")
+
+            assert run() == 0
+            assert run(retry_after=timedelta(0)) == 1  # only the company without an email
+            print("✓ reruns skip attempted companies, retries stale misses")
+
+            with open(base, 'w') as f:
+                json.dump(companies, f)
+            assert run() == 1
+            assert load_enriched(base, delta_file)[4]['email'] == "office@company4.net"
+            print("✓ a new company is the only one visited")
+
+            delta = EnrichmentDelta(delta_file)
+            delta.compact()
+            assert delta.lines == len(delta.latest) == 5
+    finally:
+        stop_fleet(servers)
+
+
+def test_submission_window():
+    print("\n=== Threaded driver: bounded submission window ===\n")
+
+    class InstantScraper(EmailEnrichmentScraper):
+        def scrape_site(self, company):
+            site = SiteContext(company['website'])
+            site.email = f"info@{company['name']}.com" if int(company['name']) % 3 == 0 else None
+            return site
+
+    companies = [{'name': str(i), 'website': f"http://pm{i}.com"} for i in range(3000)]
+    scraper = InstantScraper()
+    results = EnrichmentResults()
+    seen = set()
+    for idx, site in scraper.iter_site_results(companies, iter(range(len(companies))), max_workers=4):
+        seen.add(idx)
+        results.add(idx, site)
+    assert seen == set(range(len(companies)))
+    assert scraper.peak_in_flight <= 8
+    assert results.found == 1000 and len(results.sample) == 10
+    print(f"✓ {len(companies)} companies with at most {scraper.peak_in_flight} futures alive")
+
+
+if __name__ == "__main__":
+    test_prescan()
+    test_prescan_parity()
+    test_link_scoring()
+    test_enrichment()
+    test_outcome_cache()
+    test_incremental()
+    test_submission_window()
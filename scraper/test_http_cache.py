@@ -0,0 +1,94 @@
+"""
+Test the on-disk HTTP cache against a local server that emits ETag and
+Last-Modified validators and answers conditional GETs with 304
+"""
+
+import os
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import requests
+
+from http_cache import HttpCache, install_cache
+
+PAGE = b'<html><body><h2 id="acme">Acme Property Management</h2></body></html>' * 50
+ETAG = '"v1"'
+LAST_MODIFIED = 'Mon, 01 Jan 2024 00:00:00 GMT'
+
+
+class ValidatorHandler(BaseHTTPRequestHandler):
+    """Serves PAGE at any path, with validators; counts full and 304 responses"""
+    full = 0
+    not_modified = 0
+
+    def do_GET(self):
+        if self.headers.get('If-None-Match') == ETAG:
+            ValidatorHandler.not_modified += 1
+            self.send_response(304)
+            self.send_header('ETag', ETAG)
+            self.end_headers()
+            return
+        ValidatorHandler.full += 1
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(PAGE)))
+        self.send_header('ETag', ETAG)
+        self.send_header('Last-Modified', LAST_MODIFIED)
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_http_cache():
+    print("=== HTTP Cache: fresh hits, 304 revalidation, LRU eviction ===\n")
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ValidatorHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = HttpCache(os.path.join(tmp, 'cache.db'), max_age=3600)
+        session = install_cache(requests.Session(), cache)
+
+        try:
+            # 1. Miss: downloaded and stored
+            first = session.get(f"{base_url}/companies/phoenix-az")
+            assert first.content == PAGE and ValidatorHandler.full == 1
+
+            # 2. Fresh hit: no request reaches the server
+            second = session.get(f"{base_url}/companies/phoenix-az")
+            assert second.content == PAGE and second.headers['X-Cache'] == 'HIT'
+            assert ValidatorHandler.full == 1 and ValidatorHandler.not_modified == 0
+            print("✓ fresh entry served without a request")
+
+            # 3. Stale: conditional GET, 304, cached body returned
+            cache.max_age = 0
+            third = session.get(f"{base_url}/companies/phoenix-az")
+            assert third.status_code == 200 and third.content == PAGE
+            assert third.headers['X-Cache'] == 'REVALIDATED'
+            assert ValidatorHandler.full == 1 and ValidatorHandler.not_modified == 1
+            print("✓ stale entry revalidated with a 304")
+
+            # 4. Bodies are stored compressed
+            assert cache.size() < len(PAGE) / 5
+            print(f"✓ {len(PAGE)} byte page stored in {cache.size()} bytes")
+
+            # 5. LRU eviction keeps the cache under max_size
+            cache.max_age = 3600
+            cache.max_size = cache.size() * 2
+            for city in ('austin-tx', 'denver-co'):
+                session.get(f"{base_url}/companies/{city}")
+            assert cache.lookup(f"{base_url}/companies/phoenix-az") is None
+            assert cache.lookup(f"{base_url}/companies/denver-co") is not None
+            assert cache.stats['evicted'] == 1
+            print("✓ least recently used entry evicted")
+        finally:
+            cache.close()
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    test_http_cache()
@@ -0,0 +1,83 @@
+"""
+Test resuming an interrupted crawl from the scrape_jobs ledger: after a run
+that failed one city and died part way, re-opening the ledger schedules only
+the failed, interrupted and never-started cities, and the resumed run ends
+with the same companies as one uninterrupted crawl
+"""
+
+import contextlib
+import io
+import os
+import tempfile
+
+from benchmark_crawl import build_city_list, start_server
+from final_scraper import FinalPropertyManagerScraper
+from job_ledger import ScrapeJobLedger
+from politeness import PolitenessScheduler
+
+
+class RecordingScraper(FinalPropertyManagerScraper):
+    """Remembers which cities were fetched; cities in `broken` fail like an HTTP error"""
+
+    def __init__(self, broken=()):
+        super().__init__(PolitenessScheduler(domain_limits={}, default_rate=10000, default_burst=100))
+        self.broken = set(broken)
+        self.fetched = []
+
+    def scrape_city_page(self, city_url, city_name, state, raise_errors=False):
+        self.fetched.append(city_name)
+        if city_name in self.broken:
+            raise RuntimeError('503 Service Unavailable')
+        return super().scrape_city_page(city_url, city_name, state, raise_errors)
+
+
+def names(cities):
+    return [c['city'] for c in cities]
+
+
+def test_resume():
+    print("=== Job ledger: resume an interrupted crawl ===\n")
+
+    server, base_url = start_server()
+    city_list = build_city_list(base_url, 8)
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+            path = os.path.join(tmp, 'scrape_jobs.db')
+            expected = [company for _, companies in RecordingScraper().iter_cities(city_list) for company in companies]
+
+            # First run: City 2 fails, the process dies while City 5 is being scraped
+            ledger = ScrapeJobLedger(path)
+            ledger.reset()
+            ledger.register(city_list)
+            scraper = RecordingScraper(broken={'City 2'})
+            for _ in scraper.iter_cities(city_list[:5], ledger):
+                pass
+            ledger.start(city_list[5])
+            ledger.close()
+
+            # Resumed run, as scrape_all_cities.py --resume does it
+            ledger = ScrapeJobLedger(path)
+            ledger.register(city_list)
+            summary = ledger.summary()
+            remaining = ledger.remaining(city_list)
+            resumed = RecordingScraper()
+            resumed.scrape_multiple_cities(remaining, ledger=ledger)
+            final_summary = ledger.summary()
+            companies = ledger.load_companies(city_list)
+            ledger.close()
+    finally:
+        server.shutdown()
+
+    assert summary == {'completed': 4, 'failed': 1, 'in_progress': 1, 'pending': 2}, summary
+    assert names(remaining) == ['City 2', 'City 5', 'City 6', 'City 7'], names(remaining)
+    assert resumed.fetched == names(remaining)
+    print(f"✓ Re-opened ledger schedules only {', '.join(names(remaining))} ({summary})")
+
+    assert final_summary == {'completed': len(city_list)}, final_summary
+    assert companies == expected
+    print(f"✓ Resumed run ends with the same {len(companies)} companies as one uninterrupted crawl")
+
+
+if __name__ == "__main__":
+    test_resume()
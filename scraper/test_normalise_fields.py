@@ -0,0 +1,49 @@
+"""
+Test the vectorised fee parsing on the phrasings that trip it up: a % after
+the second number only, fractions of a month's rent, percent fees with a $
+minimum, and that on the scraped CSVs it matches the old per-row reading
+everywhere except fractions
+"""
+
+import glob
+
+import pandas as pd
+
+from benchmark_normalise import extract_fee
+from normalise_fields import parse_fee
+
+# Fee text -> (fee_min, fee_max, fee_is_percent); None is <NA>
+EDGE_CASES = {
+    "7.9 or 9.9% of full month's rent": (7.9, 7.9, True),
+    "2/3 of the first month's rent and 10% per month": (None, None, None),
+    "1/2 month's rent": (None, None, None),
+    '8 – 10% of monthly rent': (8, 10, True),
+    '10% of monthly rent ($100 min)': (10, 10, True),
+    '$100 or 8% of monthly rent, depending on rental amount': (100, 100, False),
+    '$100/month': (100, 100, False),
+    '$75 – $110 per month': (75, 110, False),
+    'Contact for pricing': (None, None, None),
+}
+
+
+def test_normalise_fields():
+    print("=== Fee parsing: edge cases and parity ===\n")
+
+    fees = parse_fee(pd.Series(list(EDGE_CASES) + [None]))
+    for (text, expected), row in zip(EDGE_CASES.items(), fees.itertuples(index=False)):
+        got = tuple(None if pd.isna(value) else value for value in row)
+        assert got == expected, (text, got)
+    assert fees.iloc[-1].isna().all()
+    print(f"✓ {len(EDGE_CASES)} edge phrasings parsed as expected")
+
+    values = pd.concat([pd.read_csv(path, dtype=str)['management_fee']
+                        for path in glob.glob('property_managers_*.csv')]).dropna().drop_duplicates()
+    old = values.map(extract_fee).astype('float64')
+    new = parse_fee(values)['fee_min'].astype('float64')
+    changed = values[~((old == new) | (old.isna() & new.isna()))]
+    assert changed.str.contains(r'^\$?\d+/\d', regex=True).all(), list(changed)
+    print(f"✓ {len(values)} distinct scraped fees: same first number as before except fractions ({len(changed)})")
+
+
+if __name__ == "__main__":
+    test_normalise_fields()
@@ -0,0 +1,116 @@
+"""
+Test capture/replay: crawl a local server with a capture archive, then parse
+the archive offline and check the records match the live crawl, also when a
+later fetch of a page failed
+"""
+
+import os
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pandas as pd
+import requests
+
+from final_scraper import FinalPropertyManagerScraper
+from page_archive import PageArchive, PageArchiveWriter, _iter_members, install_replay, replay_city_pages
+from politeness import PolitenessScheduler
+
+FIXTURES = {
+    '/companies/phoenix-az': 'phoenix_page.html',
+    '/companies/sample-tx': 'page_sample.html',
+}
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Serves the saved city pages (or an error for `failing` paths); counts requests"""
+    requests_served = 0
+    failing = set()
+
+    def do_GET(self):
+        FixtureHandler.requests_served += 1
+        if self.path in self.failing:
+            self.send_error(404)
+            return
+        with open(FIXTURES[self.path], 'rb') as f:
+            body = f.read()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_page_archive():
+    print("=== Page Archive: capture a crawl, replay it offline ===\n")
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    city_list = [
+        {'city': 'Phoenix', 'state': 'AZ', 'slug': 'phoenix-az', 'url': f"{base_url}/companies/phoenix-az"},
+        {'city': 'Sample', 'state': 'TX', 'slug': 'sample-tx', 'url': f"{base_url}/companies/sample-tx"},
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'crawl.warc.gz')
+        try:
+            # 1. Live crawl with capture
+            with PageArchiveWriter(path) as writer:
+                scraper = FinalPropertyManagerScraper(PolitenessScheduler(default_rate=1000), capture=writer)
+                live = scraper.scrape_multiple_cities(city_list)
+                # A second capture of the same URL replaces the first on read...
+                scraper.session.get(city_list[0]['url'])
+                # ...but a later error does not replace a good capture
+                FixtureHandler.failing.add('/companies/phoenix-az')
+                assert scraper.session.get(city_list[0]['url']).status_code == 404
+            assert FixtureHandler.requests_served == 4
+            print(f"✓ captured {len(live)} companies from 2 city pages, archive is {os.path.getsize(path):,} bytes")
+
+            # 2. Archive holds one record per URL with the original body
+            archive = PageArchive(path)
+            assert len(archive) == 2
+            with open('phoenix_page.html', 'rb') as f:
+                assert archive.get(city_list[0]['url']).body == f.read()
+            assert archive.get(city_list[0]['url']).status == 200
+            print("✓ one record per URL, bodies intact, the 404 after a 200 ignored")
+
+            # 3. Offline parse matches the live crawl, for both backends
+            for parser in ('html.parser', 'lxml'):
+                replayed = replay_city_pages(archive, FinalPropertyManagerScraper(parser=parser), city_list)
+                pd.testing.assert_frame_equal(pd.DataFrame(replayed), live)
+            assert FixtureHandler.requests_served == 4
+            print("✓ replayed records identical to the live crawl (html.parser and lxml)")
+
+            # 4. A replay session answers from the archive only
+            session = install_replay(requests.Session(), archive)
+            assert session.get(city_list[1]['url']).status_code == 200
+            assert session.get(f"{base_url}/companies/unknown-ny").status_code == 404
+            assert FixtureHandler.requests_served == 4
+            print("✓ replay session never touches the network")
+
+            # 5. Members are split correctly wherever the read pieces end, and a
+            #    record cut off by a crash mid-write is skipped
+            small = os.path.join(tmp, 'small.warc.gz')
+            with PageArchiveWriter(small) as writer:
+                for i in range(50):
+                    writer.write(f"{base_url}/companies/c{i}-az", 200, {}, b'<html>%d</html>' % i * (i + 1))
+            with open(small, 'rb') as f:
+                data = f.read()
+            expected = list(_iter_members(data))
+            for piece_size in (1, 7, 100, len(data)):
+                assert list(_iter_members(data, piece_size)) == expected
+            with open(small, 'ab') as f:
+                f.write(data[:len(data) // 100])
+            archive = PageArchive(small)
+            assert len(archive) == 50 and archive.get(f"{base_url}/companies/c49-az").body == b'<html>49</html>' * 50
+            print("✓ 50 members split correctly at any piece size; a truncated last record is skipped")
+        finally:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    test_page_archive()
@@ -0,0 +1,40 @@
+"""
+Check that the lxml parser backend produces byte-identical records to
+the default BeautifulSoup backend on the saved HTML fixtures
+"""
+
+import contextlib
+import io
+import json
+
+from final_scraper import FinalPropertyManagerScraper
+
+FIXTURES = ['phoenix_page.html', 'page_sample.html', 'companies_main_page.html']
+
+
+def parse_fixture(parser: str, filename: str):
+    """Parse one saved page with the given backend, silencing progress output"""
+    scraper = FinalPropertyManagerScraper(parser=parser)
+    with open(filename, 'rb') as f:
+        content = f.read()
+    with contextlib.redirect_stdout(io.StringIO()):
+        return scraper.parse_city_page(content, 'Phoenix', 'AZ', 'https://ipropertymanagement.com/companies/phoenix-az')
+
+
+def test_parser_parity():
+    """Both backends must serialise to exactly the same JSON"""
+    print("=== Parser Parity: html.parser vs lxml ===\n")
+
+    for filename in FIXTURES:
+        expected = parse_fixture('html.parser', filename)
+        actual = parse_fixture('lxml', filename)
+
+        for a, b in zip(expected, actual):
+            assert json.dumps(a) == json.dumps(b), f"{filename}: record mismatch for {a['name']}"
+        assert len(expected) == len(actual), f"{filename}: {len(expected)} vs {len(actual)} records"
+
+        print(f"✓ {filename}: {len(actual)} identical records")
+
+
+if __name__ == "__main__":
+    test_parser_parity()
@@ -0,0 +1,45 @@
+"""
+Test the fetch/parse pipeline: same records as the sequential scraper and the
+page queue never grows past its bound
+"""
+
+import contextlib
+import io
+
+import pandas as pd
+
+from benchmark_crawl import build_city_list, start_server
+from final_scraper import FinalPropertyManagerScraper
+from pipeline import PipelinedCrawl
+from politeness import PolitenessScheduler
+
+
+def test_pipeline():
+    print("=== Pipeline: process-pool parsing matches the sequential scraper ===\n")
+
+    server, base_url = start_server()
+    city_list = build_city_list(base_url, 6)
+
+    def make_scraper():
+        return FinalPropertyManagerScraper(PolitenessScheduler(domain_limits={}, default_rate=10000, default_burst=100))
+
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            expected = make_scraper().scrape_multiple_cities(city_list)
+            crawl = PipelinedCrawl(make_scraper(), fetch_workers=3, parse_workers=2, queue_size=1)
+            actual = crawl.scrape_multiple_cities(city_list)
+    finally:
+        server.shutdown()
+
+    # Records arrive in completion order
+    order = {c['url']: i for i, c in enumerate(city_list)}
+    actual = actual.sort_values('source_url', key=lambda s: s.map(order), kind='stable').reset_index(drop=True)
+    pd.testing.assert_frame_equal(actual, expected)
+    print(f"✓ {len(actual)} companies identical to the sequential scraper")
+
+    assert crawl.peak_queued <= 1
+    print("✓ page queue stayed within its bound")
+
+
+if __name__ == "__main__":
+    test_pipeline()
@@ -0,0 +1,61 @@
+"""
+Test the one-pass quality report against the per-column notna() counts it
+replaced, that completeness lists only the file's own columns, and that the
+same result renders as text, JSON and HTML (also for an empty selection)
+"""
+
+import json
+
+import pandas as pd
+
+from columnar import NUMERIC_COLUMNS, load_companies
+from quality_report import CORE_FIELDS, build_report, render_html, render_json, render_text
+
+CSV_FILE = 'property_managers_CA_FL_DC_METRO.csv'
+
+
+def test_quality_report():
+    print("=== Quality report: one pass, three renderers ===\n")
+
+    df = load_companies(CSV_FILE)
+    df.loc[df['portfolio_numeric'].idxmax(), 'name'] = '<script>alert(1)</script>'  # shown in the top portfolios
+    report = build_report(df, title='CA & FL')
+
+    for column in report['completeness']:
+        assert column['present'] == df[column['column']].notna().sum()
+    listed = [column['column'] for column in report['completeness']]
+    assert listed == list(pd.read_csv(CSV_FILE, nrows=0).columns)  # no parsed or filled-in columns
+    assert not set(listed) & set(NUMERIC_COLUMNS)
+    assert not set(report['by_state'][0]['present']) & set(NUMERIC_COLUMNS)
+    for state in report['by_state']:
+        rows = df[df['state'] == state['state']]
+        assert state['companies'] == len(rows)
+        assert state['a_plus'] == (rows['bbb_rating'] == 'A+').sum()
+        assert state['present']['email'] == rows['email'].notna().sum()
+    core = sum(df[column].notna().sum() for column in CORE_FIELDS) / (len(df) * len(CORE_FIELDS)) * 100
+    assert abs(report['scores']['core'] - core) < 1e-9
+    assert sum(group['companies'] for group in report['portfolio_groups']) == df['portfolio_numeric'].notna().sum()
+    print(f"✓ {len(df)} companies, {len(report['by_state'])} states: counts match the per-column passes, "
+          f"completeness over the {len(listed)} input columns")
+
+    text = render_text(report)
+    assert 'DATA QUALITY SCORES' in text and f"Total Companies: {len(df)}" in text
+    gaps = text[text.index('DATA COMPLETENESS'):text.index('BBB RATINGS')] + \
+        text[text.index('MISSING DATA'):text.index('SAMPLE COMPANIES')]
+    assert not [column for column in NUMERIC_COLUMNS if f"{column} " in gaps]  # as analyze_ca_fl_data.py prints them
+    assert json.loads(render_json(report)) == json.loads(json.dumps(report))
+    page = render_html(report)
+    assert '&lt;script&gt;' in page and '<script>' not in page and '<title>CA &amp; FL</title>' in page
+    print(f"✓ Text ({len(text):,} chars), JSON and HTML rendered from the same report")
+
+    # A selection with no rows (e.g. --states ZZ) still renders, with zero percentages
+    empty = build_report(load_companies(CSV_FILE, states=['ZZ']))
+    assert empty['companies'] == 0
+    for render in (render_text, render_json, render_html):
+        render(empty)
+    assert 'Total Companies: 0' in render_text(empty)
+    print("✓ Empty selection renders without dividing by zero")
+
+
+if __name__ == "__main__":
+    test_quality_report()
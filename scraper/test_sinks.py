@@ -0,0 +1,83 @@
+"""
+Test the streaming JSON array sink: output is byte-identical to one
+json.dump of all records (on the saved pages and the repo's JSON outputs),
+an empty run writes [], and a run that fails part way still leaves valid JSON
+"""
+
+import contextlib
+import io
+import json
+import os
+import tempfile
+
+from final_scraper import FinalPropertyManagerScraper
+from sinks import JSONArraySink, open_sink
+
+PAGES = ['phoenix_page.html', 'page_sample.html', 'companies_main_page.html']
+OUTPUTS = ['property_managers_final.json', 'property_managers_CA_FL_DC_with_emails.json']
+
+
+def page_records(filename: str):
+    scraper = FinalPropertyManagerScraper()
+    with open(filename, 'rb') as f:
+        content = f.read()
+    with contextlib.redirect_stdout(io.StringIO()):
+        return scraper.parse_city_page(content, 'Phoenix', 'AZ', 'https://ipropertymanagement.com/companies/phoenix-az')
+
+
+def fixtures():
+    for filename in PAGES:
+        yield filename, page_records(filename)
+    for filename in OUTPUTS:
+        with open(filename, encoding='utf-8') as f:
+            yield filename, json.load(f)
+
+
+def read(path: str) -> str:
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+
+def test_json_array_sink():
+    print("=== JSON array sink: streamed output vs json.dump ===\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        streamed = os.path.join(tmp, 'streamed.json')
+        dumped = os.path.join(tmp, 'dumped.json')
+
+        for filename, records in fixtures():
+            with open_sink(streamed) as sink:
+                for start in range(0, len(records), 7):  # one write_records() per "city"
+                    sink.write_records(records[start:start + 7])
+            with open(dumped, 'w', encoding='utf-8') as f:
+                json.dump(records, f, indent=2)
+                f.write('\n')
+            assert read(streamed) == read(dumped), filename
+            print(f"✓ {filename}: {len(records)} records, byte-identical to json.dump")
+
+        with JSONArraySink(streamed) as sink:
+            sink.write_records([])
+        assert read(streamed) == '[]\n' and json.loads(read(streamed)) == []
+        print("✓ Empty run writes []")
+
+        records = page_records(PAGES[0])
+        try:
+            with JSONArraySink(streamed) as sink:
+                sink.write_records(records[:3])
+                sink.write_records(records[3:5])
+                raise RuntimeError('crawl interrupted')
+        except RuntimeError:
+            pass
+        assert json.loads(read(streamed)) == records[:5]
+
+        try:
+            with JSONArraySink(streamed) as sink:
+                raise RuntimeError('failed before the first city')
+        except RuntimeError:
+            pass
+        assert json.loads(read(streamed)) == []
+        print("✓ Closing after an exception leaves valid JSON with the records written so far")
+
+
+if __name__ == "__main__":
+    test_json_array_sink()
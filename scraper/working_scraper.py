@@ -6,19 +6,26 @@ Uses correct URL structure: /companies/city-state
 import requests
 from bs4 import BeautifulSoup
 import pandas as pd
-import time
 import re
 import json
-from typing import List, Dict
+from typing import List, Dict, Optional
+
+from http_cache import HttpCache, install_cache
+from politeness import PolitenessScheduler, get_default_scheduler, mount_politeness
 
 class PropertyManagerScraper:
-    def __init__(self):
+    def __init__(self, scheduler: Optional[PolitenessScheduler] = None, cache: Optional[HttpCache] = None):
         self.base_url = "https://ipropertymanagement.com"
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         }
+        self.scheduler = scheduler or get_default_scheduler()
         self.session = requests.Session()
         self.session.headers.update(self.headers)
+        mount_politeness(self.session, self.scheduler)
+        self.cache = cache
+        if cache is not None:
+            install_cache(self.session, cache)
 
     def get_all_city_urls(self) -> List[Dict[str, str]]:
         """
@@ -123,9 +130,6 @@ class PropertyManagerScraper:
                     print(f"  Error extracting company {idx}: {str(e)}")
                     continue
 
-            # Be respectful with delays
-            time.sleep(2)
-
             return companies
 
         except Exception as e:
@@ -250,9 +254,6 @@ class PropertyManagerScraper:
             )
             all_companies.extend(companies)
 
-            # Be respectful with delays between cities
-            time.sleep(3)
-
         return pd.DataFrame(all_companies)
 
     def save_to_csv(self, df: pd.DataFrame, filename: str):